@@ -10,20 +10,40 @@ __version__ = "0.2.0"
 
 # Core feature functions
 from .features import (
+    FeatureMatrix,
     phoneme_to_features,
+    phoneme_to_vector,
     features_to_phoneme,
+    features_to_phonemes,
     get_feature_system,
     get_feature_names,
+    get_feature_matrix,
     load_custom_features,
+    on_feature_system_change,
+    pack_features,
 )
 
 # Distance calculation functions
 from .distances import (
     calculate_distance,
+    calculate_distances,
     build_distance_matrix,
+    build_cross_distance_matrix,
     available_distance_methods,
     register_distance_method,
+    get_feature_weights,
+    get_distance_cache,
+    precompute_distance_tables,
+    clear_distance_tables,
+    condensed_index,
+    condensed_size,
+    condensed_to_square,
+    square_to_condensed,
 )
+from .cache import DistanceCache
+
+# Nearest-neighbour search
+from .index import PhonemeIndex
 
 # Normalization utilities
 from .normalization import (
@@ -51,16 +71,35 @@ from .config import (
 __all__ = [
     "__version__",
     # Features
+    "FeatureMatrix",
     "phoneme_to_features",
+    "phoneme_to_vector",
     "features_to_phoneme",
+    "features_to_phonemes",
     "get_feature_system",
     "get_feature_names",
+    "get_feature_matrix",
     "load_custom_features",
+    "on_feature_system_change",
+    "pack_features",
     # Distances
     "calculate_distance",
+    "calculate_distances",
     "build_distance_matrix",
+    "build_cross_distance_matrix",
     "available_distance_methods",
     "register_distance_method",
+    "get_feature_weights",
+    "get_distance_cache",
+    "DistanceCache",
+    "precompute_distance_tables",
+    "clear_distance_tables",
+    "condensed_index",
+    "condensed_size",
+    "condensed_to_square",
+    "square_to_condensed",
+    # Search
+    "PhonemeIndex",
     # Normalization
     "normalize_glyph",
     "normalize_ipa",
@@ -6,10 +6,12 @@ against cognate data. It's used internally for testing and optimization.
 """
 
 import numpy as np
-from typing import List, Tuple, Optional, Dict
+from typing import List, Tuple, Optional, Dict, Sequence
 from dataclasses import dataclass
 
-from .distances import calculate_distance
+from .distances import build_cross_distance_matrix
+from .features import get_feature_matrix
+from .parallel import map_chunks, resolve_n_jobs, shared_arrays, split_chunks, worker_array, worker_state
 
 
 @dataclass
@@ -20,6 +22,7 @@ class AlignmentResult:
     seq2_aligned: List[str]
     distance: float
     normalized_distance: float
+    above_threshold: bool = False  # Abandoned for exceeding max_distance
     
     def __str__(self) -> str:
         seq1 = ' '.join(self.seq1_aligned)
@@ -32,7 +35,10 @@ def align_sequences(
     seq2: List[str],
     method: str = 'hamming',
     gap_penalty: float = 1.0,
-    normalize: bool = True
+    normalize: bool = True,
+    band: Optional[int] = None,
+    max_distance: Optional[float] = None,
+    system: Optional[str] = None
 ) -> AlignmentResult:
     """
     Align two phonetic sequences using Needleman-Wunsch algorithm.
@@ -43,112 +49,673 @@ def align_sequences(
         method: Distance method to use
         gap_penalty: Penalty for gaps
         normalize: Normalize distances
+        band: Only consider cells with |i - j| <= band (widened to the
+            length difference). Faster, but the score is an upper bound
+            when the best alignment strays outside the band.
+        max_distance: Give up on alignments whose normalized distance
+            exceeds this value, as soon as that is certain
+        system: Feature system to use (None for default)
         
     Returns:
-        AlignmentResult with aligned sequences and scores
+        AlignmentResult with aligned sequences and scores. Alignments
+        beyond max_distance have above_threshold set, infinite distances
+        and no aligned sequences.
     """
     if not seq1 or not seq2:
-        # Handle empty sequences
-        if not seq1 and not seq2:
-            return AlignmentResult(0.0, [], [], 0.0, 0.0)
-        elif not seq1:
-            gaps = ['-'] * len(seq2)
-            score = len(seq2) * gap_penalty
-            return AlignmentResult(score, gaps, seq2, score, score/max(len(seq2), 1))
+        return _check_threshold(_align_empty(seq1, seq2, gap_penalty), max_distance)
+    
+    sub = substitution_matrix(seq1, seq2, method=method, normalize=normalize, system=system)
+    aligned = _score_and_moves(sub, gap_penalty, band, max_distance)
+    if aligned is None:
+        return _above_threshold()
+    return _alignment_result(seq1, seq2, *aligned)
+
+
+def align_batch(
+    pairs: Sequence[Tuple[List[str], List[str]]],
+    method: str = 'hamming',
+    gap_penalty: float = 1.0,
+    normalize: bool = True,
+    n_jobs: Optional[int] = None,
+    band: Optional[int] = None,
+    max_distance: Optional[float] = None,
+    system: Optional[str] = None
+) -> List[AlignmentResult]:
+    """
+    Align many sequence pairs.
+    
+    Phonemes are mapped to integer ids once, and substitution costs for
+    every pair are looked up in a single distance table over all distinct
+    phonemes. With several jobs, pairs are aligned in a process pool that
+    shares the table through shared memory.
+    
+    Args:
+        pairs: Sequence of (seq1, seq2) phoneme sequence pairs
+        method: Distance method to use
+        gap_penalty: Penalty for gaps
+        normalize: Normalize distances
+        n_jobs: Number of worker processes (None for the 'n_jobs' config
+            option, -1 for all CPUs)
+        band: Diagonal band width, as for align_sequences
+        max_distance: Normalized distance cutoff, as for align_sequences
+        system: Feature system to use (None for default)
+        
+    Returns:
+        List of AlignmentResult, one per pair, as from align_sequences
+    """
+    options = {'gap_penalty': gap_penalty, 'band': band, 'max_distance': max_distance}
+    tasks, aligned = _run_batch(
+        pairs, method, normalize, system, n_jobs, options, _align_chunk, _align_chunk_worker
+    )
+    
+    results: List[Optional[AlignmentResult]] = [None] * len(pairs)
+    for k, out in zip(tasks, aligned):
+        if out is None:
+            results[k] = _above_threshold()
         else:
-            gaps = ['-'] * len(seq1)
-            score = len(seq1) * gap_penalty
-            return AlignmentResult(score, seq1, gaps, score, score/max(len(seq1), 1))
+            results[k] = _alignment_result(pairs[k][0], pairs[k][1], *out)
+    for k, (seq1, seq2) in enumerate(pairs):
+        if results[k] is None:
+            results[k] = _check_threshold(_align_empty(seq1, seq2, gap_penalty), max_distance)
     
-    m, n = len(seq1), len(seq2)
+    return results
+
+
+def alignment_distance(
+    seq1: List[str],
+    seq2: List[str],
+    method: str = 'hamming',
+    gap_penalty: float = 1.0,
+    normalize: bool = True,
+    band: Optional[int] = None,
+    max_distance: Optional[float] = None,
+    system: Optional[str] = None
+) -> float:
+    """
+    Normalized alignment distance between two sequences, without traceback.
     
-    # Initialize DP matrix
-    dp = np.zeros((m + 1, n + 1))
+    Gives the same value as align_sequences(...).normalized_distance, but
+    only keeps the last two anti-diagonals of the table and builds no
+    aligned sequences. Substitution costs are gathered per diagonal from a
+    table over the distinct phonemes, so memory is O(min(m, n)) beyond
+    that table.
     
-    # Initialize with gap penalties
-    for i in range(1, m + 1):
-        dp[i][0] = i * gap_penalty
-    for j in range(1, n + 1):
-        dp[0][j] = j * gap_penalty
+    Args:
+        seq1: First sequence of phonemes
+        seq2: Second sequence of phonemes
+        method: Distance method to use
+        gap_penalty: Penalty for gaps
+        normalize: Normalize distances
+        band: Diagonal band width, as for align_sequences
+        max_distance: Normalized distance cutoff, as for align_sequences
+        system: Feature system to use (None for default)
+        
+    Returns:
+        Normalized distance, or inf if it exceeds max_distance
+    """
+    if not seq1 or not seq2:
+        return _check_threshold(_align_empty(seq1, seq2, gap_penalty), max_distance).normalized_distance
     
-    # Fill DP matrix
-    for i in range(1, m + 1):
-        for j in range(1, n + 1):
-            # Calculate substitution cost
-            dist = calculate_distance(
-                seq1[i-1], seq2[j-1], 
-                method=method, 
-                normalize=normalize,
-                on_error='ignore'
-            )
-            if dist is None:
-                dist = 1.0 if normalize else 2.0
-            
-            # Take minimum of three operations
-            dp[i][j] = min(
-                dp[i-1][j-1] + dist,  # Substitution
-                dp[i-1][j] + gap_penalty,  # Deletion
-                dp[i][j-1] + gap_penalty   # Insertion
+    vocabulary1 = {p: k for k, p in enumerate(dict.fromkeys(seq1))}
+    vocabulary2 = {p: k for k, p in enumerate(dict.fromkeys(seq2))}
+    table = substitution_matrix(
+        list(vocabulary1), list(vocabulary2), method=method, normalize=normalize, system=system
+    )
+    ids1 = np.array([vocabulary1[p] for p in seq1], dtype=np.intp)
+    ids2 = np.array([vocabulary2[p] for p in seq2], dtype=np.intp)
+    return _distance_only(table, ids1, ids2, gap_penalty, band, max_distance)
+
+
+def alignment_distances(
+    pairs: Sequence[Tuple[List[str], List[str]]],
+    method: str = 'hamming',
+    gap_penalty: float = 1.0,
+    normalize: bool = True,
+    n_jobs: Optional[int] = None,
+    band: Optional[int] = None,
+    max_distance: Optional[float] = None,
+    system: Optional[str] = None
+) -> np.ndarray:
+    """
+    Normalized alignment distances for many sequence pairs, without traceback.
+    
+    Batch version of alignment_distance, sharing the id encoding, distance
+    table and process pool of align_batch.
+    
+    Args:
+        pairs: Sequence of (seq1, seq2) phoneme sequence pairs
+        method: Distance method to use
+        gap_penalty: Penalty for gaps
+        normalize: Normalize distances
+        n_jobs: Number of worker processes (None for the 'n_jobs' config option)
+        band: Diagonal band width, as for align_sequences
+        max_distance: Normalized distance cutoff, as for align_sequences
+        system: Feature system to use (None for default)
+        
+    Returns:
+        Array with one normalized distance per pair (inf beyond max_distance)
+    """
+    options = {'gap_penalty': gap_penalty, 'band': band, 'max_distance': max_distance}
+    tasks, distances = _run_batch(
+        pairs, method, normalize, system, n_jobs, options,
+        _distance_chunk, _distance_chunk_worker
+    )
+    
+    result = np.empty(len(pairs))
+    for k, (seq1, seq2) in enumerate(pairs):
+        if not seq1 or not seq2:
+            result[k] = _check_threshold(
+                _align_empty(seq1, seq2, gap_penalty), max_distance
+            ).normalized_distance
+    result[tasks] = distances
+    
+    return result
+
+
+def _run_batch(
+    pairs: Sequence[Tuple[List[str], List[str]]],
+    method: str,
+    normalize: bool,
+    system: Optional[str],
+    n_jobs: Optional[int],
+    options: Dict,
+    chunk_func,
+    worker_func
+) -> Tuple[List[int], List]:
+    """
+    Encode pairs against one vocabulary distance table and process them.
+    
+    Returns:
+        Tuple of (indices of pairs with no empty side, their outputs)
+    """
+    vocabulary: Dict[str, int] = {}
+    
+    def encode(seq: List[str]) -> np.ndarray:
+        return np.array([vocabulary.setdefault(p, len(vocabulary)) for p in seq], dtype=np.intp)
+    
+    encoded = [(encode(seq1), encode(seq2)) for seq1, seq2 in pairs]
+    
+    phonemes = list(vocabulary)
+    table = substitution_matrix(
+        phonemes, phonemes, method=method, normalize=normalize, system=system
+    )
+    
+    # Pairs with an empty side need no dynamic programming
+    tasks = [k for k, (ids1, ids2) in enumerate(encoded) if len(ids1) and len(ids2)]
+    work = [encoded[k] for k in tasks]
+    
+    n_jobs = resolve_n_jobs(n_jobs)
+    if n_jobs > 1 and len(work) > 1:
+        with shared_arrays(table=table) as arrays:
+            outputs = map_chunks(
+                worker_func, split_chunks(work, n_jobs), n_jobs,
+                arrays=arrays, state=options
             )
+        return tasks, [out for chunk in outputs for out in chunk]
     
-    # Traceback to get alignment
+    return tasks, chunk_func(table, work, **options)
+
+
+def _align_empty(seq1: List[str], seq2: List[str], gap_penalty: float) -> AlignmentResult:
+    """Alignment where at least one sequence is empty."""
+    if not seq1 and not seq2:
+        return AlignmentResult(0.0, [], [], 0.0, 0.0)
+    elif not seq1:
+        gaps = ['-'] * len(seq2)
+        score = len(seq2) * gap_penalty
+        return AlignmentResult(score, gaps, seq2, score, score/max(len(seq2), 1))
+    else:
+        gaps = ['-'] * len(seq1)
+        score = len(seq1) * gap_penalty
+        return AlignmentResult(score, seq1, gaps, score, score/max(len(seq1), 1))
+
+
+def _above_threshold() -> AlignmentResult:
+    """Result for an alignment abandoned beyond max_distance."""
+    return AlignmentResult(np.inf, [], [], np.inf, np.inf, above_threshold=True)
+
+
+def _check_threshold(result: AlignmentResult, max_distance: Optional[float]) -> AlignmentResult:
+    """Replace a result beyond max_distance by an above-threshold result."""
+    if max_distance is not None and result.normalized_distance > max_distance:
+        return _above_threshold()
+    return result
+
+
+def _alignment_result(
+    seq1: List[str],
+    seq2: List[str],
+    score: float,
+    moves: bytes
+) -> AlignmentResult:
+    """Build aligned sequences from traceback moves (in forward order)."""
     aligned1, aligned2 = [], []
-    i, j = m, n
+    i = j = 0
     
-    while i > 0 or j > 0:
-        if i > 0 and j > 0:
-            dist = calculate_distance(
-                seq1[i-1], seq2[j-1],
-                method=method,
-                normalize=normalize,
-                on_error='ignore'
-            )
-            if dist is None:
-                dist = 1.0 if normalize else 2.0
-            
-            if dp[i][j] == dp[i-1][j-1] + dist:
-                aligned1.append(seq1[i-1])
-                aligned2.append(seq2[j-1])
-                i -= 1
-                j -= 1
-            elif dp[i][j] == dp[i-1][j] + gap_penalty:
-                aligned1.append(seq1[i-1])
-                aligned2.append('-')
-                i -= 1
-            else:
-                aligned1.append('-')
-                aligned2.append(seq2[j-1])
-                j -= 1
-        elif i > 0:
-            aligned1.append(seq1[i-1])
+    for move in moves:
+        if move == _DIAG:
+            aligned1.append(seq1[i])
+            aligned2.append(seq2[j])
+            i += 1
+            j += 1
+        elif move == _UP:
+            aligned1.append(seq1[i])
             aligned2.append('-')
-            i -= 1
+            i += 1
         else:
             aligned1.append('-')
-            aligned2.append(seq2[j-1])
-            j -= 1
-    
-    # Reverse alignments
-    aligned1.reverse()
-    aligned2.reverse()
-    
-    # Calculate final score
-    final_score = dp[m][n]
-    normalized_score = final_score / max(m, n)
+            aligned2.append(seq2[j])
+            j += 1
     
     return AlignmentResult(
-        score=final_score,
+        score=score,
         seq1_aligned=aligned1,
         seq2_aligned=aligned2,
-        distance=final_score,
-        normalized_distance=normalized_score
+        distance=score,
+        normalized_distance=score / max(len(seq1), len(seq2))
     )
 
 
+def _score_and_moves(
+    sub: np.ndarray,
+    gap_penalty: float,
+    band: Optional[int] = None,
+    max_distance: Optional[float] = None
+) -> Optional[Tuple[float, bytes]]:
+    """
+    Alignment score and traceback moves for a substitution cost matrix.
+    
+    Returns:
+        Tuple of (score, moves in forward order), or None if the normalized
+        distance exceeds max_distance
+    """
+    m, n = sub.shape
+    if band is not None:
+        band = max(band, abs(m - n))
+    
+    cutoff = None
+    if max_distance is not None and gap_penalty >= 0 and sub.min() >= 0:
+        # Partial scores only bound the final score when no cost is negative
+        cutoff = max_distance * max(m, n)
+    
+    filled = _fill_alignment(sub, gap_penalty, band, cutoff)
+    if filled is None:
+        return None
+    dp, pointers = filled
+    if max_distance is not None and dp[m, n] / max(m, n) > max_distance:
+        return None
+    
+    # Traceback over the stored moves
+    moves = bytearray()
+    i, j = m, n
+    while i > 0 or j > 0:
+        move = pointers[i, j]
+        moves.append(move)
+        if move == _DIAG:
+            i -= 1
+            j -= 1
+        elif move == _UP:
+            i -= 1
+        else:
+            j -= 1
+    
+    moves.reverse()
+    return dp[m, n], bytes(moves)
+
+
+def _align_chunk(
+    table: np.ndarray,
+    work: Sequence[Tuple[np.ndarray, np.ndarray]],
+    gap_penalty: float,
+    band: Optional[int] = None,
+    max_distance: Optional[float] = None
+) -> List[Optional[Tuple[float, bytes]]]:
+    """Align id-encoded pairs with costs from a vocabulary distance table."""
+    return [
+        _score_and_moves(table[ids1[:, None], ids2], gap_penalty, band, max_distance)
+        for ids1, ids2 in work
+    ]
+
+
+def _align_chunk_worker(
+    work: Sequence[Tuple[np.ndarray, np.ndarray]]
+) -> List[Optional[Tuple[float, bytes]]]:
+    """Process pool entry point for _align_chunk."""
+    return _align_chunk(
+        worker_array('table'), work,
+        gap_penalty=worker_state('gap_penalty'),
+        band=worker_state('band'),
+        max_distance=worker_state('max_distance')
+    )
+
+
+def _distance_only(
+    table: np.ndarray,
+    ids1: np.ndarray,
+    ids2: np.ndarray,
+    gap_penalty: float,
+    band: Optional[int] = None,
+    max_distance: Optional[float] = None
+) -> float:
+    """Normalized alignment distance of id-encoded sequences (inf beyond max_distance)."""
+    m, n = len(ids1), len(ids2)
+    if band is not None:
+        band = max(band, abs(m - n))
+    
+    cutoff = None
+    if max_distance is not None and gap_penalty >= 0:
+        # Partial scores only bound the final score when no cost is negative
+        if table[np.ix_(np.unique(ids1), np.unique(ids2))].min() >= 0:
+            cutoff = max_distance * max(m, n)
+    
+    score = _alignment_score(table, ids1, ids2, gap_penalty, band, cutoff)
+    if score is None:
+        return np.inf
+    distance = score / max(m, n)
+    if max_distance is not None and distance > max_distance:
+        return np.inf
+    return distance
+
+
+def _distance_chunk(
+    table: np.ndarray,
+    work: Sequence[Tuple[np.ndarray, np.ndarray]],
+    gap_penalty: float,
+    band: Optional[int] = None,
+    max_distance: Optional[float] = None
+) -> List[float]:
+    """Alignment distances of id-encoded pairs from a vocabulary distance table."""
+    return [
+        _distance_only(table, ids1, ids2, gap_penalty, band, max_distance)
+        for ids1, ids2 in work
+    ]
+
+
+def _distance_chunk_worker(work: Sequence[Tuple[np.ndarray, np.ndarray]]) -> List[float]:
+    """Process pool entry point for _distance_chunk."""
+    return _distance_chunk(
+        worker_array('table'), work,
+        gap_penalty=worker_state('gap_penalty'),
+        band=worker_state('band'),
+        max_distance=worker_state('max_distance')
+    )
+
+
+def substitution_matrix(
+    seq1: List[str],
+    seq2: List[str],
+    method: str = 'hamming',
+    normalize: bool = True,
+    system: Optional[str] = None
+) -> np.ndarray:
+    """
+    Substitution costs between every segment of two sequences.
+    
+    Each distinct phoneme pair is computed once, in a single vectorized
+    call. Phonemes missing from the feature system cost 1.0 (2.0 when
+    not normalized).
+    
+    Args:
+        seq1: First sequence of phonemes
+        seq2: Second sequence of phonemes
+        method: Distance method to use
+        normalize: Normalize distances
+        system: Feature system to use (None for default)
+        
+    Returns:
+        (len(seq1) x len(seq2)) array of substitution costs
+    """
+    store = get_feature_matrix(system)
+    unique1 = list(dict.fromkeys(seq1))
+    unique2 = list(dict.fromkeys(seq2))
+    
+    costs, _, _ = build_cross_distance_matrix(
+        unique1, unique2, method=method, normalize=normalize, system=system
+    )
+    missing = 1.0 if normalize else 2.0
+    costs[[p not in store for p in unique1], :] = missing
+    costs[:, [p not in store for p in unique2]] = missing
+    
+    position1 = {p: k for k, p in enumerate(unique1)}
+    position2 = {p: k for k, p in enumerate(unique2)}
+    return costs[np.ix_([position1[p] for p in seq1], [position2[p] for p in seq2])]
+
+
+# Traceback moves
+_DIAG, _UP, _LEFT = 0, 1, 2
+
+
+def _fill_alignment(
+    sub: np.ndarray,
+    gap_penalty: float,
+    band: Optional[int] = None,
+    cutoff: Optional[float] = None
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Fill the Needleman-Wunsch table one anti-diagonal at a time.
+    
+    Cells on an anti-diagonal only depend on the two previous ones, so each
+    diagonal is a single vectorized step. In the flattened (m+1) x (n+1)
+    table, cell (i, d - i) sits at i * n + d, which makes every diagonal
+    (and its diagonal, upper and left neighbours) a slice with stride n.
+    
+    Args:
+        sub: (m x n) substitution costs
+        gap_penalty: Penalty for gaps
+        band: Only fill cells with |i - j| <= band (others stay infinite)
+        cutoff: Stop once the final score is certain to exceed this. Every
+            path visits one of any two consecutive anti-diagonals, so with
+            non-negative costs the score is at least their smaller minimum.
+        
+    Returns:
+        Tuple of ((m+1) x (n+1) score table, traceback moves), or None if
+        abandoned at the cutoff
+    """
+    m, n = sub.shape
+    if m * n <= _SCALAR_FILL_CELLS:
+        return _fill_alignment_scalar(sub, gap_penalty, band, cutoff)
+    
+    width = max(m, n) if band is None else band
+    dp = np.full((m + 1, n + 1), np.inf)
+    pointers = np.full((m + 1, n + 1), _LEFT, dtype=np.int8)
+    
+    # Initialize with gap penalties
+    edge = np.arange(max(m, n) + 1) * gap_penalty
+    dp[:min(m, width) + 1, 0] = edge[:min(m, width) + 1]
+    dp[0, :min(n, width) + 1] = edge[:min(n, width) + 1]
+    pointers[1:, 0] = _UP
+    
+    costs = np.zeros((m + 1, n + 1))
+    costs[1:, 1:] = sub
+    
+    flat_dp = dp.reshape(-1)
+    flat_costs = costs.reshape(-1)
+    flat_pointers = pointers.reshape(-1)
+    previous_min = np.inf
+    
+    for d in range(2, m + n + 1):
+        # Inner cells of this diagonal, restricted to the band |2i - d| <= width
+        lo = max(1, d - n, (d - width + 1) // 2)
+        hi = min(m, d - 1, (d + width) // 2)
+        start, stop = lo * n + d, hi * n + d + 1
+        
+        # Take minimum of three operations
+        diag = flat_dp[start - n - 2:stop - n - 2:n] + flat_costs[start:stop:n]  # Substitution
+        up = flat_dp[start - n - 1:stop - n - 1:n] + gap_penalty  # Deletion
+        left = flat_dp[start - 1:stop - 1:n] + gap_penalty  # Insertion
+        best = np.minimum(np.minimum(diag, up), left)
+        
+        flat_dp[start:stop:n] = best
+        flat_pointers[start:stop:n] = np.where(
+            diag == best, _DIAG, np.where(up == best, _UP, _LEFT)
+        )
+        
+        if cutoff is not None:
+            # Include the edge cells (0, d) and (d, 0) of the diagonal
+            has_edge = d <= width and d <= max(m, n)
+            current_min = min(best.min(initial=np.inf), d * gap_penalty if has_edge else np.inf)
+            if min(current_min, previous_min) > cutoff:
+                return None
+            previous_min = current_min
+    
+    return dp, pointers
+
+
+# Below this many cells, per-diagonal NumPy overhead outweighs a plain loop
+_SCALAR_FILL_CELLS = 900
+
+
+def _fill_alignment_scalar(
+    sub: np.ndarray,
+    gap_penalty: float,
+    band: Optional[int] = None,
+    cutoff: Optional[float] = None
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Fill a small Needleman-Wunsch table cell by cell, as _fill_alignment.
+    
+    Every path crosses every row, so the cutoff is checked once per row.
+    """
+    m, n = sub.shape
+    width = max(m, n) if band is None else band
+    costs = sub.tolist()
+    dp = [[np.inf] * (n + 1) for _ in range(m + 1)]
+    pointers = [[_LEFT] * (n + 1) for _ in range(m + 1)]
+    
+    for j in range(min(n, width) + 1):
+        dp[0][j] = j * gap_penalty
+    for i in range(1, m + 1):
+        if i <= width:
+            dp[i][0] = i * gap_penalty
+        pointers[i][0] = _UP
+        
+        prev, row, cost_row, moves = dp[i-1], dp[i], costs[i-1], pointers[i]
+        for j in range(max(1, i - width), min(n, i + width) + 1):
+            diag = prev[j-1] + cost_row[j-1]
+            up = prev[j] + gap_penalty
+            left = row[j-1] + gap_penalty
+            best = min(diag, up, left)
+            row[j] = best
+            moves[j] = _DIAG if diag == best else (_UP if up == best else _LEFT)
+        
+        if cutoff is not None and min(row) > cutoff:
+            return None
+    
+    return np.array(dp), np.array(pointers, dtype=np.int8)
+
+
+def _alignment_score(
+    table: np.ndarray,
+    ids1: np.ndarray,
+    ids2: np.ndarray,
+    gap_penalty: float,
+    band: Optional[int] = None,
+    cutoff: Optional[float] = None
+) -> Optional[float]:
+    """
+    Final Needleman-Wunsch score, keeping only the last two anti-diagonals.
+    
+    The sequences are swapped if needed so the shorter one runs along the
+    diagonals, whose cells are stored by row index i. Swapping exchanges
+    the up and left moves, which leaves every cell's score unchanged, so
+    the result equals _fill_alignment's (and uses its band and cutoff rules).
+    Each diagonal's costs are gathered from the table through the id
+    arrays, so no (m x n) cost matrix is built.
+    
+    Returns:
+        Final score, or None if abandoned at the cutoff
+    """
+    if len(ids1) * len(ids2) <= _SCALAR_FILL_CELLS:
+        return _alignment_score_scalar(table[ids1[:, None], ids2], gap_penalty, band, cutoff)
+    
+    table = np.ascontiguousarray(table)
+    row_stride, col_stride = table.shape[1], 1
+    if len(ids1) > len(ids2):
+        ids1, ids2 = ids2, ids1
+        row_stride, col_stride = col_stride, row_stride
+    m, n = len(ids1), len(ids2)
+    
+    width = max(m, n) if band is None else band
+    
+    # Offsets into the flat table; the column part is reversed so that it
+    # runs forwards as i increases along a diagonal
+    flat_table = table.reshape(-1)
+    row_offsets = ids1 * row_stride
+    col_offsets = ids2[::-1] * col_stride
+    
+    # Diagonals d - 2, d - 1 and d, indexed by i
+    before = np.full(m + 1, np.inf)
+    previous = np.full(m + 1, np.inf)
+    current = np.full(m + 1, np.inf)
+    before[0] = 0.0
+    previous[0] = gap_penalty if width >= 1 else np.inf
+    previous[1] = gap_penalty if width >= 1 else np.inf
+    previous_min = min(previous[0], previous[1])
+    
+    for d in range(2, m + n + 1):
+        lo = max(1, d - n, (d - width + 1) // 2)
+        hi = min(m, d - 1, (d + width) // 2)
+        
+        current.fill(np.inf)
+        if hi >= lo:
+            # Cost of cell (i, d - i) is that of ids1[i - 1] against ids2[d - i - 1]
+            costs = flat_table[row_offsets[lo - 1:hi] + col_offsets[n - d + lo:n - d + hi + 1]]
+            
+            diag = before[lo - 1:hi] + costs  # Substitution
+            up = previous[lo - 1:hi] + gap_penalty  # Deletion
+            left = previous[lo:hi + 1] + gap_penalty  # Insertion
+            current[lo:hi + 1] = np.minimum(np.minimum(diag, up), left)
+        
+        # Edge cells (0, d) and (d, 0)
+        if d <= width:
+            if d <= n:
+                current[0] = d * gap_penalty
+            if d <= m:
+                current[d] = d * gap_penalty
+        
+        if cutoff is not None:
+            current_min = current.min()
+            if min(current_min, previous_min) > cutoff:
+                return None
+            previous_min = current_min
+        
+        before, previous, current = previous, current, before
+    
+    return previous[m]
+
+
+def _alignment_score_scalar(
+    sub: np.ndarray,
+    gap_penalty: float,
+    band: Optional[int] = None,
+    cutoff: Optional[float] = None
+) -> Optional[float]:
+    """Final score of a small table, two rows at a time, as _fill_alignment_scalar."""
+    m, n = sub.shape
+    width = max(m, n) if band is None else band
+    costs = sub.T.tolist()  # Rows along the longer sequence
+    
+    prev = [j * gap_penalty if j <= width else np.inf for j in range(m + 1)]
+    row = [np.inf] * (m + 1)
+    for j in range(1, n + 1):
+        row[0] = j * gap_penalty if j <= width else np.inf
+        cost_row = costs[j-1]
+        for i in range(max(1, j - width), min(m, j + width) + 1):
+            row[i] = min(prev[i-1] + cost_row[i-1], prev[i] + gap_penalty, row[i-1] + gap_penalty)
+        
+        if cutoff is not None and min(row) > cutoff:
+            return None
+        prev, row = row, [np.inf] * (m + 1)
+    
+    return prev[m]
+
+
 def align_cognate_set(
     cognates: List[List[str]],
     method: str = 'hamming',
-    gap_penalty: float = 1.0
+    gap_penalty: float = 1.0,
+    n_jobs: Optional[int] = None,
+    system: Optional[str] = None
 ) -> float:
     """
     Calculate average pairwise alignment distance within a cognate set.
@@ -157,6 +724,8 @@ def align_cognate_set(
         cognates: List of cognate sequences
         method: Distance method
         gap_penalty: Gap penalty
+        n_jobs: Number of worker processes (None for the 'n_jobs' config option)
+        system: Feature system to use (None for default)
         
     Returns:
         Average normalized distance between cognates
@@ -164,24 +733,24 @@ def align_cognate_set(
     if len(cognates) < 2:
         return 0.0
     
-    distances = []
-    
-    for i in range(len(cognates)):
-        for j in range(i + 1, len(cognates)):
-            result = align_sequences(
-                cognates[i], cognates[j],
-                method=method,
-                gap_penalty=gap_penalty
-            )
-            distances.append(result.normalized_distance)
+    pairs = [
+        (cognates[i], cognates[j])
+        for i in range(len(cognates))
+        for j in range(i + 1, len(cognates))
+    ]
+    distances = alignment_distances(
+        pairs, method=method, gap_penalty=gap_penalty, n_jobs=n_jobs, system=system
+    )
     
-    return np.mean(distances) if distances else 0.0
+    return np.mean(distances) if len(distances) else 0.0
 
 
 def optimize_from_cognates(
     cognate_sets: List[List[List[str]]],
     method: str = 'hamming',
-    gap_penalty: float = 1.0
+    gap_penalty: float = 1.0,
+    n_jobs: Optional[int] = None,
+    system: Optional[str] = None
 ) -> Dict[str, float]:
     """
     Optimize distance parameters using cognate data.
@@ -193,40 +762,50 @@ def optimize_from_cognates(
         cognate_sets: List of cognate sets, each containing aligned words
         method: Distance method
         gap_penalty: Gap penalty
+        n_jobs: Number of worker processes (None for the 'n_jobs' config option)
+        system: Feature system to use (None for default)
         
     Returns:
         Dictionary with optimization statistics
     """
-    intra_distances = []  # Distances within cognate sets
-    inter_distances = []  # Distances between different sets
-    
-    # Calculate intra-cognate distances
+    # Collect every pair first so all alignments run as one batch
+    intra_pairs = []  # Pairs within cognate sets
+    set_sizes = []  # Number of intra pairs per set
     for cognate_set in cognate_sets:
         if len(cognate_set) >= 2:
-            avg_dist = align_cognate_set(cognate_set, method, gap_penalty)
-            intra_distances.append(avg_dist)
+            n = len(cognate_set)
+            intra_pairs.extend(
+                (cognate_set[i], cognate_set[j]) for i in range(n) for j in range(i + 1, n)
+            )
+            set_sizes.append(n * (n - 1) // 2)
     
-    # Sample inter-cognate distances
+    # Sample inter-cognate pairs
+    inter_pairs = []
     n_samples = min(100, len(cognate_sets) * (len(cognate_sets) - 1) // 2)
-    sampled = 0
     
     for i in range(len(cognate_sets)):
-        if sampled >= n_samples:
+        if len(inter_pairs) >= n_samples:
             break
         for j in range(i + 1, len(cognate_sets)):
-            if sampled >= n_samples:
+            if len(inter_pairs) >= n_samples:
                 break
             
             # Compare first word from each set
             if cognate_sets[i] and cognate_sets[j]:
-                result = align_sequences(
-                    cognate_sets[i][0],
-                    cognate_sets[j][0],
-                    method=method,
-                    gap_penalty=gap_penalty
-                )
-                inter_distances.append(result.normalized_distance)
-                sampled += 1
+                inter_pairs.append((cognate_sets[i][0], cognate_sets[j][0]))
+    
+    distances = alignment_distances(
+        intra_pairs + inter_pairs, method=method, gap_penalty=gap_penalty,
+        n_jobs=n_jobs, system=system
+    )
+    
+    # Average distance within each cognate set
+    intra_distances = []
+    start = 0
+    for size in set_sizes:
+        intra_distances.append(np.mean(distances[start:start + size]))
+        start += size
+    inter_distances = distances[len(intra_pairs):].tolist()
     
     # Calculate statistics
     stats = {
@@ -0,0 +1,216 @@
+"""
+Bounded cache for pairwise phoneme distances.
+
+Replaces a plain functools.lru_cache on calculate_distance: entries are
+keyed by feature system, method options and an unordered pair of feature
+matrix rows, so (a, b) and (b, a) share a slot, and the size follows the
+'cache_size' config option.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from .config import get_config
+
+logger = logging.getLogger('distfeat')
+
+# Returned by DistanceCache.get for keys that are not cached
+MISSING = object()
+
+
+class CacheInfo(NamedTuple):
+    """Cache statistics (field-compatible with functools.lru_cache)."""
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    evictions: int
+
+
+class DistanceCache:
+    """
+    Thread-safe least-recently-used cache of distances.
+    
+    Keys are (system digest, method key, row1, row2) tuples; see
+    make_key. All operations take a lock, so one cache can be shared by
+    threads.
+    
+    Entries can also be reached through aliases, such as the raw arguments
+    of a call, which skip building the key. An alias points at a key, so
+    it stops matching once that entry is evicted or invalidated.
+    """
+    
+    def __init__(self, maxsize: Optional[int] = None):
+        """
+        Create a cache.
+        
+        Args:
+            maxsize: Maximum number of entries (None to follow the
+                'cache_size' config option, checked on every insert)
+        
+        Raises:
+            ValueError: If maxsize is negative
+        """
+        if maxsize is not None and maxsize < 0:
+            raise ValueError(f"maxsize must be non-negative, got {maxsize}")
+        self._maxsize = maxsize
+        self._data: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._aliases: Dict[Hashable, Hashable] = {}
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+    
+    @property
+    def maxsize(self) -> int:
+        """Current size limit."""
+        if self._maxsize is not None:
+            return self._maxsize
+        return max(0, int(get_config('cache_size') or 0))
+    
+    @staticmethod
+    def make_key(
+        digest: str,
+        method_key: Hashable,
+        row1: int,
+        row2: int,
+        symmetric: bool = True
+    ) -> Tuple:
+        """
+        Cache key for the distance between two feature matrix rows.
+        
+        Args:
+            digest: Digest of the feature system holding the rows
+            method_key: Method name, or a tuple of the name and any options
+                affecting the value
+            row1: Row of the first phoneme
+            row2: Row of the second phoneme
+            symmetric: Whether the method gives the same distance both ways,
+                so the pair can be stored unordered
+        
+        Returns:
+            Hashable key
+        """
+        if symmetric and row2 < row1:
+            row1, row2 = row2, row1
+        return (digest, method_key, row1, row2)
+    
+    def get(self, key: Hashable) -> Any:
+        """Cached value for a key, or MISSING."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+    
+    def get_alias(self, alias: Hashable) -> Any:
+        """
+        Cached value reached through an alias, or MISSING.
+        
+        Only hits are counted: callers fall back to get, which counts the miss.
+        Runs without the lock, as each dictionary operation is atomic; hits
+        counted by concurrent threads may occasionally be lost.
+        """
+        try:
+            key = self._aliases[alias]
+            value = self._data[key]
+            self._data.move_to_end(key)
+        except KeyError:  # Never cached, or evicted since
+            return MISSING
+        self._hits += 1
+        return value
+    
+    def put(self, key: Hashable, value: Any, alias: Optional[Hashable] = None) -> None:
+        """
+        Store a value, evicting least recently used entries beyond maxsize.
+        
+        Args:
+            key: Cache key (see make_key)
+            value: Value to store
+            alias: Optional second key for get_alias
+        """
+        maxsize = self.maxsize
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+            if alias is not None and key in self._data:
+                # Several aliases may share a key; drop dangling ones when they
+                # pile up, and start over if live ones alone exceed the bound
+                if len(self._aliases) >= 2 * maxsize:
+                    self._prune_aliases()
+                    if len(self._aliases) >= maxsize:
+                        self._aliases.clear()
+                self._aliases[alias] = key
+    
+    def invalidate(self, digest: str) -> int:
+        """
+        Drop all entries of one feature system.
+        
+        Args:
+            digest: Digest of the feature system (FeatureMatrix.digest)
+        
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            stale = [key for key in self._data if key[0] == digest]
+            for key in stale:
+                del self._data[key]
+            self._prune_aliases()
+        if stale:
+            logger.debug(f"Invalidated {len(stale)} cached distances for system {digest}")
+        return len(stale)
+    
+    def invalidate_method(self, method: str) -> int:
+        """
+        Drop all entries of one distance method, in every feature system.
+        
+        Args:
+            method: Method name
+        
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            stale = [key for key in self._data if _method_name(key[1]) == method]
+            for key in stale:
+                del self._data[key]
+            self._prune_aliases()
+        if stale:
+            logger.debug(f"Invalidated {len(stale)} cached distances for method '{method}'")
+        return len(stale)
+    
+    def clear(self) -> None:
+        """Drop all entries and reset the statistics."""
+        with self._lock:
+            self._data.clear()
+            self._aliases.clear()
+            self._hits = self._misses = self._evictions = 0
+    
+    def info(self) -> CacheInfo:
+        """Hit, miss and eviction counts with the current and maximum size."""
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self.maxsize, len(self._data), self._evictions
+            )
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def _prune_aliases(self) -> None:
+        """Drop aliases of evicted or invalidated entries (call with the lock held)."""
+        self._aliases = {
+            alias: key for alias, key in self._aliases.items() if key in self._data
+        }
+
+
+def _method_name(method_key: Hashable) -> Hashable:
+    """Method name of a method key (see DistanceCache.make_key)."""
+    return method_key[0] if isinstance(method_key, tuple) else method_key
\ No newline at end of file
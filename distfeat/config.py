@@ -5,7 +5,7 @@ Supports both programmatic and YAML-based configuration.
 """
 
 import logging
-import yaml
+import os
 from pathlib import Path
 from typing import Any, Dict, Optional, Union
 
@@ -19,8 +19,16 @@ _CONFIG: Dict[str, Any] = {
     'default_precision': 4,
     'cache_size': 1024,
     'kmeans_clusters': 12,
+    'kmeans_seed': 42,
+    'kmeans_disk_cache': False,  # Persist fitted k-means models in cache_dir
     'on_error': 'warn',  # 'raise', 'warn', 'ignore'
     'logging_level': 'INFO',
+    'cache_dir': None,  # None for $DISTFEAT_CACHE_DIR or ~/.cache/distfeat
+    'use_distance_tables': True,
+    'compile_features': True,  # Cache parsed feature files in cache_dir
+    'n_jobs': 1,  # Worker processes for bulk operations (-1 for all CPUs)
+    'feature_weights': None,  # Default weights (or profile name) for weighted methods
+    'weight_profiles': {},  # Named {feature: weight} mappings
 }
 
 
@@ -67,6 +75,7 @@ def load_config(path: Union[str, Path]) -> Dict[str, Any]:
     if not path.exists():
         raise FileNotFoundError(f"Config file not found: {path}")
     
+    yaml = _import_yaml()
     with open(path, 'r', encoding='utf-8') as f:
         config = yaml.safe_load(f)
     
@@ -91,6 +100,7 @@ def save_config(path: Union[str, Path]) -> None:
     """
     path = Path(path)
     
+    yaml = _import_yaml()
     with open(path, 'w', encoding='utf-8') as f:
         yaml.dump(_CONFIG, f, default_flow_style=False)
     
@@ -106,7 +116,41 @@ def reset_config() -> None:
         'default_precision': 4,
         'cache_size': 1024,
         'kmeans_clusters': 12,
+        'kmeans_seed': 42,
+        'kmeans_disk_cache': False,
         'on_error': 'warn',
         'logging_level': 'INFO',
+        'cache_dir': None,
+        'use_distance_tables': True,
+        'compile_features': True,
+        'n_jobs': 1,
+        'feature_weights': None,
+        'weight_profiles': {},
     }
-    logger.info("Configuration reset to defaults")
\ No newline at end of file
+    logger.info("Configuration reset to defaults")
+
+
+def get_cache_dir() -> Path:
+    """
+    Get the directory used for on-disk caches.
+    
+    Uses the 'cache_dir' setting if present, then the DISTFEAT_CACHE_DIR
+    environment variable, then ~/.cache/distfeat.
+    
+    Returns:
+        Cache directory path (not created)
+    """
+    cache_dir = _CONFIG.get('cache_dir') or os.environ.get('DISTFEAT_CACHE_DIR')
+    if cache_dir:
+        return Path(cache_dir).expanduser()
+    
+    return Path.home() / '.cache' / 'distfeat'
+
+
+def _import_yaml():
+    """Import PyYAML on first use, since only YAML configuration files need it."""
+    try:
+        import yaml
+    except ImportError as e:
+        raise ImportError("YAML configuration files require PyYAML: pip install pyyaml") from e
+    return yaml
\ No newline at end of file
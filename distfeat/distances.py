@@ -5,39 +5,167 @@ Provides various distance metrics for comparing phonemes and building distance m
 """
 
 import logging
-from functools import lru_cache
-from typing import Callable, Dict, List, Optional, Tuple, Union
+import math
+import multiprocessing
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
 import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.metrics import pairwise_distances
 
-from .features import phoneme_to_features, get_feature_system, get_feature_names
+from .cache import MISSING, DistanceCache
+from .config import get_cache_dir, get_config
+from .features import (
+    FeatureMatrix,
+    get_feature_matrix,
+    on_feature_system_change,
+    phoneme_to_vector,
+    popcount,
+)
+from .parallel import can_send_to_workers, map_chunks, resolve_n_jobs, shared_arrays, worker_array, worker_state
 
 logger = logging.getLogger('distfeat')
 
+
+@dataclass
+class _DistanceMethod:
+    """A registered distance function and how to call it."""
+    func: Callable
+    kind: str = 'pair'  # 'pair', 'pairwise' or 'matrix'
+    normalization: str = 'features'  # 'features', 'none' or 'kernel'
+
+
+_METHOD_KINDS = ('pair', 'pairwise', 'matrix')
+_NORMALIZATIONS = ('features', 'none', 'kernel')
+
 # Registry of distance methods
-_DISTANCE_METHODS: Dict[str, Callable] = {}
+_DISTANCE_METHODS: Dict[str, _DistanceMethod] = {}
+
+# Built-in methods taking per-feature weights
+_WEIGHTED_METHODS = ('weighted_hamming', 'weighted_euclidean', 'weighted_manhattan')
+
+# Type accepted for feature weights: vector, {feature: weight} or profile name
+FeatureWeights = Union[Sequence[float], np.ndarray, Dict[str, float], str]
+
+# Precomputed distance tables, keyed by (system digest, method, normalize)
+_DISTANCE_TABLES: Dict[Tuple[str, str, bool], np.ndarray] = {}
+_MISSING_TABLES: Set[Tuple[str, str, bool]] = set()
+
+# Bump when the on-disk table layout changes
+_TABLE_FORMAT_VERSION = 2
+
+
+@dataclass
+class _KMeansModel:
+    """K-means clustering of a full feature inventory."""
+    labels: np.ndarray  # Cluster of each feature matrix row
+    centroids: np.ndarray
+    distances: np.ndarray  # (clusters x clusters) centroid distances in [0, 1]
+
+
+@dataclass
+class _FeatureWeighting:
+    """Feature matrix scaled by a weight vector, for the weighted methods."""
+    weights: np.ndarray
+    total: float  # Sum of weights (the maximum weighted hamming distance)
+    l1: np.ndarray  # matrix * weights, for hamming and manhattan
+    l2: np.ndarray  # matrix * sqrt(weights), for euclidean
+    
+    def factor(self, method: str) -> np.ndarray:
+        """Per-feature scale applied to vectors for a weighted method."""
+        return np.sqrt(self.weights) if method == 'weighted_euclidean' else self.weights
+    
+    def scaled(self, method: str) -> np.ndarray:
+        """Precomputed scaled matrix used by a weighted method."""
+        return self.l2 if method == 'weighted_euclidean' else self.l1
+
+
+# Weighted feature matrices, keyed by (system digest, weight vector bytes);
+# each holds two float copies of the matrix, so only a few are kept
+_WEIGHTINGS = DistanceCache(maxsize=8)
+
+# Fitted k-means models, keyed by (system digest, n_clusters, seed)
+_KMEANS_MODELS: Dict[Tuple[str, int, int], _KMeansModel] = {}
+
+# Bump when the on-disk k-means model layout changes
+_KMEANS_FORMAT_VERSION = 1
+
+# Results of calculate_distance, sized by the 'cache_size' config option
+_DISTANCE_CACHE = DistanceCache()
 
 
-def register_distance_method(name: str, func: Callable) -> None:
+def register_distance_method(
+    name: str,
+    func: Callable,
+    kind: str = 'pair',
+    normalization: str = 'features'
+) -> None:
     """
     Register a custom distance method.
     
+    Batch kinds are called once per chunk of pairs instead of once per pair,
+    so they run at the speed of the built-in methods.
+    
     Args:
         name: Name for the distance method
-        func: Function that takes two feature vectors and returns a distance
+        func: Distance function, with a signature depending on kind:
+            'pair': func(vec1, vec2) -> float
+            'pairwise': func(X, Y) -> array of distances between rows X[k] and Y[k]
+            'matrix': func(X, Y) -> (len(X), len(Y)) array of all row distances
+        kind: Calling convention of func
+        normalization: What normalize=True does:
+            'features': divide distances by the number of features
+            'none': use distances as returned (already in [0, 1])
+            'kernel': pass normalize=... to func, which scales itself
+    
+    Raises:
+        ValueError: If kind or normalization is unknown
     """
-    _DISTANCE_METHODS[name] = func
+    if kind not in _METHOD_KINDS:
+        raise ValueError(f"Unknown distance method kind: {kind}. Use one of {_METHOD_KINDS}")
+    if normalization not in _NORMALIZATIONS:
+        raise ValueError(f"Unknown normalization: {normalization}. Use one of {_NORMALIZATIONS}")
+    
+    _DISTANCE_METHODS[name] = _DistanceMethod(func, kind, normalization)
+    _DISTANCE_CACHE.invalidate_method(name)  # Values of an earlier registration
     logger.info(f"Registered distance method: {name}")
 
 
-@lru_cache(maxsize=4096)
+def get_feature_weights(
+    weights: Optional[FeatureWeights] = None,
+    system: Optional[str] = None
+) -> np.ndarray:
+    """
+    Resolve feature weights for the weighted distance methods.
+    
+    Weight profiles are {feature: weight} mappings (or full weight lists)
+    under the 'weight_profiles' config option, so they can be defined in a
+    YAML file read with load_config.
+    
+    Args:
+        weights: Weight per feature in feature name order, a {feature: weight}
+            mapping (unlisted features weigh 1.0), or a profile name
+            (None for the 'feature_weights' config option, or equal weights)
+        system: Feature system the weights apply to (None for default)
+        
+    Returns:
+        Read-only array with one non-negative weight per feature
+        
+    Raises:
+        ValueError: If the profile or a feature is unknown, or the weights
+            are negative, not finite, all zero or of the wrong length
+    """
+    return _resolve_weights(get_feature_matrix(system), weights)
+
+
 def calculate_distance(
     phoneme1: str,
     phoneme2: str,
     method: str = 'hamming',
     normalize: bool = True,
     on_error: str = 'warn',
+    system: Optional[str] = None,
     **kwargs
 ) -> Optional[float]:
     """
@@ -49,45 +177,142 @@ def calculate_distance(
         method: Distance method ('hamming', 'jaccard', 'euclidean', 'cosine', 'manhattan', 'kmeans')
         normalize: Normalize distance to [0, 1] range
         on_error: Error handling - 'raise', 'warn', or 'ignore'
-        **kwargs: Additional arguments for specific methods
+        system: Feature system to use (None for default)
+        **kwargs: Additional arguments for specific methods ('n_clusters'
+            and 'seed' for k-means, 'weights' for the weighted methods)
         
     Returns:
         Distance value, or None if phonemes not found
+    
+    Results are cached per feature system, method options and unordered
+    phoneme pair (see calculate_distance.cache_info()).
     """
-    # Get feature vectors
-    features1 = phoneme_to_features(phoneme1, on_error=on_error)
-    features2 = phoneme_to_features(phoneme2, on_error=on_error)
+    # Repeated calls are answered from the raw arguments, before any
+    # resolution; options read from the config (k-means, weights) are
+    # never aliased, so only the full key below can reach them
+    if not kwargs:
+        alias = (phoneme1, phoneme2, method, normalize, system)
+        dist = _DISTANCE_CACHE.get_alias(alias)
+        if dist is not MISSING:
+            return dist
     
-    if features1 is None or features2 is None:
-        return None
+    # Resolve phonemes against the system's shared feature matrix
+    store = get_feature_matrix(system)
+    for phoneme in (phoneme1, phoneme2):
+        if phoneme not in store:
+            phoneme_to_vector(phoneme, system, on_error=on_error)  # Warn or raise
+            return None
     
-    # Convert to arrays
-    feature_names = get_feature_names()
-    vec1 = np.array([features1.get(f, 0) for f in feature_names])
-    vec2 = np.array([features2.get(f, 0) for f in feature_names])
+    row1 = store.index[phoneme1]
+    row2 = store.index[phoneme2]
     
-    # Calculate distance
-    if method == 'hamming':
-        dist = _hamming_distance(vec1, vec2, normalize)
-    elif method == 'jaccard':
-        dist = _jaccard_distance(vec1, vec2)
-    elif method == 'euclidean':
-        dist = _euclidean_distance(vec1, vec2, normalize)
-    elif method == 'cosine':
-        dist = _cosine_distance(vec1, vec2)
-    elif method == 'manhattan':
-        dist = _manhattan_distance(vec1, vec2, normalize)
-    elif method == 'kmeans':
-        n_clusters = kwargs.get('n_clusters', 12)
-        dist = _kmeans_distance(phoneme1, phoneme2, n_clusters)
-    elif method in _DISTANCE_METHODS:
-        dist = _DISTANCE_METHODS[method](vec1, vec2)
-        if normalize and method not in ['jaccard', 'cosine']:
-            dist = dist / len(vec1)
+    if method == 'kmeans':
+        n_clusters = kwargs.get('n_clusters') or get_config('kmeans_clusters')
+        seed = kwargs.get('seed')
+        method_key = (method, n_clusters, get_config('kmeans_seed') if seed is None else seed)
+    elif method in _WEIGHTED_METHODS:
+        weights = _resolve_weights(store, kwargs.get('weights'))
+        method_key = (method, normalize, weights.tobytes())
     else:
-        raise ValueError(f"Unknown distance method: {method}")
+        _check_method(method)
+        method_key = (method, normalize)
+    
+    # Built-in methods are symmetric, so both orders share one entry
+    key = _DISTANCE_CACHE.make_key(
+        store.digest, method_key, row1, row2, symmetric=method not in _DISTANCE_METHODS
+    )
+    dist = _DISTANCE_CACHE.get(key)
+    if dist is not MISSING:
+        return dist
     
-    return float(dist)
+    if method in _KERNELS:
+        # Scalar fast path; precomputed tables would hold the same value
+        dist = _pair_distance(store, row1, row2, method, normalize)
+    else:
+        rows1 = np.array([row1])
+        rows2 = np.array([row2])
+        if method == 'kmeans':
+            dist = float(_kmeans_by_row(store, rows1, rows2, n_clusters, seed)[0])
+        elif method in _WEIGHTED_METHODS:
+            dist = float(_weighted_rows(store, rows1, rows2, method, normalize, weights)[0])
+        else:
+            dist = float(_distances_by_row(store, rows1, rows2, method, normalize)[0])
+    
+    if kwargs or method == 'kmeans' or method in _WEIGHTED_METHODS:
+        _DISTANCE_CACHE.put(key, dist)
+    else:
+        _DISTANCE_CACHE.put(key, dist, alias=alias)
+    return dist
+
+
+# lru_cache-style cache controls
+calculate_distance.cache_info = _DISTANCE_CACHE.info
+calculate_distance.cache_clear = _DISTANCE_CACHE.clear
+
+
+def get_distance_cache() -> DistanceCache:
+    """Get the cache shared by calculate_distance calls."""
+    return _DISTANCE_CACHE
+
+
+def calculate_distances(
+    phonemes1: Sequence,
+    phonemes2: Optional[Sequence[str]] = None,
+    method: str = 'hamming',
+    normalize: bool = True,
+    fill_value: float = np.nan,
+    system: Optional[str] = None,
+    **kwargs
+) -> np.ndarray:
+    """
+    Calculate distances for many phoneme pairs at once.
+    
+    Phonemes are resolved to feature matrix rows once and all distances are
+    computed with the vectorized kernels, giving the same values as
+    calculate_distance.
+    
+    Args:
+        phonemes1: Sequence of (phoneme1, phoneme2) pairs, or the first
+            phoneme of each pair if phonemes2 is given
+        phonemes2: Second phoneme of each pair (same length as phonemes1)
+        method: Distance method to use
+        normalize: Normalize distances to [0, 1] range
+        fill_value: Value returned for pairs with an unknown phoneme
+        system: Feature system to use (None for default)
+        **kwargs: Additional arguments for specific methods ('weights' for
+            the weighted methods)
+        
+    Returns:
+        Array with one distance per pair
+    """
+    if phonemes2 is None:
+        pairs = list(phonemes1)
+        phonemes1 = [p1 for p1, _ in pairs]
+        phonemes2 = [p2 for _, p2 in pairs]
+    elif len(phonemes1) != len(phonemes2):
+        raise ValueError("phonemes1 and phonemes2 must have the same length")
+    
+    result = np.full(len(phonemes1), fill_value, dtype=np.float64)
+    if method != 'kmeans':
+        _check_method(method)
+    
+    # Resolve every phoneme to its row once (-1 for unknown phonemes)
+    store = get_feature_matrix(system)
+    rows1 = np.fromiter((store.index.get(p, -1) for p in phonemes1), np.intp, len(phonemes1))
+    rows2 = np.fromiter((store.index.get(p, -1) for p in phonemes2), np.intp, len(phonemes2))
+    
+    known = (rows1 >= 0) & (rows2 >= 0)
+    if method == 'kmeans':
+        n_clusters = kwargs.get('n_clusters') or get_config('kmeans_clusters')
+        result[known] = _kmeans_by_row(
+            store, rows1[known], rows2[known], n_clusters, kwargs.get('seed')
+        )
+    else:
+        result[known] = _distances_by_row(
+            store, rows1[known], rows2[known], method, normalize, kwargs.get('weights')
+        )
+    
+    return result
 
 
 def build_distance_matrix(
@@ -95,7 +320,12 @@ def build_distance_matrix(
     method: str = 'hamming',
     normalize: bool = True,
     n_clusters: Optional[int] = None,
-    cache: bool = True
+    cache: bool = True,
+    condensed: bool = False,
+    dtype: Union[str, type, np.dtype] = np.float64,
+    n_jobs: Optional[int] = None,
+    weights: Optional[FeatureWeights] = None,
+    system: Optional[str] = None
 ) -> Tuple[np.ndarray, List[str]]:
     """
     Build a distance matrix for a set of phonemes.
@@ -105,203 +335,925 @@ def build_distance_matrix(
         method: Distance method to use
         normalize: Normalize distances to [0, 1]
         n_clusters: Number of clusters for k-means method
-        cache: Cache distance calculations
+        cache: Cache distance calculations (all pairs are now computed in
+            a single vectorized pass, so this has no effect)
+        condensed: Return only the upper triangle as a flat array of
+            n*(n-1)/2 values, in scipy squareform order
+        dtype: Floating point type of the result (e.g. 'float32')
+        n_jobs: Worker processes for registered 'pair' kind methods, which
+            are evaluated pair by pair (None for the 'n_jobs' config option)
+        weights: Feature weights for the weighted methods (see
+            get_feature_weights)
+        system: Feature system to use (None for default)
         
     Returns:
         Tuple of (distance matrix, phoneme list)
     """
     # Get phoneme list
+    store = get_feature_matrix(system)
     if phonemes is None:
-        feature_system = get_feature_system()
-        phonemes = sorted(feature_system.keys())
-    
-    n = len(phonemes)
-    matrix = np.zeros((n, n))
+        phonemes = [store.phonemes[i] for i in store.sorted_rows]
     
     if method == 'kmeans':
         # Special handling for k-means clustering
-        matrix = _build_kmeans_matrix(phonemes, n_clusters or 12)
+        matrix = _build_kmeans_matrix(store, phonemes, n_clusters or get_config('kmeans_clusters'))
+        if condensed:
+            matrix = square_to_condensed(matrix)
+        return matrix.astype(dtype, copy=False), phonemes
+    
+    _check_method(method)
+    
+    rows = np.array([store.index.get(p, -1) for p in phonemes], dtype=np.intp)
+    
+    # Calculate the upper triangle over known phonemes in one pass
+    known = np.flatnonzero(rows >= 0)
+    i, j = np.triu_indices(len(known), k=1)
+    n_jobs = resolve_n_jobs(n_jobs)
+    per_pair = method in _DISTANCE_METHODS and _DISTANCE_METHODS[method].kind == 'pair'
+    parallel = per_pair and n_jobs > 1 and len(i) >= _PARALLEL_MIN_PAIRS
+    if parallel and not can_send_to_workers(_DISTANCE_METHODS[method].func):
+        # Lambdas and closures cannot reach 'spawn' or 'forkserver' workers
+        logger.warning(
+            f"Distance method '{method}' cannot be pickled for worker processes "
+            f"(start method '{multiprocessing.get_start_method()}'); computing serially"
+        )
+        parallel = False
+    if parallel:
+        dists = _parallel_custom_triu(store, rows[known], method, normalize, n_jobs)
     else:
-        # Calculate pairwise distances
-        for i in range(n):
-            for j in range(i + 1, n):
-                if cache:
-                    dist = calculate_distance(
-                        phonemes[i], phonemes[j], 
-                        method=method, normalize=normalize
-                    )
-                else:
-                    # Direct calculation without caching
-                    dist = _calculate_distance_uncached(
-                        phonemes[i], phonemes[j],
-                        method, normalize
-                    )
-                
-                if dist is not None:
-                    matrix[i, j] = matrix[j, i] = dist
-                else:
-                    # Use maximum distance for missing phonemes
-                    matrix[i, j] = matrix[j, i] = 1.0 if normalize else np.inf
+        dists = _distances_by_row(
+            store, rows[known[i]], rows[known[j]], method, normalize, weights
+        )
+    i, j = known[i], known[j]
+    
+    # Use maximum distance for missing phonemes
+    n = len(phonemes)
+    fill = 1.0 if normalize else np.inf
+    
+    if condensed:
+        matrix = np.full(n * (n - 1) // 2, fill, dtype=dtype)
+        matrix[condensed_index(n, i, j)] = dists
+    else:
+        matrix = np.full((n, n), fill, dtype=dtype)
+        matrix[i, j] = dists
+        matrix[j, i] = dists
+        np.fill_diagonal(matrix, 0.0)
     
     return matrix, phonemes
 
 
+def build_cross_distance_matrix(
+    rows: List[str],
+    cols: Optional[List[str]] = None,
+    method: str = 'hamming',
+    normalize: bool = True,
+    n_clusters: Optional[int] = None,
+    dtype: Union[str, type, np.dtype] = np.float64,
+    weights: Optional[FeatureWeights] = None,
+    system: Optional[str] = None
+) -> Tuple[np.ndarray, List[str], List[str]]:
+    """
+    Build a rectangular distance matrix between two phoneme inventories.
+    
+    Only the m x n cross distances are computed, instead of the square
+    matrix over both inventories.
+    
+    Args:
+        rows: Phonemes for the matrix rows
+        cols: Phonemes for the matrix columns (None for all in system)
+        method: Distance method to use
+        normalize: Normalize distances to [0, 1]
+        n_clusters: Number of clusters for k-means method
+        dtype: Floating point type of the result (e.g. 'float32')
+        weights: Feature weights for the weighted methods (see
+            get_feature_weights)
+        system: Feature system to use (None for default)
+        
+    Returns:
+        Tuple of (distance matrix, row phonemes, column phonemes)
+    """
+    store = get_feature_matrix(system)
+    rows = list(rows)
+    if cols is None:
+        cols = [store.phonemes[i] for i in store.sorted_rows]
+    cols = list(cols)
+    
+    if method != 'kmeans':
+        _check_method(method)
+    
+    row_idx = np.array([store.index.get(p, -1) for p in rows], dtype=np.intp)
+    col_idx = np.array([store.index.get(p, -1) for p in cols], dtype=np.intp)
+    
+    # Use maximum distance for missing phonemes
+    matrix = np.full((len(rows), len(cols)), 1.0 if normalize else np.inf, dtype=dtype)
+    
+    # Every known row/column combination, computed in one pass
+    known_r = np.flatnonzero(row_idx >= 0)
+    known_c = np.flatnonzero(col_idx >= 0)
+    i = np.repeat(known_r, len(known_c))
+    j = np.tile(known_c, len(known_r))
+    if method == 'kmeans':
+        matrix[i, j] = _kmeans_by_row(
+            store, row_idx[i], col_idx[j], n_clusters or get_config('kmeans_clusters')
+        )
+    else:
+        matrix[i, j] = _distances_by_row(
+            store, row_idx[i], col_idx[j], method, normalize, weights
+        )
+    
+    return matrix, rows, cols
+
+
+def condensed_index(
+    n: int,
+    i: Union[int, np.ndarray],
+    j: Union[int, np.ndarray]
+) -> Union[int, np.ndarray]:
+    """
+    Position of entry (i, j) in a condensed distance matrix.
+    
+    Args:
+        n: Number of phonemes in the matrix
+        i: Row index (or array of row indices)
+        j: Column index (or array of column indices), different from i
+        
+    Returns:
+        Index (or array of indices) into the condensed array
+        
+    Raises:
+        ValueError: If i == j (diagonal entries are not stored)
+    """
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    if np.any(i == j):
+        raise ValueError("Diagonal entries are not stored in condensed matrices")
+    
+    return n * i - i * (i + 1) // 2 + (j - i - 1)
+
+
+def condensed_size(length: int) -> int:
+    """
+    Number of phonemes in a condensed distance matrix.
+    
+    Args:
+        length: Length of the condensed array, n*(n-1)/2
+        
+    Returns:
+        n
+        
+    Raises:
+        ValueError: If length is not a triangular number
+    """
+    n = int(round((1 + np.sqrt(1 + 8 * length)) / 2)) if length else 1
+    if n * (n - 1) // 2 != length:
+        raise ValueError(f"Invalid condensed matrix length: {length}")
+    return n
+
+
+def condensed_to_square(condensed: np.ndarray) -> np.ndarray:
+    """
+    Expand a condensed distance matrix into a full symmetric matrix.
+    
+    Args:
+        condensed: Flat array of n*(n-1)/2 upper-triangle distances
+        
+    Returns:
+        (n, n) matrix with a zero diagonal
+    """
+    condensed = np.asarray(condensed)
+    n = condensed_size(len(condensed))
+    
+    matrix = np.zeros((n, n), dtype=condensed.dtype)
+    i, j = np.triu_indices(n, k=1)
+    matrix[i, j] = condensed
+    matrix[j, i] = condensed
+    return matrix
+
+
+def square_to_condensed(matrix: np.ndarray) -> np.ndarray:
+    """
+    Extract the upper triangle of a symmetric distance matrix.
+    
+    Args:
+        matrix: (n, n) distance matrix
+        
+    Returns:
+        Flat array of n*(n-1)/2 distances in scipy squareform order
+    """
+    matrix = np.asarray(matrix)
+    return matrix[np.triu_indices(len(matrix), k=1)]
+
+
+def precompute_distance_tables(
+    methods: Optional[List[str]] = None,
+    normalize: bool = True,
+    path: Optional[Union[str, Path]] = None,
+    system: Optional[str] = None
+) -> Path:
+    """
+    Precompute and persist full-inventory distance tables.
+    
+    Tables are written as condensed (upper-triangle) float64 .npy files
+    under a directory keyed by the feature system's content hash, and are
+    picked up automatically by calculate_distance and build_distance_matrix
+    in any process using the same cache directory.
+    
+    Args:
+        methods: Methods to precompute (None for all built-in vector methods)
+        normalize: Precompute normalized (True) or raw (False) distances
+        path: Cache directory (None for the configured cache directory)
+        system: Feature system to precompute (None for default)
+        
+    Returns:
+        Directory the tables were written to
+    """
+    store = get_feature_matrix(system)
+    if methods is None:
+        methods = list(_KERNELS)
+    
+    table_dir = _table_dir(store, path)
+    table_dir.mkdir(parents=True, exist_ok=True)
+    
+    n = len(store)
+    i, j = np.triu_indices(n, k=1)
+    
+    for method in methods:
+        if method not in _KERNELS:
+            raise ValueError(f"Cannot precompute distance method: {method}")
+        
+        # Tables are condensed and indexed by feature matrix row
+        table = _pairwise_rows(store, i, j, method, normalize)
+        
+        # Write atomically so concurrent readers never see partial files
+        target = table_dir / _table_filename(method, normalize)
+        fd, tmp_name = tempfile.mkstemp(dir=table_dir, suffix='.npy.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, table)
+        os.replace(tmp_name, target)
+        
+        key = (store.digest, method, normalize)
+        _DISTANCE_TABLES[key] = table
+        _MISSING_TABLES.discard(key)
+        logger.info(f"Saved condensed {n}x{n} '{method}' distance table to {target}")
+    
+    return table_dir
+
+
+def clear_distance_tables() -> None:
+    """Forget loaded distance tables, k-means models and weighted matrices so they are rebuilt on next use."""
+    _DISTANCE_TABLES.clear()
+    _MISSING_TABLES.clear()
+    _KMEANS_MODELS.clear()
+    _WEIGHTINGS.clear()
+    calculate_distance.cache_clear()
+
+
+@on_feature_system_change
+def _forget_system(store: FeatureMatrix) -> None:
+    """Drop cached distances, tables, k-means fits and weightings of a replaced system."""
+    _DISTANCE_CACHE.invalidate(store.digest)
+    _WEIGHTINGS.invalidate(store.digest)
+    # Other threads may be filling these caches: snapshot the keys and
+    # tolerate entries that are already gone
+    for cache in (_DISTANCE_TABLES, _KMEANS_MODELS):
+        for key in list(cache):
+            if key[0] == store.digest:
+                cache.pop(key, None)
+    for key in list(_MISSING_TABLES):
+        if key[0] == store.digest:
+            _MISSING_TABLES.discard(key)
+
+
+def _table_dir(store: FeatureMatrix, path: Optional[Union[str, Path]] = None) -> Path:
+    """Directory holding the distance tables of a feature system."""
+    base = Path(path) if path is not None else get_cache_dir()
+    return base / f'tables-v{_TABLE_FORMAT_VERSION}' / store.digest
+
+
+def _table_filename(method: str, normalize: bool) -> str:
+    """File name of a persisted distance table."""
+    return f"{method}-{'normalized' if normalize else 'raw'}.npy"
+
+
+def _get_distance_table(
+    store: FeatureMatrix,
+    method: str,
+    normalize: bool
+) -> Optional[np.ndarray]:
+    """Get a precomputed table, loading it from disk on first use."""
+    if method not in _KERNELS or not get_config('use_distance_tables'):
+        return None
+    
+    key = (store.digest, method, normalize)
+    if key in _DISTANCE_TABLES:
+        return _DISTANCE_TABLES[key]
+    if key in _MISSING_TABLES:
+        return None
+    
+    try:
+        path = _table_dir(store) / _table_filename(method, normalize)
+    except (RuntimeError, OSError) as e:
+        # No cache directory (e.g. no home directory): compute instead
+        logger.debug(f"No distance table directory: {e}")
+        _MISSING_TABLES.add(key)
+        return None
+    try:
+        # Memory-map so worker processes share one page-cached copy
+        table = np.load(path, mmap_mode='r')
+    except (OSError, ValueError):
+        _MISSING_TABLES.add(key)
+        return None
+    
+    n = len(store)
+    if table.shape != (n * (n - 1) // 2,):
+        logger.warning(f"Ignoring distance table with unexpected shape: {path}")
+        _MISSING_TABLES.add(key)
+        return None
+    
+    _DISTANCE_TABLES[key] = table
+    logger.info(f"Loaded '{method}' distance table from {path}")
+    return table
+
+
+def _distances_by_row(
+    store: FeatureMatrix,
+    rows1: np.ndarray,
+    rows2: np.ndarray,
+    method: str,
+    normalize: bool,
+    weights: Optional[FeatureWeights] = None
+) -> np.ndarray:
+    """Paired row distances, served from a precomputed table when available."""
+    if method in _WEIGHTED_METHODS:
+        return _weighted_rows(store, rows1, rows2, method, normalize, weights)
+    
+    table = _get_distance_table(store, method, normalize)
+    if table is None:
+        return _pairwise_rows(store, rows1, rows2, method, normalize)
+    
+    # Tables hold no diagonal, so identical rows are still computed
+    dists = np.empty(len(rows1))
+    same = rows1 == rows2
+    dists[~same] = table[condensed_index(len(store), rows1[~same], rows2[~same])]
+    if same.any():
+        dists[same] = _pairwise_rows(store, rows1[same], rows2[same], method, normalize)
+    return dists
+
+
 def available_distance_methods() -> List[str]:
     """Get list of available distance methods."""
     builtin = ['hamming', 'jaccard', 'euclidean', 'cosine', 'manhattan', 'kmeans']
+    builtin += list(_WEIGHTED_METHODS)
     custom = list(_DISTANCE_METHODS.keys())
     return builtin + custom
 
 
-# Distance calculation functions
+# Vectorized distance kernels
+#
+# Each kernel takes two equally shaped (pairs x features) integer arrays and
+# returns one distance per row pair, so single lookups and whole matrices
+# share the same arithmetic.
 
-def _hamming_distance(vec1: np.ndarray, vec2: np.ndarray, normalize: bool) -> float:
+def _hamming_kernel(X: np.ndarray, Y: np.ndarray, normalize: bool) -> np.ndarray:
     """Hamming distance (number of differing features)."""
-    dist = np.sum(vec1 != vec2)
+    dist = np.count_nonzero(X != Y, axis=1)
     if normalize:
-        dist = dist / len(vec1)
-    return dist
+        return dist / X.shape[1]
+    return dist.astype(np.float64)
 
 
-def _jaccard_distance(vec1: np.ndarray, vec2: np.ndarray) -> float:
+def _jaccard_kernel(X: np.ndarray, Y: np.ndarray, normalize: bool) -> np.ndarray:
     """Jaccard distance (1 - Jaccard similarity)."""
-    intersection = np.sum((vec1 == 1) & (vec2 == 1))
-    union = np.sum((vec1 == 1) | (vec2 == 1))
+    A = X == 1
+    B = Y == 1
+    intersection = np.count_nonzero(A & B, axis=1)
+    union = np.count_nonzero(A | B, axis=1)
     
-    if union == 0:
-        return 0.0
-    
-    return 1.0 - (intersection / union)
+    # Empty feature sets are identical
+    dist = np.zeros(len(X))
+    nonempty = union > 0
+    dist[nonempty] = 1.0 - (intersection[nonempty] / union[nonempty])
+    return dist
 
 
-def _euclidean_distance(vec1: np.ndarray, vec2: np.ndarray, normalize: bool) -> float:
+def _euclidean_kernel(X: np.ndarray, Y: np.ndarray, normalize: bool) -> np.ndarray:
     """Euclidean distance."""
-    dist = np.linalg.norm(vec1 - vec2)
+    diff = X - Y
+    dist = np.sqrt(np.einsum('ij,ij->i', diff, diff).astype(np.float64))
     if normalize:
         # Normalize by maximum possible distance
-        max_dist = np.sqrt(len(vec1))
-        dist = dist / max_dist
+        dist = dist / np.sqrt(X.shape[1])
     return dist
 
 
-def _cosine_distance(vec1: np.ndarray, vec2: np.ndarray) -> float:
+def _cosine_kernel(X: np.ndarray, Y: np.ndarray, normalize: bool) -> np.ndarray:
     """Cosine distance (1 - cosine similarity)."""
-    dot_product = np.dot(vec1, vec2)
-    norm1 = np.linalg.norm(vec1)
-    norm2 = np.linalg.norm(vec2)
-    
-    if norm1 == 0 or norm2 == 0:
-        return 1.0
+    dot_product = np.einsum('ij,ij->i', X, Y)
+    norm1 = np.sqrt(np.einsum('ij,ij->i', X, X).astype(np.float64))
+    norm2 = np.sqrt(np.einsum('ij,ij->i', Y, Y).astype(np.float64))
     
-    similarity = dot_product / (norm1 * norm2)
-    distance = 1.0 - similarity
+    # Zero vectors are maximally distant from everything
+    dist = np.ones(len(X))
+    nonzero = (norm1 != 0) & (norm2 != 0)
+    similarity = dot_product[nonzero] / (norm1[nonzero] * norm2[nonzero])
+    dist[nonzero] = np.maximum(0.0, 1.0 - similarity)  # Ensure non-negative
     
     # Handle floating point precision for identical vectors
-    if np.array_equal(vec1, vec2):
-        return 0.0
-    
-    return max(0.0, distance)  # Ensure non-negative
+    dist[nonzero & np.all(X == Y, axis=1)] = 0.0
+    return dist
 
 
-def _manhattan_distance(vec1: np.ndarray, vec2: np.ndarray, normalize: bool) -> float:
+def _manhattan_kernel(X: np.ndarray, Y: np.ndarray, normalize: bool) -> np.ndarray:
     """Manhattan (L1) distance."""
-    dist = np.sum(np.abs(vec1 - vec2))
+    dist = np.abs(X - Y).sum(axis=1)
     if normalize:
-        dist = dist / len(vec1)
+        return dist / X.shape[1]
+    return dist.astype(np.float64)
+
+
+def _hamming_packed(P: np.ndarray, Q: np.ndarray, n_features: int, normalize: bool) -> np.ndarray:
+    """Hamming distance over bit-packed rows (XOR + popcount)."""
+    dist = popcount(P ^ Q).sum(axis=1, dtype=np.int64)
+    if normalize:
+        return dist / n_features
+    return dist.astype(np.float64)
+
+
+def _jaccard_packed(P: np.ndarray, Q: np.ndarray, n_features: int, normalize: bool) -> np.ndarray:
+    """Jaccard distance over bit-packed rows (AND/OR + popcount)."""
+    intersection = popcount(P & Q).sum(axis=1, dtype=np.int64)
+    union = popcount(P | Q).sum(axis=1, dtype=np.int64)
+    
+    dist = np.zeros(len(P))
+    nonempty = union > 0
+    dist[nonempty] = 1.0 - (intersection[nonempty] / union[nonempty])
     return dist
 
 
-def _build_kmeans_matrix(phonemes: List[str], n_clusters: int) -> np.ndarray:
-    """Build distance matrix using k-means clustering."""
-    # Get feature vectors for all phonemes
-    feature_system = get_feature_system()
-    feature_names = get_feature_names()
+_KERNELS: Dict[str, Callable[[np.ndarray, np.ndarray, bool], np.ndarray]] = {
+    'hamming': _hamming_kernel,
+    'jaccard': _jaccard_kernel,
+    'euclidean': _euclidean_kernel,
+    'cosine': _cosine_kernel,
+    'manhattan': _manhattan_kernel,
+}
+
+# Kernels for binary systems that work on FeatureMatrix.packed words
+_PACKED_KERNELS: Dict[str, Callable[[np.ndarray, np.ndarray, int, bool], np.ndarray]] = {
+    'hamming': _hamming_packed,
+    'jaccard': _jaccard_packed,
+}
+
+
+def _pair_distance(
+    store: FeatureMatrix,
+    row1: int,
+    row2: int,
+    method: str,
+    normalize: bool
+) -> float:
+    """
+    Built-in distance between two rows, for single lookups.
     
-    vectors = []
-    valid_phonemes = []
+    Uses Python integer arithmetic on the two rows instead of the array
+    kernels, whose per-call overhead dominates for one pair. Sums are exact
+    and the floating-point steps match the kernels, so results are identical.
+    """
+    if store.is_binary:
+        return _pair_distance_packed(store, row1, row2, method, normalize)
     
-    for phoneme in phonemes:
-        if phoneme in feature_system:
-            features = feature_system[phoneme]['features']
-            vec = [features.get(f, 0) for f in feature_names]
-            vectors.append(vec)
-            valid_phonemes.append(phoneme)
+    a = store.matrix[row1].tolist()
+    b = store.matrix[row2].tolist()
+    n_features = len(a)
     
-    if not vectors:
-        return np.zeros((len(phonemes), len(phonemes)))
+    if method == 'jaccard':
+        union = sum(x == 1 or y == 1 for x, y in zip(a, b))
+        intersection = sum(x == 1 and y == 1 for x, y in zip(a, b))
+        return 1.0 - intersection / union if union else 0.0
+    if method == 'cosine':
+        norm1 = math.sqrt(sum(x * x for x in a))
+        norm2 = math.sqrt(sum(y * y for y in b))
+        if norm1 == 0 or norm2 == 0:
+            return 1.0
+        if a == b:
+            return 0.0
+        return max(0.0, 1.0 - sum(x * y for x, y in zip(a, b)) / (norm1 * norm2))
+    if method == 'euclidean':
+        dist = math.sqrt(sum((x - y) * (x - y) for x, y in zip(a, b)))
+        return dist / math.sqrt(n_features) if normalize else dist
     
-    # Perform k-means clustering
-    X = np.array(vectors)
-    kmeans = KMeans(n_clusters=min(n_clusters, len(valid_phonemes)), 
-                    random_state=42, n_init=10)
-    clusters = kmeans.fit_predict(X)
-    centroids = kmeans.cluster_centers_
+    if method == 'hamming':
+        dist = sum(x != y for x, y in zip(a, b))
+    else:  # Manhattan
+        dist = sum(abs(x - y) for x, y in zip(a, b))
+    return dist / n_features if normalize else float(dist)
+
+
+def _pair_distance_packed(
+    store: FeatureMatrix,
+    row1: int,
+    row2: int,
+    method: str,
+    normalize: bool
+) -> float:
+    """
+    _pair_distance for binary systems, from popcounts of the packed rows.
     
-    # Build distance matrix based on centroid distances
-    n = len(phonemes)
-    matrix = np.zeros((n, n))
-    
-    # Create phoneme to cluster mapping
-    phoneme_to_cluster = {p: c for p, c in zip(valid_phonemes, clusters)}
-    
-    for i, p1 in enumerate(phonemes):
-        for j, p2 in enumerate(phonemes):
-            if i == j:
-                continue
-                
-            if p1 in phoneme_to_cluster and p2 in phoneme_to_cluster:
-                c1 = phoneme_to_cluster[p1]
-                c2 = phoneme_to_cluster[p2]
-                dist = np.linalg.norm(centroids[c1] - centroids[c2])
-                # Normalize to [0, 1]
-                max_dist = np.max(pairwise_distances(centroids))
-                if max_dist > 0:
-                    dist = dist / max_dist
-                matrix[i, j] = dist
-            else:
-                # Use maximum distance for missing phonemes
-                matrix[i, j] = 1.0
+    With 0/1 values, |x - y| and (x - y)^2 are both x XOR y and x * y is
+    x AND y, so every built-in method needs only a few bit counts.
+    """
+    a = store.packed_ints[row1]
+    b = store.packed_ints[row2]
+    n_features = len(store.feature_names)
     
-    return matrix
+    if method == 'jaccard':
+        union = (a | b).bit_count()
+        return 1.0 - (a & b).bit_count() / union if union else 0.0
+    if method == 'cosine':
+        norm1 = math.sqrt(a.bit_count())
+        norm2 = math.sqrt(b.bit_count())
+        if norm1 == 0 or norm2 == 0:
+            return 1.0
+        if a == b:
+            return 0.0
+        return max(0.0, 1.0 - (a & b).bit_count() / (norm1 * norm2))
+    
+    differing = (a ^ b).bit_count()
+    if method == 'euclidean':
+        dist = math.sqrt(differing)
+        return dist / math.sqrt(n_features) if normalize else dist
+    # Hamming and Manhattan
+    return differing / n_features if normalize else float(differing)
 
 
-def _kmeans_distance(phoneme1: str, phoneme2: str, n_clusters: int) -> float:
-    """Calculate distance using k-means clustering approach."""
-    # This is a simplified version - in practice, we'd cache the clustering
-    phonemes = [phoneme1, phoneme2]
-    matrix, _ = build_distance_matrix(phonemes, method='kmeans', n_clusters=n_clusters)
-    return matrix[0, 1]
+# Number of row pairs handled per vectorized step (bounds temporary memory)
+_CHUNK_SIZE = 1 << 16
 
 
-def _calculate_distance_uncached(
-    phoneme1: str, 
-    phoneme2: str,
+def _check_method(method: str) -> None:
+    """Raise ValueError for methods that are neither built in nor registered."""
+    builtin = method in _KERNELS or method in _WEIGHTED_METHODS
+    if not builtin and method not in _DISTANCE_METHODS:
+        raise ValueError(f"Unknown distance method: {method}")
+
+
+def _custom_kernel(method: str, X: np.ndarray, Y: np.ndarray, normalize: bool) -> np.ndarray:
+    """Apply a registered distance method to each row pair."""
+    return _apply_method(_DISTANCE_METHODS[method], X, Y, normalize)
+
+
+def _apply_method(entry: _DistanceMethod, X: np.ndarray, Y: np.ndarray, normalize: bool) -> np.ndarray:
+    """Distances between paired rows X[k] and Y[k] for a registered method."""
+    kwargs = {'normalize': normalize} if entry.normalization == 'kernel' else {}
+    
+    if entry.kind == 'pair':
+        dist = np.array([entry.func(x, y, **kwargs) for x, y in zip(X, Y)], dtype=np.float64)
+    elif entry.kind == 'pairwise':
+        dist = np.asarray(entry.func(X, Y, **kwargs), dtype=np.float64).reshape(-1)
+    else:
+        # Evaluate the full matrix on distinct rows only
+        UX, ix = np.unique(X, axis=0, return_inverse=True)
+        UY, iy = np.unique(Y, axis=0, return_inverse=True)
+        dist = _method_matrix(entry, UX, UY, kwargs)[ix.reshape(-1), iy.reshape(-1)]
+    
+    if len(dist) != len(X):
+        raise ValueError(f"Distance method returned {len(dist)} distances for {len(X)} pairs")
+    if normalize and entry.normalization == 'features':
+        dist = dist / X.shape[1]
+    return dist
+
+
+def _method_matrix(entry: _DistanceMethod, X: np.ndarray, Y: np.ndarray, kwargs: Dict) -> np.ndarray:
+    """All distances between rows of X and Y from a 'matrix' kind method."""
+    matrix = np.asarray(entry.func(X, Y, **kwargs), dtype=np.float64)
+    if matrix.shape != (len(X), len(Y)):
+        raise ValueError(
+            f"Distance method returned shape {matrix.shape}, expected {(len(X), len(Y))}"
+        )
+    return matrix
+
+
+def _pairwise_rows(
+    store: FeatureMatrix,
+    rows1: np.ndarray,
+    rows2: np.ndarray,
     method: str,
     normalize: bool
-) -> Optional[float]:
-    """Calculate distance without caching (internal use)."""
-    # Get feature vectors
-    features1 = phoneme_to_features(phoneme1, on_error='ignore')
-    features2 = phoneme_to_features(phoneme2, on_error='ignore')
+) -> np.ndarray:
+    """
+    Distances between paired rows of a feature matrix.
     
-    if features1 is None or features2 is None:
-        return None
+    Args:
+        store: Feature matrix holding the vectors
+        rows1: Row indices of the first phoneme of each pair
+        rows2: Row indices of the second phoneme of each pair
+        method: Built-in or registered distance method
+        normalize: Normalize distances to [0, 1] range
+        
+    Returns:
+        Array with one distance per pair
+    """
+    result = np.empty(len(rows1))
+    entry = _DISTANCE_METHODS.get(method) if method not in _KERNELS else None
     
-    # Convert to arrays
-    feature_names = get_feature_names()
-    vec1 = np.array([features1.get(f, 0) for f in feature_names])
-    vec2 = np.array([features2.get(f, 0) for f in feature_names])
+    if entry is not None and entry.kind == 'matrix':
+        # One call over the distinct rows involved, then a gather
+        unique1, inverse1 = np.unique(rows1, return_inverse=True)
+        unique2, inverse2 = np.unique(rows2, return_inverse=True)
+        kwargs = {'normalize': normalize} if entry.normalization == 'kernel' else {}
+        matrix = _method_matrix(
+            entry,
+            store.matrix[unique1].astype(np.int64),
+            store.matrix[unique2].astype(np.int64),
+            kwargs
+        )
+        if normalize and entry.normalization == 'features':
+            matrix = matrix / store.matrix.shape[1]
+        return matrix[inverse1, inverse2]
     
-    # Calculate distance based on method
-    if method == 'hamming':
-        return _hamming_distance(vec1, vec2, normalize)
-    elif method == 'jaccard':
-        return _jaccard_distance(vec1, vec2)
-    elif method == 'euclidean':
-        return _euclidean_distance(vec1, vec2, normalize)
-    elif method == 'cosine':
-        return _cosine_distance(vec1, vec2)
-    elif method == 'manhattan':
-        return _manhattan_distance(vec1, vec2, normalize)
+    if method in _PACKED_KERNELS and store.is_binary:
+        # Bit-packed rows are small enough to process in one go
+        kernel = _PACKED_KERNELS[method]
+        packed = store.packed
+        return kernel(packed[rows1], packed[rows2], len(store.feature_names), normalize)
+    
+    for start in range(0, len(rows1), _CHUNK_SIZE):
+        stop = start + _CHUNK_SIZE
+        # Widen the compact storage type before doing arithmetic
+        X = store.matrix[rows1[start:stop]].astype(np.int64)
+        Y = store.matrix[rows2[start:stop]].astype(np.int64)
+        
+        if method in _KERNELS:
+            result[start:stop] = _KERNELS[method](X, Y, normalize)
+        else:
+            result[start:stop] = _apply_method(entry, X, Y, normalize)
+    
+    return result
+
+
+def _resolve_weights(store: FeatureMatrix, weights: Optional[FeatureWeights]) -> np.ndarray:
+    """Weight vector for the features of a store (see get_feature_weights)."""
+    feature_names = store.feature_names
+    if weights is None:
+        weights = get_config('feature_weights')
+    if weights is None:
+        return np.ones(len(feature_names))
+    
+    if isinstance(weights, str):
+        profiles = get_config('weight_profiles') or {}
+        if weights not in profiles:
+            raise ValueError(f"Unknown weight profile: {weights}")
+        weights = profiles[weights]
+    
+    if isinstance(weights, dict):
+        unknown = [f for f in weights if f not in feature_names]
+        if unknown:
+            raise ValueError(f"Unknown features in weights: {unknown}")
+        weights = [weights.get(f, 1.0) for f in feature_names]
+    
+    vector = np.array(weights, dtype=np.float64)
+    if vector.shape != (len(feature_names),):
+        raise ValueError(
+            f"Feature weights have shape {vector.shape}, expected ({len(feature_names)},)"
+        )
+    if not np.isfinite(vector).all() or (vector < 0).any() or not vector.any():
+        raise ValueError("Feature weights must be finite, non-negative and not all zero")
+    
+    vector.flags.writeable = False
+    return vector
+
+
+def _get_weighting(store: FeatureMatrix, weights: Optional[FeatureWeights]) -> _FeatureWeighting:
+    """Weighted copies of the feature matrix, computed once per weight vector."""
+    vector = _resolve_weights(store, weights)
+    key = (store.digest, vector.tobytes())
+    weighting = _WEIGHTINGS.get(key)
+    if weighting is MISSING:
+        matrix = store.matrix.astype(np.float64)
+        weighting = _FeatureWeighting(
+            weights=vector,
+            total=float(vector.sum()),
+            l1=matrix * vector,
+            l2=matrix * np.sqrt(vector)
+        )
+        _WEIGHTINGS.put(key, weighting)
+    return weighting
+
+
+def _weighted_kernel(
+    method: str,
+    X: np.ndarray,
+    Y: np.ndarray,
+    weighting: _FeatureWeighting,
+    normalize: bool
+) -> np.ndarray:
+    """
+    Weighted distances between paired rows already scaled for the method.
+    
+    Normalized distances are divided by their maximum for 0/1 features:
+    the weight total, or its square root for euclidean.
+    """
+    if method == 'weighted_euclidean':
+        diff = X - Y
+        dist = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+        scale = np.sqrt(weighting.total)
+    elif method == 'weighted_manhattan':
+        dist = np.abs(X - Y).sum(axis=1)
+        scale = weighting.total
     else:
-        return None
\ No newline at end of file
+        # Scaled values differ exactly where the features do (or weigh 0)
+        dist = (X != Y) @ weighting.weights
+        scale = weighting.total
+    
+    if normalize:
+        return dist / scale
+    return dist
+
+
+def _weighted_rows(
+    store: FeatureMatrix,
+    rows1: np.ndarray,
+    rows2: np.ndarray,
+    method: str,
+    normalize: bool,
+    weights: Optional[FeatureWeights]
+) -> np.ndarray:
+    """Weighted distances between paired rows of a feature matrix."""
+    weighting = _get_weighting(store, weights)
+    scaled = weighting.scaled(method)
+    
+    result = np.empty(len(rows1))
+    for start in range(0, len(rows1), _CHUNK_SIZE):
+        stop = start + _CHUNK_SIZE
+        result[start:stop] = _weighted_kernel(
+            method, scaled[rows1[start:stop]], scaled[rows2[start:stop]], weighting, normalize
+        )
+    return result
+
+
+def _get_kmeans_model(
+    store: FeatureMatrix,
+    n_clusters: int,
+    seed: Optional[int] = None
+) -> _KMeansModel:
+    """
+    Get the k-means clustering of a feature system's full inventory.
+    
+    The clustering is fitted once per (system, n_clusters, seed) and kept in
+    memory; with the 'kmeans_disk_cache' config option it is also persisted
+    in the cache directory and reused by later processes.
+    """
+    if seed is None:
+        seed = get_config('kmeans_seed')
+    n_clusters = min(n_clusters, len(store))
+    key = (store.digest, n_clusters, seed)
+    if key in _KMEANS_MODELS:
+        return _KMEANS_MODELS[key]
+    
+    path = None
+    if get_config('kmeans_disk_cache'):
+        try:
+            path = (get_cache_dir() / f'kmeans-v{_KMEANS_FORMAT_VERSION}' / store.digest
+                    / f'k{n_clusters}-seed{seed}.npz')
+        except (RuntimeError, OSError) as e:
+            logger.debug(f"No k-means model directory: {e}")
+    
+    labels = centroids = None
+    if path is not None:
+        try:
+            with np.load(path) as data:
+                labels, centroids = data['labels'], data['centroids']
+            if labels.shape != (len(store),) or len(centroids) > n_clusters:
+                logger.warning(f"Ignoring k-means model with unexpected shape: {path}")
+                labels = centroids = None
+        except (OSError, ValueError, KeyError):
+            labels = centroids = None
+    
+    if labels is None:
+        # scikit-learn is an optional extra and slow to import, so load it on first fit
+        try:
+            from sklearn.cluster import KMeans
+        except ImportError as e:
+            raise ImportError(
+                "The 'kmeans' method requires scikit-learn: pip install 'distfeat[ml]'"
+            ) from e
+        
+        kmeans = KMeans(n_clusters=n_clusters, random_state=seed, n_init=10)
+        labels = kmeans.fit_predict(store.matrix.astype(np.float64))
+        centroids = kmeans.cluster_centers_
+        logger.info(f"Fitted k-means model with {n_clusters} clusters over {len(store)} phonemes")
+        
+        if path is not None:
+            # Write atomically so concurrent readers never see partial files
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix='.npz.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    np.savez(f, labels=labels, centroids=centroids)
+                os.replace(tmp_name, path)
+            except OSError as e:
+                logger.debug(f"Could not write k-means model {path}: {e}")
+    
+    # All centroid distances at once, normalized to [0, 1]
+    diff = centroids[:, None, :] - centroids[None, :, :]
+    distances = np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+    max_distance = distances.max()
+    if max_distance > 0:
+        distances = distances / max_distance
+    
+    model = _KMeansModel(labels=labels, centroids=centroids, distances=distances)
+    _KMEANS_MODELS[key] = model
+    return model
+
+
+# Custom-method matrices smaller than this are not worth starting a pool for
+_PARALLEL_MIN_PAIRS = 20000
+
+
+def _parallel_custom_triu(
+    store: FeatureMatrix,
+    rows: np.ndarray,
+    method: str,
+    normalize: bool,
+    n_jobs: int
+) -> np.ndarray:
+    """
+    Upper-triangle distances of a registered 'pair' kind method, in parallel.
+    
+    The triangle is split into square tiles that are evaluated on a
+    process pool, with the feature matrix and row indices in shared memory.
+    
+    Returns:
+        Condensed distances between rows, in np.triu_indices order
+    """
+    n = len(rows)
+    size = max(32, -(-n // (2 * n_jobs)))
+    starts = range(0, n, size)
+    tiles = [(r0, min(r0 + size, n), c0, min(c0 + size, n)) for r0 in starts for c0 in starts if c0 >= r0]
+    
+    state = {'method': _DISTANCE_METHODS[method], 'normalize': normalize}
+    with shared_arrays(matrix=store.matrix, rows=rows) as arrays:
+        outputs = map_chunks(_custom_tile_worker, tiles, n_jobs, arrays=arrays, state=state)
+    
+    dists = np.empty(n * (n - 1) // 2)
+    for (r0, r1, c0, c1), values in zip(tiles, outputs):
+        i, j = _tile_pairs(r0, r1, c0, c1)
+        dists[condensed_index(n, i, j)] = values
+    
+    logger.info(f"Built '{method}' distances for {n} phonemes in {len(tiles)} tiles")
+    return dists
+
+
+def _tile_pairs(r0: int, r1: int, c0: int, c1: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Pairs (i, j) with i < j in a tile of the matrix."""
+    i, j = np.meshgrid(np.arange(r0, r1), np.arange(c0, c1), indexing='ij')
+    upper = i < j
+    return i[upper], j[upper]
+
+
+def _custom_tile_worker(tile: Tuple[int, int, int, int]) -> np.ndarray:
+    """Process pool entry point evaluating a registered method over one tile."""
+    matrix, rows = worker_array('matrix'), worker_array('rows')
+    i, j = _tile_pairs(*tile)
+    
+    # Same conversion and normalization as the serial path
+    X = matrix[rows[i]].astype(np.int64)
+    Y = matrix[rows[j]].astype(np.int64)
+    return _apply_method(worker_state('method'), X, Y, worker_state('normalize'))
+
+
+def _build_kmeans_matrix(
+    store: FeatureMatrix,
+    phonemes: List[str],
+    n_clusters: int,
+    seed: Optional[int] = None
+) -> np.ndarray:
+    """Build distance matrix using k-means clustering."""
+    rows = np.array([store.index.get(p, -1) for p in phonemes], dtype=np.intp)
+    known = rows >= 0
+    
+    if not known.any():
+        return np.zeros((len(phonemes), len(phonemes)))
+    
+    # Clusters come from the whole inventory, so distances agree across calls
+    model = _get_kmeans_model(store, n_clusters, seed)
+    clusters = model.labels[rows[known]]
+    
+    # Look every pair up in the centroid distance table in one step
+    n = len(phonemes)
+    matrix = np.ones((n, n))  # Maximum distance for missing phonemes
+    matrix[np.ix_(known, known)] = model.distances[np.ix_(clusters, clusters)]
+    np.fill_diagonal(matrix, 0.0)
+    
+    return matrix
+
+
+def _kmeans_by_row(
+    store: FeatureMatrix,
+    rows1: np.ndarray,
+    rows2: np.ndarray,
+    n_clusters: int,
+    seed: Optional[int] = None
+) -> np.ndarray:
+    """Paired row distances between k-means cluster centroids."""
+    model = _get_kmeans_model(store, n_clusters, seed)
+    return model.distances[model.labels[rows1], model.labels[rows2]]
\ No newline at end of file
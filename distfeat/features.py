@@ -5,22 +5,296 @@ Core functionality for converting between phonemes and feature vectors.
 """
 
 import csv
+import hashlib
 import importlib.resources as resources
+import io
+import json
 import logging
-from functools import lru_cache
+import os
+import tempfile
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 import numpy as np
 
+from .config import get_cache_dir, get_config
+
 logger = logging.getLogger('distfeat')
 
+
+@dataclass
+class FeatureMatrix:
+    """
+    Dense array representation of a feature system.
+    
+    Feature values are kept in a single contiguous (phonemes x features)
+    integer array, with a phoneme -> row index for lookups. Rows follow the
+    order in which phonemes were read from the source file.
+    """
+    matrix: np.ndarray
+    phonemes: List[str]
+    feature_names: List[str]
+    descriptions: List[str]
+    custom: bool = False
+    index: Dict[str, int] = field(init=False, repr=False)
+    
+    def __post_init__(self) -> None:
+        self.matrix = np.ascontiguousarray(self.matrix)
+        self.matrix.setflags(write=False)
+        self.index = {p: i for i, p in enumerate(self.phonemes)}
+    
+    def __len__(self) -> int:
+        return len(self.phonemes)
+    
+    def __contains__(self, phoneme: str) -> bool:
+        return phoneme in self.index
+    
+    @cached_property
+    def sorted_rows(self) -> np.ndarray:
+        """Row indices ordered by phoneme string."""
+        return np.array(
+            sorted(range(len(self.phonemes)), key=self.phonemes.__getitem__),
+            dtype=np.intp
+        )
+    
+    @cached_property
+    def digest(self) -> str:
+        """Content hash identifying this system's phonemes, features and values."""
+        h = hashlib.sha256()
+        h.update('\x1f'.join(self.phonemes).encode('utf-8') + b'\x1e')
+        h.update('\x1f'.join(self.feature_names).encode('utf-8') + b'\x1e')
+        h.update(str(self.matrix.dtype).encode('ascii') + b'\x1e')
+        h.update(self.matrix.tobytes())
+        return h.hexdigest()[:16]
+    
+    @cached_property
+    def feature_index(self) -> Dict[str, int]:
+        """Feature name -> column index."""
+        return {f: j for j, f in enumerate(self.feature_names)}
+    
+    @cached_property
+    def is_binary(self) -> bool:
+        """Whether every feature value is 0 or 1."""
+        return bool(np.isin(self.matrix, (0, 1)).all())
+    
+    @cached_property
+    def packed(self) -> np.ndarray:
+        """
+        Bit-packed feature rows (one uint64 word per 64 features).
+        
+        Raises:
+            ValueError: If the system has non-binary feature values
+        """
+        if not self.is_binary:
+            raise ValueError("Only binary feature systems can be bit-packed")
+        return pack_features(self.matrix)
+    
+    @cached_property
+    def packed_ints(self) -> List[int]:
+        """
+        Bit-packed feature rows as Python integers, for single-pair lookups.
+        
+        Raises:
+            ValueError: If the system has non-binary feature values
+        """
+        return [
+            sum(word << (64 * k) for k, word in enumerate(words))
+            for words in self.packed.tolist()
+        ]
+    
+    def row(self, phoneme: str) -> Optional[np.ndarray]:
+        """Read-only view of a phoneme's feature row, or None if unknown."""
+        i = self.index.get(phoneme)
+        return None if i is None else self.matrix[i]
+    
+    def to_dict(self, row: int) -> Dict[str, int]:
+        """Feature dictionary for a single row."""
+        return dict(zip(self.feature_names, self.matrix[row].tolist()))
+    
+    @cached_property
+    def system_dict(self) -> Dict[str, Dict]:
+        """Per-phoneme dictionary view of the whole system, built once."""
+        return self.to_system_dict()
+    
+    def to_system_dict(self, rows: Optional[np.ndarray] = None) -> Dict[str, Dict]:
+        """Per-phoneme dictionary view of (a subset of) the system."""
+        if rows is None:
+            rows = range(len(self.phonemes))
+        flag = 'custom' if self.custom else 'generated'
+        return {
+            self.phonemes[i]: {
+                'features': self.to_dict(i),
+                'name': self.descriptions[i],
+                flag: self.custom,
+            }
+            for i in rows
+        }
+
+
+def pack_features(matrix: np.ndarray) -> np.ndarray:
+    """
+    Pack binary feature rows into 64-bit words.
+    
+    Args:
+        matrix: (phonemes x features) array of 0/1 values
+        
+    Returns:
+        (phonemes x words) uint64 array, with unused trailing bits set to 0
+    """
+    matrix = np.asarray(matrix)
+    n_words = max(1, -(-matrix.shape[1] // 64))
+    
+    # Pad to a whole number of words, then reinterpret the packed bytes
+    bits = np.zeros((matrix.shape[0], n_words * 64), dtype=bool)
+    bits[:, :matrix.shape[1]] = matrix != 0
+    return np.ascontiguousarray(np.packbits(bits, axis=1)).view(np.uint64)
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """Number of set bits in each element of an unsigned integer array."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words)
+    
+    # Byte lookup table for NumPy < 2.0
+    counts = _POPCOUNT_TABLE[np.ascontiguousarray(words).view(np.uint8)]
+    return counts.reshape(words.shape + (words.itemsize,)).sum(axis=-1, dtype=np.uint8)
+
+
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _build_feature_matrix(
+    rows: Dict[str, Tuple[List[int], str]],
+    feature_names: List[str],
+    custom: bool = False
+) -> FeatureMatrix:
+    """Assemble a FeatureMatrix from parsed phoneme rows."""
+    values = np.array(
+        [vec for vec, _ in rows.values()], dtype=np.int64
+    ).reshape(len(rows), len(feature_names))
+    
+    # Feature values are small integers; use the narrowest dtype that holds them
+    info = np.iinfo(np.int8)
+    if values.size == 0 or (values.min() >= info.min and values.max() <= info.max):
+        values = values.astype(np.int8)
+    
+    return FeatureMatrix(
+        matrix=values,
+        phonemes=list(rows.keys()),
+        feature_names=list(feature_names),
+        descriptions=[name for _, name in rows.values()],
+        custom=custom
+    )
+
+
 # Global feature system cache
-_FEATURE_CACHE: Optional[Dict[str, Dict]] = None
-_FEATURE_NAMES: Optional[List[str]] = None
-_CUSTOM_SYSTEMS: Dict[str, Dict] = {}
+_FEATURE_STORE: Optional[FeatureMatrix] = None
+_CUSTOM_SYSTEMS: Dict[str, FeatureMatrix] = {}
+
+# Callbacks told about feature systems replaced by a reload
+_RELOAD_HOOKS: List[Callable[[FeatureMatrix], None]] = []
+
+# Bump when parsing rules or the compiled on-disk layout change
+_COMPILED_FORMAT_VERSION = 1
+
+
+def _compiled_features(
+    data: bytes,
+    params: Tuple,
+    parse: Callable[[List[str]], FeatureMatrix],
+    custom: bool = False
+) -> FeatureMatrix:
+    """
+    Parse a feature file, reusing a compiled copy from the cache directory.
+    
+    Compiled systems are an .npy feature matrix (memory-mapped on load) and
+    a .json string table, keyed by a hash of the file contents and the
+    parse parameters, so edited files are parsed again.
+    
+    Args:
+        data: Raw contents of the feature file
+        params: Parse settings that affect the result
+        parse: Parser taking the decoded lines of the file
+        custom: Whether this is a custom feature system
+    
+    Returns:
+        Parsed (or loaded) FeatureMatrix
+    """
+    def parse_data() -> FeatureMatrix:
+        # Same decoding and newline handling as reading the file in text mode
+        return parse(io.TextIOWrapper(io.BytesIO(data), encoding='utf-8').readlines())
+    
+    if not get_config('compile_features'):
+        return parse_data()
+    
+    try:
+        cache_dir = get_cache_dir()
+    except RuntimeError as e:
+        # No home directory to default to: like an unwritable cache, just parse
+        logger.debug(f"No cache directory for compiled feature systems: {e}")
+        return parse_data()
+    
+    h = hashlib.sha256(repr((_COMPILED_FORMAT_VERSION, params)).encode('utf-8'))
+    h.update(data)
+    base = cache_dir / f'features-v{_COMPILED_FORMAT_VERSION}' / h.hexdigest()[:24]
+    
+    store = _load_compiled(base, custom)
+    if store is None:
+        store = parse_data()
+        _save_compiled(store, base)
+    return store
+
+
+def _load_compiled(base: Path, custom: bool) -> Optional[FeatureMatrix]:
+    """Load a compiled feature system, or None if missing or unreadable."""
+    try:
+        with open(base.with_suffix('.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        matrix = np.load(base.with_suffix('.npy'), mmap_mode='r')
+        if matrix.shape != (len(meta['phonemes']), len(meta['feature_names'])):
+            raise ValueError(f"Unexpected shape {matrix.shape}")
+    except (OSError, ValueError, KeyError) as e:
+        if base.with_suffix('.json').exists():
+            logger.warning(f"Ignoring unreadable compiled feature system {base}: {e}")
+        return None
+    
+    logger.debug(f"Loaded compiled feature system from {base}")
+    return FeatureMatrix(
+        matrix=matrix,
+        phonemes=meta['phonemes'],
+        feature_names=meta['feature_names'],
+        descriptions=meta['descriptions'],
+        custom=custom
+    )
 
 
-def _load_bundled_features() -> Tuple[Dict[str, Dict], List[str]]:
+def _save_compiled(store: FeatureMatrix, base: Path) -> None:
+    """Write a compiled feature system; failures only cost a re-parse later."""
+    meta = {
+        'phonemes': store.phonemes,
+        'feature_names': store.feature_names,
+        'descriptions': store.descriptions,
+    }
+    try:
+        base.parent.mkdir(parents=True, exist_ok=True)
+        # Write atomically, matrix first: the .json marks a complete entry
+        for suffix, write in (
+            ('.npy', lambda f: np.save(f, store.matrix)),
+            ('.json', lambda f: f.write(json.dumps(meta, ensure_ascii=False).encode('utf-8'))),
+        ):
+            fd, tmp_name = tempfile.mkstemp(dir=base.parent, suffix=suffix + '.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_name, base.with_suffix(suffix))
+    except OSError as e:
+        logger.debug(f"Could not write compiled feature system {base}: {e}")
+        return
+    
+    logger.debug(f"Saved compiled feature system to {base}")
+
+
+def _load_bundled_features() -> FeatureMatrix:
     """Load the bundled feature system from feature_system.csv."""
     try:
         # Try loading feature_system.csv first (our proper format)
@@ -32,7 +306,7 @@ def _load_bundled_features() -> Tuple[Dict[str, Dict], List[str]]:
         data = resources.read_text('distfeat.data', 'feature_system.csv')
         lines = data.strip().split('\n')
         return _parse_csv_lines(lines)
-        
+    
     except Exception:
         # Final fallback - try graphemes.tsv (original CLTS format)
         data_path = Path(__file__).parent / 'data' / 'graphemes.tsv'
@@ -44,15 +318,17 @@ def _load_bundled_features() -> Tuple[Dict[str, Dict], List[str]]:
             "is in the distfeat/data directory."
         )
 
-def _load_csv_features(csv_path: Path) -> Tuple[Dict[str, Dict], List[str]]:
+def _load_csv_features(csv_path: Path) -> FeatureMatrix:
     """Load features from CSV file."""
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    return _parse_csv_lines([line.strip() for line in lines])
+    return _compiled_features(
+        csv_path.read_bytes(),
+        ('bundled',),
+        lambda lines: _parse_csv_lines([line.strip() for line in lines])
+    )
 
-def _parse_csv_lines(lines: List[str]) -> Tuple[Dict[str, Dict], List[str]]:
+def _parse_csv_lines(lines: List[str]) -> FeatureMatrix:
     """Parse CSV lines into feature data."""
-    features = {}
+    rows = {}
     feature_names = []
     
     reader = csv.DictReader(lines)
@@ -66,27 +342,23 @@ def _parse_csv_lines(lines: List[str]) -> Tuple[Dict[str, Dict], List[str]]:
         phoneme = row.get('sound') or row.get('phoneme') or row.get('IPA')
         if not phoneme:
             continue
-            
+        
         # Extract feature values - handle -1, 0, 1 format
-        feature_vec = {}
+        feature_vec = []
         for fname in feature_names:
             val = row.get(fname, '0')
             try:
                 # Convert to int, then to binary (negative = 0, positive = 1)
                 numeric_val = int(float(val)) if val not in ['', 'n/a'] else 0
-                feature_vec[fname] = 1 if numeric_val > 0 else 0
+                feature_vec.append(1 if numeric_val > 0 else 0)
             except (ValueError, TypeError):
-                feature_vec[fname] = 0
+                feature_vec.append(0)
         
-        features[phoneme] = {
-            'features': feature_vec,
-            'name': row.get('description', row.get('name', '')),
-            'generated': False
-        }
+        rows[phoneme] = (feature_vec, row.get('description', row.get('name', '')))
     
-    return features, feature_names
+    return _build_feature_matrix(rows, feature_names)
 
-def _load_clts_fallback(tsv_path: Path) -> Tuple[Dict[str, Dict], List[str]]:
+def _load_clts_fallback(tsv_path: Path) -> FeatureMatrix:
     """Fallback loader for original CLTS graphemes.tsv format."""
     # This is a minimal implementation for the raw CLTS data
     # In practice, we need the processed feature system
@@ -98,15 +370,77 @@ def _load_clts_fallback(tsv_path: Path) -> Tuple[Dict[str, Dict], List[str]]:
 
 def _initialize_features() -> None:
     """Initialize the global feature cache."""
-    global _FEATURE_CACHE, _FEATURE_NAMES
-    if _FEATURE_CACHE is None:
-        _FEATURE_CACHE, _FEATURE_NAMES = _load_bundled_features()
-        logger.info(f"Loaded {len(_FEATURE_CACHE)} phonemes with {len(_FEATURE_NAMES)} features")
+    global _FEATURE_STORE
+    if _FEATURE_STORE is None:
+        _FEATURE_STORE = _load_bundled_features()
+        logger.info(
+            f"Loaded {len(_FEATURE_STORE)} phonemes with "
+            f"{len(_FEATURE_STORE.feature_names)} features"
+        )
+
+
+def get_feature_matrix(system: Optional[str] = None) -> FeatureMatrix:
+    """
+    Get the array-backed store for a feature system.
+    
+    The returned object is shared by all lookups; its matrix is read-only.
+    
+    Args:
+        system: Feature system name (None for default)
+    
+    Returns:
+        FeatureMatrix for the requested system
+    
+    Raises:
+        ValueError: If the system is unknown
+    """
+    _initialize_features()
+    
+    if system is None:
+        return _FEATURE_STORE
+    elif system in _CUSTOM_SYSTEMS:
+        return _CUSTOM_SYSTEMS[system]
+    else:
+        raise ValueError(f"Unknown feature system: {system}")
+
+
+def phoneme_to_vector(
+    phoneme: str,
+    system: Optional[str] = None,
+    on_error: str = 'warn'
+) -> Optional[np.ndarray]:
+    """
+    Get a phoneme's feature vector as a read-only array view.
+    
+    Values are ordered as in get_feature_names().
+    
+    Args:
+        phoneme: IPA phoneme string
+        system: Feature system to use (None for default CLTS)
+        on_error: Error handling - 'raise', 'warn', or 'ignore'
+    
+    Returns:
+        Feature vector, or None if not found
+    
+    Raises:
+        ValueError: If phoneme not found and on_error='raise'
+    """
+    vector = get_feature_matrix(system).row(phoneme)
+    if vector is not None:
+        return vector
+    
+    # Handle missing phoneme
+    if on_error == 'raise':
+        raise ValueError(f"Phoneme '{phoneme}' not found in feature system")
+    elif on_error == 'warn':
+        logger.warning(f"Phoneme '{phoneme}' not found in feature system")
+    
+    return None
 
 
 @lru_cache(maxsize=1024)
 def phoneme_to_features(
-    phoneme: str, 
+    phoneme: str,
     system: Optional[str] = None,
     on_error: str = 'warn'
 ) -> Optional[Dict[str, int]]:
@@ -117,26 +451,18 @@ def phoneme_to_features(
         phoneme: IPA phoneme string
         system: Feature system to use (None for default CLTS)
         on_error: Error handling - 'raise', 'warn', or 'ignore'
-        
+    
     Returns:
         Dictionary of feature names to values (0 or 1), or None if not found
-        
+    
     Raises:
         ValueError: If phoneme not found and on_error='raise'
     """
-    _initialize_features()
-    
-    # Select feature system
-    if system is None:
-        feature_data = _FEATURE_CACHE
-    elif system in _CUSTOM_SYSTEMS:
-        feature_data = _CUSTOM_SYSTEMS[system]
-    else:
-        raise ValueError(f"Unknown feature system: {system}")
+    store = get_feature_matrix(system)
     
     # Look up phoneme
-    if phoneme in feature_data:
-        return feature_data[phoneme]['features'].copy()
+    if phoneme in store.index:
+        return store.to_dict(store.index[phoneme])
     
     # Handle missing phoneme
     if on_error == 'raise':
@@ -148,49 +474,157 @@ def phoneme_to_features(
 
 
 def features_to_phoneme(
-    features: Dict[str, int],
+    features: Union[Dict[str, int], np.ndarray],
     system: Optional[str] = None,
-    threshold: float = 1.0
-) -> Optional[str]:
+    threshold: float = 1.0,
+    top_k: Optional[int] = None
+) -> Union[Optional[str], List[Tuple[str, float]]]:
     """
     Find the phoneme that best matches the given features.
     
+    The score of a phoneme is the fraction of features on which it agrees
+    with the query, over the union of the system's features and the
+    query's keys (missing features count as 0).
+    
     Args:
-        features: Dictionary of feature names to values
+        features: Dictionary of feature names to values, or a vector
+            in the order of get_feature_names()
         system: Feature system to use
         threshold: Minimum similarity threshold (0.0 to 1.0)
-        
+        top_k: Return up to this many (phoneme, score) matches, best first
+    
     Returns:
-        Best matching phoneme, or None if no match above threshold
+        Best matching phoneme, or None if no match above threshold.
+        With top_k, a list of (phoneme, score) tuples above threshold.
     """
-    _initialize_features()
+    if isinstance(features, np.ndarray) and features.ndim != 1:
+        raise ValueError("Expected a single feature vector")
+    return features_to_phonemes([features], system, threshold, top_k)[0]
+
+
+def features_to_phonemes(
+    features: Union[List[Union[Dict[str, int], np.ndarray]], np.ndarray],
+    system: Optional[str] = None,
+    threshold: float = 1.0,
+    top_k: Optional[int] = None
+) -> List[Union[Optional[str], List[Tuple[str, float]]]]:
+    """
+    Find the best matching phoneme for many feature sets at once.
     
-    # Select feature system
-    if system is None:
-        feature_data = _FEATURE_CACHE
-    else:
-        feature_data = _CUSTOM_SYSTEMS[system]
+    Args:
+        features: Sequence of feature dictionaries or vectors, or a
+            (queries x features) array in the order of get_feature_names()
+        system: Feature system to use
+        threshold: Minimum similarity threshold (0.0 to 1.0)
+        top_k: Return up to this many (phoneme, score) matches per query
     
-    best_match = None
-    best_score = 0.0
+    Returns:
+        List with one result per query, as for features_to_phoneme
     
-    for phoneme, data in feature_data.items():
-        phoneme_features = data['features']
-        
-        # Calculate exact match score (all features must match)
-        all_features = set(features.keys()) | set(phoneme_features.keys())
-        if not all_features:
-            continue
-            
-        matches = sum(1 for f in all_features 
-                     if features.get(f, 0) == phoneme_features.get(f, 0))
-        score = matches / len(all_features)
+    Raises:
+        ValueError: If a feature vector does not match the system's features
+    """
+    store = get_feature_matrix(system)
+    if top_k is not None and top_k < 1:
+        raise ValueError(f"top_k must be positive, got {top_k}")
+    
+    results = []
+    for start in range(0, len(features), _QUERY_CHUNK):
+        chunk = features[start:start + _QUERY_CHUNK]
+        scores = _match_scores(store, *_query_arrays(store, chunk))
         
-        if score > best_score:
-            best_score = score
-            best_match = phoneme
+        for row in scores:
+            if top_k is None:
+                # First best row in file order, as a linear scan would find
+                best = int(np.argmax(row)) if row.size else 0
+                score = row[best] if row.size else 0.0
+                results.append(
+                    store.phonemes[best] if score > 0 and score >= threshold else None
+                )
+            else:
+                order = np.argsort(-row, kind='stable')[:top_k]
+                results.append([
+                    (store.phonemes[i], float(row[i]))
+                    for i in order if row[i] > 0 and row[i] >= threshold
+                ])
     
-    return best_match if best_score >= threshold else None
+    return results
+
+
+# Queries scored per pass in features_to_phonemes, bounding temporary memory
+_QUERY_CHUNK = 256
+
+
+def _query_arrays(
+    store: FeatureMatrix,
+    queries: Union[List[Union[Dict[str, int], np.ndarray]], np.ndarray]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convert queries to a (queries x features) value array.
+    
+    Returns:
+        Tuple of (values, number of extra keys equal to 0, number of
+        extra keys) where extra keys are query features not in the system
+    """
+    n_features = len(store.feature_names)
+    n = len(queries)
+    values = np.zeros((n, n_features), dtype=np.float64)
+    extra_zero = np.zeros(n, dtype=np.int64)
+    n_extra = np.zeros(n, dtype=np.int64)
+    
+    for q, query in enumerate(queries):
+        if isinstance(query, dict):
+            for name, value in query.items():
+                j = store.feature_index.get(name)
+                if j is None:
+                    n_extra[q] += 1
+                    extra_zero[q] += value == 0
+                else:
+                    values[q, j] = _as_number(value)
+        else:
+            vector = np.asarray(query)
+            if vector.shape != (n_features,):
+                raise ValueError(
+                    f"Feature vector has shape {vector.shape}, expected ({n_features},)"
+                )
+            values[q] = vector
+    
+    return values, extra_zero, n_extra
+
+
+def _as_number(value) -> float:
+    """Numeric feature value; anything else never matches."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _match_scores(
+    store: FeatureMatrix,
+    values: np.ndarray,
+    extra_zero: np.ndarray,
+    n_extra: np.ndarray
+) -> np.ndarray:
+    """(queries x phonemes) fraction of agreeing features."""
+    n_features = len(store.feature_names)
+    
+    matches = np.empty((len(values), len(store)), dtype=np.int64)
+    binary = np.isin(values, (0, 1)).all(axis=1) & store.is_binary
+    
+    if binary.any():
+        # Agreements are the features minus the bits that differ
+        packed = pack_features(values[binary])
+        differing = popcount(store.packed[None, :, :] ^ packed[:, None, :])
+        matches[binary] = n_features - differing.sum(axis=2, dtype=np.int64)
+    if not binary.all():
+        other = values[~binary]
+        matches[~binary] = (store.matrix[None, :, :] == other[:, None, :]).sum(axis=2)
+    
+    total = n_features + n_extra
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scores = (matches + extra_zero[:, None]) / total[:, None]
+    return np.nan_to_num(scores, nan=0.0)
 
 
 def get_feature_system(
@@ -209,44 +643,38 @@ def get_feature_system(
         exclude_clicks: Filter out click consonants
         exclude_tones: Filter out tonal features
         exclude_diacritics: Filter out diacritical marks
-        
+    
     Returns:
         Dictionary mapping phonemes to feature data, or numpy matrix
     """
-    _initialize_features()
+    store = get_feature_matrix(system)
     
-    if system is None:
-        feature_data = _FEATURE_CACHE.copy()
-    else:
-        feature_data = _CUSTOM_SYSTEMS[system].copy()
+    if not as_matrix:
+        # Shallow copy of the dictionary view, which is built once per system
+        feature_data = store.system_dict.copy()
+        if exclude_clicks:
+            feature_data = {k: v for k, v in feature_data.items() if not _is_click(k)}
+        if exclude_tones:
+            feature_data = {k: v for k, v in feature_data.items() if not _has_tone(k)}
+        if exclude_diacritics:
+            feature_data = {k: v for k, v in feature_data.items() if not _has_diacritic(k)}
+        return feature_data
+    
+    # Rows in phoneme order
+    rows = store.sorted_rows
     
     # Apply filters
     if exclude_clicks:
-        feature_data = {k: v for k, v in feature_data.items() 
-                       if not _is_click(k)}
+        rows = [i for i in rows if not _is_click(store.phonemes[i])]
     
     if exclude_tones:
-        feature_data = {k: v for k, v in feature_data.items()
-                       if not _has_tone(k)}
+        rows = [i for i in rows if not _has_tone(store.phonemes[i])]
     
     if exclude_diacritics:
-        feature_data = {k: v for k, v in feature_data.items()
-                       if not _has_diacritic(k)}
+        rows = [i for i in rows if not _has_diacritic(store.phonemes[i])]
     
-    if as_matrix:
-        # Convert to numpy matrix
-        phonemes = sorted(feature_data.keys())
-        feature_names = get_feature_names(system)
-        
-        matrix = np.zeros((len(phonemes), len(feature_names)))
-        for i, phoneme in enumerate(phonemes):
-            features = feature_data[phoneme]['features']
-            for j, fname in enumerate(feature_names):
-                matrix[i, j] = features.get(fname, 0)
-        
-        return matrix
-    
-    return feature_data
+    # Gather rows from the shared array
+    return store.matrix[np.asarray(rows, dtype=np.intp)].astype(np.float64)
 
 
 def get_feature_names(system: Optional[str] = None) -> List[str]:
@@ -255,20 +683,11 @@ def get_feature_names(system: Optional[str] = None) -> List[str]:
     
     Args:
         system: Feature system name
-        
+    
     Returns:
         List of feature names
     """
-    _initialize_features()
-    
-    if system is None:
-        return _FEATURE_NAMES.copy()
-    elif system in _CUSTOM_SYSTEMS:
-        # Get feature names from first phoneme
-        first_phoneme = next(iter(_CUSTOM_SYSTEMS[system].values()))
-        return list(first_phoneme['features'].keys())
-    else:
-        raise ValueError(f"Unknown feature system: {system}")
+    return get_feature_matrix(system).feature_names.copy()
 
 
 def load_custom_features(
@@ -295,39 +714,86 @@ def load_custom_features(
     if exclude_cols is None:
         exclude_cols = [phoneme_col, 'description', 'name', 'note']
     
-    features = {}
+    store = _compiled_features(
+        path.read_bytes(),
+        ('custom', delimiter, phoneme_col, list(exclude_cols)),
+        lambda lines: _parse_custom_lines(lines, delimiter, phoneme_col, exclude_cols),
+        custom=True
+    )
+    _register_system(name, store)
+    logger.info(f"Loaded custom feature system '{name}' with {len(store)} phonemes")
+
+
+def on_feature_system_change(
+    hook: Callable[[FeatureMatrix], None]
+) -> Callable[[FeatureMatrix], None]:
+    """
+    Register a callback for feature systems replaced by a reload.
+    
+    Caches derived from a system should be keyed by FeatureMatrix.digest,
+    which changes with the system's contents; the hook receives the
+    replaced FeatureMatrix so entries for its digest can be dropped.
+    Usable as a decorator.
+    
+    Args:
+        hook: Function called with the old FeatureMatrix
+        
+    Returns:
+        The hook
+    """
+    _RELOAD_HOOKS.append(hook)
+    return hook
+
+
+def _register_system(name: str, store: FeatureMatrix) -> None:
+    """Install a custom system, invalidating caches of the one it replaces."""
+    old = _CUSTOM_SYSTEMS.get(name)
+    _CUSTOM_SYSTEMS[name] = store
+    if old is None:
+        return
+    
+    # Lookups are cached by system name, so they go stale on any reload
+    phoneme_to_features.cache_clear()
+    if old.digest != store.digest:
+        for hook in _RELOAD_HOOKS:
+            hook(old)
+        logger.info(f"Reloaded feature system '{name}'; invalidated caches for {old.digest}")
+
+
+def _parse_custom_lines(
+    lines: List[str],
+    delimiter: str,
+    phoneme_col: str,
+    exclude_cols: List[str]
+) -> FeatureMatrix:
+    """Parse the lines of a custom feature file."""
+    rows = {}
     feature_names = []
     
-    with open(path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f, delimiter=delimiter)
+    reader = csv.DictReader(lines, delimiter=delimiter)
+    
+    for row in reader:
+        if not feature_names:
+            feature_names = [col for col in row.keys()
+                           if col not in exclude_cols]
         
-        for row in reader:
-            if not feature_names:
-                feature_names = [col for col in row.keys() 
-                               if col not in exclude_cols]
-            
-            phoneme = row[phoneme_col]
-            feature_vec = {}
-            
-            for fname in feature_names:
-                val = row.get(fname, '0')
-                # Convert to binary
-                if val in ['', 'n', '0', '-']:
-                    feature_vec[fname] = 0
-                else:
-                    try:
-                        feature_vec[fname] = int(float(val))
-                    except (ValueError, TypeError):
-                        feature_vec[fname] = 1
-            
-            features[phoneme] = {
-                'features': feature_vec,
-                'name': row.get('name', ''),
-                'custom': True
-            }
+        phoneme = row[phoneme_col]
+        feature_vec = []
+        
+        for fname in feature_names:
+            val = row.get(fname, '0')
+            # Convert to binary
+            if val in ['', 'n', '0', '-']:
+                feature_vec.append(0)
+            else:
+                try:
+                    feature_vec.append(int(float(val)))
+                except (ValueError, TypeError):
+                    feature_vec.append(1)
+        
+        rows[phoneme] = (feature_vec, row.get('name', ''))
     
-    _CUSTOM_SYSTEMS[name] = features
-    logger.info(f"Loaded custom feature system '{name}' with {len(features)} phonemes")
+    return _build_feature_matrix(rows, feature_names, custom=True)
 
 
 def _is_click(phoneme: str) -> bool:
@@ -0,0 +1,292 @@
+"""
+Nearest-neighbour search over phoneme inventories.
+
+Answers "which phonemes are closest to /x/" without building a full
+distance matrix.
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+from .distances import (
+    FeatureWeights,
+    _KERNELS,
+    _WEIGHTED_METHODS,
+    _check_method,
+    _custom_kernel,
+    _get_weighting,
+    _weighted_kernel,
+)
+from .features import get_feature_matrix, pack_features, popcount
+
+logger = logging.getLogger('distfeat')
+
+# Methods whose distance on binary vectors depends only on the number of
+# differing features, so rows can be bucketed by their number of set bits
+_BUCKETED_METHODS = ('hamming', 'manhattan', 'euclidean')
+
+
+class PhonemeIndex:
+    """
+    Index of phoneme feature vectors for k-nearest-neighbour and radius queries.
+    
+    For binary feature systems, rows are grouped into buckets by the number
+    of features they have set. The hamming distance between two rows is at
+    least the difference of their bucket weights, so hamming, manhattan and
+    euclidean queries only scan the buckets that can still contain a match.
+    Other methods use a single vectorized pass over the inventory.
+    
+    Distances are identical to those of calculate_distance.
+    """
+    
+    def __init__(
+        self,
+        phonemes: Optional[Sequence[str]] = None,
+        system: Optional[str] = None,
+        weights: Optional[FeatureWeights] = None
+    ):
+        """
+        Build an index.
+        
+        Args:
+            phonemes: Phonemes to index (None for all in system, in sorted order)
+            system: Feature system to use
+            weights: Feature weights for the weighted methods (see
+                get_feature_weights)
+        
+        Raises:
+            ValueError: If a phoneme is not in the feature system
+        """
+        store = get_feature_matrix(system)
+        if phonemes is None:
+            rows = store.sorted_rows
+        else:
+            unknown = [p for p in phonemes if p not in store]
+            if unknown:
+                raise ValueError(f"Phonemes not in feature system: {unknown}")
+            rows = np.array([store.index[p] for p in phonemes], dtype=np.intp)
+        
+        self.system = system
+        self.phonemes: List[str] = [store.phonemes[i] for i in rows]
+        self.feature_names: List[str] = list(store.feature_names)
+        self._store = store
+        self._rows = rows
+        self._weights = weights
+        self._position: Dict[str, int] = {}
+        for k, p in enumerate(self.phonemes):
+            self._position.setdefault(p, k)
+        
+        # Widened once so queries do no per-call conversion
+        self._vectors = store.matrix[rows].astype(np.int64)
+        self._binary = store.is_binary
+        self._distance_by_bits: Dict[Tuple[str, bool], np.ndarray] = {}
+        
+        if self._binary:
+            packed = store.packed[rows]
+            weights = popcount(packed).sum(axis=1, dtype=np.int64)
+            
+            # Rows ordered by weight; bucket w is order[starts[w]:starts[w + 1]]
+            self._order = np.argsort(weights, kind='stable')
+            self._packed = packed[self._order]
+            self._starts = np.searchsorted(
+                weights[self._order], np.arange(len(self.feature_names) + 2)
+            )
+    
+    def __len__(self) -> int:
+        return len(self.phonemes)
+    
+    def __contains__(self, phoneme: str) -> bool:
+        return phoneme in self._position
+    
+    def nearest(
+        self,
+        query: Union[str, np.ndarray],
+        k: int = 5,
+        method: str = 'hamming',
+        normalize: bool = True,
+        include_query: bool = False
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the k phonemes closest to a phoneme or feature vector.
+        
+        Args:
+            query: Phoneme, or feature vector in the order of feature_names
+            k: Number of neighbours to return
+            method: Distance method to use
+            normalize: Normalize distances to [0, 1] range
+            include_query: Keep the query phoneme itself in the results
+        
+        Returns:
+            List of (phoneme, distance) tuples, closest first; ties keep
+            index order
+        
+        Raises:
+            ValueError: If k is not positive, the query or method is unknown,
+                or the method is kmeans
+        """
+        if k < 1:
+            raise ValueError(f"k must be positive, got {k}")
+        vector, skip = self._resolve(query, include_query)
+        self._check_method(method)
+        
+        if self._can_bucket(method, vector):
+            positions, bits = self._nearest_bucketed(vector, k, skip)
+            dists = self._bit_distances(method, normalize)[bits]
+        else:
+            dists = self._scan(vector, method, normalize)
+            positions = np.arange(len(self))
+        
+        return self._ranked(positions, dists, skip, k)
+    
+    def radius(
+        self,
+        query: Union[str, np.ndarray],
+        radius: float,
+        method: str = 'hamming',
+        normalize: bool = True,
+        include_query: bool = False
+    ) -> List[Tuple[str, float]]:
+        """
+        Find all phonemes within a distance of a phoneme or feature vector.
+        
+        Args:
+            query: Phoneme, or feature vector in the order of feature_names
+            radius: Maximum distance (inclusive)
+            method: Distance method to use
+            normalize: Normalize distances to [0, 1] range
+            include_query: Keep the query phoneme itself in the results
+        
+        Returns:
+            List of (phoneme, distance) tuples, closest first
+        """
+        vector, skip = self._resolve(query, include_query)
+        self._check_method(method)
+        
+        if self._can_bucket(method, vector):
+            table = self._bit_distances(method, normalize)
+            max_bits = int(np.searchsorted(table, radius, side='right')) - 1
+            if max_bits < 0:
+                return []
+            
+            # Only weights within max_bits of the query can be close enough
+            weight = int(vector.sum())
+            lo = self._starts[max(weight - max_bits, 0)]
+            hi = self._starts[min(weight + max_bits, len(self.feature_names)) + 1]
+            bits = self._differing_bits(vector, lo, hi)
+            keep = bits <= max_bits
+            positions = self._order[lo:hi][keep]
+            dists = table[bits[keep]]
+        else:
+            dists = self._scan(vector, method, normalize)
+            positions = np.flatnonzero(dists <= radius)
+            dists = dists[positions]
+        
+        return self._ranked(positions, dists, skip)
+    
+    def _check_method(self, method: str) -> None:
+        # kmeans distances are defined between cluster labels of inventory
+        # rows, so an arbitrary query vector has no distance to compare
+        if method == 'kmeans':
+            raise ValueError("kmeans is not supported by PhonemeIndex")
+        _check_method(method)
+    
+    def _resolve(
+        self,
+        query: Union[str, np.ndarray],
+        include_query: bool
+    ) -> Tuple[np.ndarray, int]:
+        """Query vector, and the index position to leave out (-1 for none)."""
+        if isinstance(query, str):
+            vector = self._store.row(query)
+            if vector is None:
+                raise ValueError(f"Phoneme '{query}' not found in feature system")
+            skip = -1 if include_query else self._position.get(query, -1)
+            return vector.astype(np.int64), skip
+        
+        vector = np.asarray(query)
+        if vector.shape != (len(self.feature_names),):
+            raise ValueError(
+                f"Feature vector has shape {vector.shape}, "
+                f"expected ({len(self.feature_names)},)"
+            )
+        return vector.astype(np.int64), -1
+    
+    def _can_bucket(self, method: str, vector: np.ndarray) -> bool:
+        return (
+            self._binary
+            and method in _BUCKETED_METHODS
+            and bool(((vector == 0) | (vector == 1)).all())
+        )
+    
+    def _bit_distances(self, method: str, normalize: bool) -> np.ndarray:
+        """Distance for 0..F differing binary features, from the method's kernel."""
+        key = (method, normalize)
+        if key not in self._distance_by_bits:
+            n_features = len(self.feature_names)
+            differing = np.tri(n_features + 1, n_features, -1, dtype=np.int64)
+            zeros = np.zeros_like(differing)
+            self._distance_by_bits[key] = _KERNELS[method](zeros, differing, normalize)
+        return self._distance_by_bits[key]
+    
+    def _differing_bits(self, vector: np.ndarray, lo: int, hi: int) -> np.ndarray:
+        """Hamming distance from the query to weight-ordered rows lo:hi."""
+        packed = pack_features(vector[None, :])
+        return popcount(self._packed[lo:hi] ^ packed).sum(axis=1, dtype=np.int64)
+    
+    def _nearest_bucketed(
+        self,
+        vector: np.ndarray,
+        k: int,
+        skip: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Candidate positions and differing-bit counts covering the k nearest."""
+        n_features = len(self.feature_names)
+        weight = int(vector.sum())
+        lo = hi = self._starts[weight]
+        positions = np.empty(0, dtype=np.intp)
+        bits = np.empty(0, dtype=np.int64)
+        
+        # Grow a window of weights around the query's; rows at weight
+        # distance t differ in at least t features
+        for t in range(n_features + 1):
+            new_lo = self._starts[max(weight - t, 0)]
+            new_hi = self._starts[min(weight + t, n_features) + 1]
+            for start, stop in ((new_lo, lo), (hi, new_hi)):
+                if stop > start:
+                    positions = np.concatenate([positions, self._order[start:stop]])
+                    bits = np.concatenate([bits, self._differing_bits(vector, start, stop)])
+            lo, hi = new_lo, new_hi
+            
+            found = bits[positions != skip]
+            if len(found) >= k and np.partition(found, k - 1)[k - 1] <= t:
+                break
+        
+        return positions, bits
+    
+    def _scan(self, vector: np.ndarray, method: str, normalize: bool) -> np.ndarray:
+        """Distances from the query to every indexed phoneme."""
+        if method in _WEIGHTED_METHODS:
+            weighting = _get_weighting(self._store, self._weights)
+            scaled = weighting.scaled(method)[self._rows]
+            # Scale the query the same way as the precomputed rows
+            X = np.broadcast_to(vector * weighting.factor(method), scaled.shape)
+            return _weighted_kernel(method, X, scaled, weighting, normalize)
+        
+        X = np.broadcast_to(vector, self._vectors.shape)
+        if method in _KERNELS:
+            return _KERNELS[method](X, self._vectors, normalize)
+        return _custom_kernel(method, X, self._vectors, normalize)
+    
+    def _ranked(
+        self,
+        positions: np.ndarray,
+        dists: np.ndarray,
+        skip: int,
+        k: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """First k (phoneme, distance) pairs by distance, then index position."""
+        keep = positions != skip
+        positions, dists = positions[keep], dists[keep]
+        order = np.lexsort((positions, dists))[:k]
+        return [(self.phonemes[positions[i]], float(dists[i])) for i in order]
\ No newline at end of file
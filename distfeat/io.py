@@ -11,6 +11,8 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Union
 import numpy as np
 
+from .distances import condensed_size, condensed_to_square, square_to_condensed
+
 logger = logging.getLogger('distfeat')
 
 
@@ -25,14 +27,31 @@ def save_distance_matrix(
     Save distance matrix to file.
     
     Args:
-        matrix: Distance matrix as numpy array
+        matrix: Distance matrix as numpy array, either square or condensed
+            (see build_distance_matrix)
         phonemes: List of phoneme labels
         path: Output file path
-        format: Output format ('tsv', 'csv', 'json', 'npy')
+        format: Output format ('tsv', 'csv', 'json', 'npy', 'npz')
         precision: Decimal precision for text formats
+        
+    The 'npy' format writes the raw matrix as a plain .npy file, which
+    load_distance_matrix can memory-map, with phoneme labels in a
+    '<name>.phonemes.json' sidecar. 'npz' writes a single archive holding
+    both, which cannot be memory-mapped. Both keep condensed matrices
+    condensed; text formats always write the full square matrix.
+    
+    Earlier versions wrote an .npz archive for 'npy'. For compatibility,
+    'npy' with a '.npz' path still writes an archive, with a warning.
     """
     path = Path(path)
     
+    if format == 'npy' and path.suffix.lower() == '.npz':
+        logger.warning(
+            f"format='npy' now writes a raw .npy file; saving {path} as an .npz "
+            f"archive instead (pass format='npz' to silence this warning)"
+        )
+        format = 'npz'
+    
     if format == 'tsv':
         export_matrix_tsv(matrix, phonemes, path, precision)
     elif format == 'csv':
@@ -40,7 +59,12 @@ def save_distance_matrix(
     elif format == 'json':
         export_matrix_json(matrix, phonemes, path, precision)
     elif format == 'npy':
-        # Save as numpy binary with metadata
+        # Raw matrix plus label sidecar, so the matrix can be memory-mapped
+        np.save(path, np.ascontiguousarray(matrix))
+        with open(_labels_path(path), 'w', encoding='utf-8') as f:
+            json.dump(list(phonemes), f, ensure_ascii=False)
+    elif format == 'npz':
+        # Save as numpy archive with metadata
         np.savez(path, matrix=matrix, phonemes=phonemes)
     else:
         raise ValueError(f"Unknown format: {format}")
@@ -50,7 +74,9 @@ def save_distance_matrix(
 
 def load_distance_matrix(
     path: Union[str, Path],
-    format: Optional[str] = None
+    format: Optional[str] = None,
+    mmap_mode: Optional[str] = None,
+    condensed: Optional[bool] = None
 ) -> Tuple[np.ndarray, List[str]]:
     """
     Load distance matrix from file.
@@ -58,6 +84,10 @@ def load_distance_matrix(
     Args:
         path: Input file path
         format: Input format (auto-detect if None)
+        mmap_mode: Memory-map mode for 'npy' files (e.g. 'r'), so that many
+            processes share one page-cached copy; None reads into memory
+        condensed: Return a condensed (True) or square (False) matrix,
+            converting if needed; None returns the matrix as stored
         
     Returns:
         Tuple of (matrix, phoneme list)
@@ -76,22 +106,31 @@ def load_distance_matrix(
             format = 'csv'
         elif suffix == '.json':
             format = 'json'
-        elif suffix in ['.npy', '.npz']:
+        elif suffix == '.npy':
             format = 'npy'
+        elif suffix == '.npz':
+            format = 'npz'
         else:
             # Try to detect from content
             format = _detect_format(path)
     
     if format == 'tsv':
-        return _load_tsv_matrix(path)
+        matrix, phonemes = _load_tsv_matrix(path)
     elif format == 'csv':
-        return _load_csv_matrix(path)
+        matrix, phonemes = _load_csv_matrix(path)
     elif format == 'json':
-        return _load_json_matrix(path)
-    elif format == 'npy':
-        return _load_numpy_matrix(path)
+        matrix, phonemes = _load_json_matrix(path)
+    elif format in ['npy', 'npz']:
+        matrix, phonemes = _load_numpy_matrix(path, mmap_mode)
     else:
         raise ValueError(f"Cannot load format: {format}")
+    
+    if condensed is True and matrix.ndim == 2:
+        matrix = square_to_condensed(matrix)
+    elif condensed is False and matrix.ndim == 1:
+        matrix = condensed_to_square(matrix)
+    
+    return matrix, phonemes
 
 
 def export_matrix_tsv(
@@ -109,6 +148,7 @@ def export_matrix_tsv(
         phoneme2<tab>0.1234<tab>0.0000<tab>...
     """
     path = Path(path)
+    matrix = _as_square(matrix)
     
     with open(path, 'w', encoding='utf-8') as f:
         # Write header
@@ -130,6 +170,7 @@ def export_matrix_csv(
 ) -> None:
     """Export matrix in CSV format."""
     path = Path(path)
+    matrix = _as_square(matrix)
     
     with open(path, 'w', encoding='utf-8', newline='') as f:
         writer = csv.writer(f)
@@ -162,6 +203,7 @@ def export_matrix_json(
     }
     """
     path = Path(path)
+    matrix = _as_square(matrix)
     
     # Check if matrix is symmetric
     is_symmetric = np.allclose(matrix, matrix.T)
@@ -187,6 +229,12 @@ def export_matrix_json(
         json.dump(data, f, indent=2, ensure_ascii=False)
 
 
+def _as_square(matrix: np.ndarray) -> np.ndarray:
+    """Expand condensed matrices so text exporters can write full rows."""
+    matrix = np.asarray(matrix)
+    return condensed_to_square(matrix) if matrix.ndim == 1 else matrix
+
+
 def _load_tsv_matrix(path: Path) -> Tuple[np.ndarray, List[str]]:
     """Load TSV format matrix."""
     with open(path, 'r', encoding='utf-8') as f:
@@ -264,14 +312,31 @@ def _load_json_matrix(path: Path) -> Tuple[np.ndarray, List[str]]:
     return matrix, phonemes
 
 
-def _load_numpy_matrix(path: Path) -> Tuple[np.ndarray, List[str]]:
+def _labels_path(path: Path) -> Path:
+    """Sidecar file holding the phoneme labels of a raw .npy matrix."""
+    path = Path(path)
+    if path.suffix != '.npy':
+        path = path.with_name(path.name + '.npy')  # np.save appends the suffix
+    return path.with_suffix('.phonemes.json')
+
+
+def _load_numpy_matrix(
+    path: Path,
+    mmap_mode: Optional[str] = None
+) -> Tuple[np.ndarray, List[str]]:
     """Load NumPy format matrix."""
-    data = np.load(path)
+    data = np.load(path, mmap_mode=mmap_mode)
     
     if isinstance(data, np.ndarray):
-        # Old format - just matrix, generate phoneme labels
+        # Raw matrix, with labels from the sidecar file if there is one
         matrix = data
-        phonemes = [f'p{i}' for i in range(len(matrix))]
+        labels_path = _labels_path(path)
+        if labels_path.exists():
+            with open(labels_path, 'r', encoding='utf-8') as f:
+                phonemes = json.load(f)
+        else:
+            n = condensed_size(len(matrix)) if matrix.ndim == 1 else len(matrix)
+            phonemes = [f'p{i}' for i in range(n)]
     else:
         # New format with metadata
         matrix = data['matrix']
@@ -282,6 +347,14 @@ def _load_numpy_matrix(path: Path) -> Tuple[np.ndarray, List[str]]:
 
 def _detect_format(path: Path) -> str:
     """Try to detect file format from content."""
+    # Binary NumPy formats are recognized by their magic bytes
+    with open(path, 'rb') as f:
+        magic = f.read(6)
+    if magic == b'\x93NUMPY':
+        return 'npy'
+    elif magic.startswith(b'PK\x03\x04'):
+        return 'npz'
+    
     with open(path, 'r', encoding='utf-8') as f:
         first_line = f.readline()
     
@@ -292,9 +365,4 @@ def _detect_format(path: Path) -> str:
     elif first_line.strip().startswith('{'):
         return 'json'
     else:
-        # Try as numpy
-        try:
-            np.load(path)
-            return 'npy'
-        except:
-            raise ValueError(f"Cannot detect format of {path}")
\ No newline at end of file
+        raise ValueError(f"Cannot detect format of {path}")
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""
+Process-pool helpers for bulk computations.
+
+Large read-only arrays (distance tables, feature matrices) are placed in
+shared memory once and attached by every worker, instead of being pickled
+along with each task.
+"""
+
+import logging
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .config import get_config
+
+logger = logging.getLogger('distfeat')
+
+# (shared memory block name, shape, dtype) describing an array to attach
+SharedArraySpec = Tuple[str, Tuple[int, ...], str]
+
+# Arrays and settings of the current worker process
+_WORKER_ARRAYS: Dict[str, np.ndarray] = {}
+_WORKER_STATE: Dict[str, Any] = {}
+_WORKER_BLOCKS: List[shared_memory.SharedMemory] = []
+
+
+def resolve_n_jobs(n_jobs: Optional[int] = None) -> int:
+    """
+    Number of worker processes to use.
+    
+    Args:
+        n_jobs: Worker count (None for the 'n_jobs' config option, negative
+            values count back from the number of CPUs, so -1 uses all)
+    
+    Returns:
+        Positive number of workers
+    """
+    if n_jobs is None:
+        n_jobs = get_config('n_jobs') or 1
+    if n_jobs < 0:
+        n_jobs = (os.cpu_count() or 1) + 1 + n_jobs
+    return max(1, n_jobs)
+
+
+@contextmanager
+def shared_arrays(**arrays: np.ndarray) -> Iterator[Dict[str, SharedArraySpec]]:
+    """
+    Copy arrays into shared memory for the duration of a block.
+    
+    Args:
+        **arrays: Arrays to share, by name
+    
+    Yields:
+        Specs to pass to map_chunks, by name
+    """
+    blocks = []
+    specs = {}
+    try:
+        for key, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            specs[key] = (block.name, array.shape, array.dtype.str)
+        yield specs
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def map_chunks(
+    func: Callable[[Any], Any],
+    chunks: Sequence[Any],
+    n_jobs: int,
+    arrays: Optional[Dict[str, SharedArraySpec]] = None,
+    state: Optional[Dict[str, Any]] = None
+) -> List[Any]:
+    """
+    Apply a function to chunks of work in a process pool.
+    
+    Workers attach the shared arrays once at startup; func reads them with
+    worker_array() and small settings with worker_state().
+    
+    Args:
+        func: Module-level function taking one chunk
+        chunks: Chunks of work (pickled to the workers)
+        n_jobs: Number of worker processes
+        arrays: Shared arrays from shared_arrays()
+        state: Small picklable settings for the workers
+    
+    Returns:
+        Results in chunk order
+    """
+    n_jobs = min(n_jobs, len(chunks))
+    logger.debug(f"Processing {len(chunks)} chunks with {n_jobs} workers")
+    
+    with ProcessPoolExecutor(
+        max_workers=n_jobs,
+        initializer=_init_worker,
+        initargs=(arrays or {}, state or {})
+    ) as pool:
+        return list(pool.map(func, chunks))
+
+
+def can_send_to_workers(obj: Any) -> bool:
+    """
+    Whether an object can reach worker processes.
+    
+    Forked workers inherit it; with the 'spawn' and 'forkserver' start
+    methods it must be picklable, which rules out lambdas and closures.
+    
+    Args:
+        obj: Object passed to workers through map_chunks state
+    
+    Returns:
+        True if map_chunks can pass the object to its workers
+    """
+    if multiprocessing.get_start_method() == 'fork':
+        return True
+    try:
+        pickle.dumps(obj)
+    except Exception:
+        return False
+    return True
+
+
+def split_chunks(items: Sequence[Any], n_jobs: int, per_worker: int = 4) -> List[Sequence[Any]]:
+    """Split work into a few chunks per worker, for load balancing."""
+    size = max(1, -(-len(items) // (n_jobs * per_worker)))
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def worker_array(key: str) -> np.ndarray:
+    """Shared array attached in the current worker."""
+    return _WORKER_ARRAYS[key]
+
+
+def worker_state(key: str) -> Any:
+    """Setting passed to the current worker."""
+    return _WORKER_STATE[key]
+
+
+def _init_worker(arrays: Dict[str, SharedArraySpec], state: Dict[str, Any]) -> None:
+    """Attach shared arrays (read-only) when a worker starts."""
+    for key, (name, shape, dtype) in arrays.items():
+        block = shared_memory.SharedMemory(name=name)
+        _WORKER_BLOCKS.append(block)  # Keep the mapping alive
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        array.flags.writeable = False
+        _WORKER_ARRAYS[key] = array
+    _WORKER_STATE.update(state)
\ No newline at end of file
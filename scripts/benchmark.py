@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+"""
+Benchmark suite for distfeat.
+
+Measures import time, feature-system loading, single-pair distances for
+every method, full-inventory distance matrices, sequence alignment and
+matrix I/O round trips. Uses only the standard library and distfeat's own
+dependencies, so it runs offline.
+
+Results are written as JSON and can be compared against an earlier run:
+
+    python scripts/benchmark.py --output baseline.json
+    python scripts/benchmark.py --compare baseline.json --threshold 0.25
+
+Comparison exits with status 1 if any benchmark got slower than the
+threshold allows.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+import distfeat
+from distfeat import (
+    available_distance_methods,
+    build_distance_matrix,
+    calculate_distance,
+    get_feature_matrix,
+    load_distance_matrix,
+    save_distance_matrix,
+)
+from distfeat.alignment import align_sequences
+from distfeat.distances import _pair_distance
+
+# Benchmark name -> function timed per call
+_BENCHMARKS: Dict[str, Callable[[], None]] = {}
+
+# Benchmark name -> code timed once per fresh interpreter
+_COLD_BENCHMARKS: Dict[str, str] = {}
+
+# Code run in a fresh interpreter; prints the elapsed seconds
+_COLD_TEMPLATE = """
+import time
+{setup}
+start = time.perf_counter()
+{timed}
+print(time.perf_counter() - start)
+"""
+
+
+def benchmark(name: str) -> Callable[[Callable[[], None]], Callable[[], None]]:
+    """Register an in-process benchmark."""
+    def register(func: Callable[[], None]) -> Callable[[], None]:
+        _BENCHMARKS[name] = func
+        return func
+    return register
+
+
+# Cold start, each sample in a fresh interpreter
+
+_COLD_BENCHMARKS['import/distfeat'] = _COLD_TEMPLATE.format(
+    setup='', timed='import distfeat'
+)
+_COLD_BENCHMARKS['load/feature_system_parse'] = _COLD_TEMPLATE.format(
+    setup=(
+        "import distfeat\n"
+        "from distfeat import features\n"
+        "distfeat.set_config('compile_features', False)"
+    ),
+    timed='features._initialize_features()'
+)
+_COLD_BENCHMARKS['load/feature_system_compiled'] = _COLD_TEMPLATE.format(
+    setup=(
+        "import distfeat\n"
+        "from distfeat import features\n"
+        "features._load_bundled_features()  # Make sure the compiled copy exists"
+    ),
+    timed='features._initialize_features()'
+)
+_COLD_BENCHMARKS['first_call/calculate_distance'] = _COLD_TEMPLATE.format(
+    setup='import distfeat',
+    timed="distfeat.calculate_distance('p', 'b')"
+)
+
+
+# Warm, in-process benchmarks
+
+def _register_distance_benchmarks() -> None:
+    """Single-pair, pair-kernel and full-matrix benchmarks for every method."""
+    for method in available_distance_methods():
+        def single(method: str = method) -> None:
+            calculate_distance.cache_clear()
+            calculate_distance('p', 'b', method=method)
+        
+        def matrix(method: str = method) -> None:
+            build_distance_matrix(method=method)
+        
+        benchmark(f'distance/{method}')(single)
+        benchmark(f'matrix/{method}')(matrix)
+    
+    # Uncached single-pair kernels (XOR/popcount on packed rows for binary systems)
+    store = get_feature_matrix()
+    row1, row2 = store.index['p'], store.index['b']
+    for method in ('hamming', 'jaccard', 'euclidean', 'cosine', 'manhattan'):
+        def pair(method: str = method) -> None:
+            _pair_distance(store, row1, row2, method, True)
+        
+        benchmark(f'pair_kernel/{method}')(pair)
+
+
+def _register_alignment_benchmarks() -> None:
+    """Pairwise alignment of random sequences of increasing length."""
+    store = get_feature_matrix()
+    phonemes = [store.phonemes[i] for i in store.sorted_rows[:40]]
+    rng = random.Random(0)
+    
+    for length in (5, 20, 50, 100):
+        seq1 = rng.choices(phonemes, k=length)
+        seq2 = rng.choices(phonemes, k=length)
+        
+        def align(seq1: List[str] = seq1, seq2: List[str] = seq2) -> None:
+            align_sequences(seq1, seq2)
+        
+        benchmark(f'align/length_{length}')(align)
+
+
+def _register_io_benchmarks(workdir: Path) -> None:
+    """Save and load round trips for each matrix format."""
+    store = get_feature_matrix()
+    phonemes = [store.phonemes[i] for i in store.sorted_rows[:200]]
+    matrix, labels = build_distance_matrix(phonemes)
+    
+    for fmt in ('tsv', 'csv', 'json', 'npy', 'npz'):
+        path = workdir / f'matrix.{fmt}'
+        
+        def round_trip(path: Path = path, fmt: str = fmt) -> None:
+            save_distance_matrix(matrix, labels, path, format=fmt)
+            load_distance_matrix(path, format=fmt)
+        
+        benchmark(f'io/{fmt}_round_trip')(round_trip)
+
+
+def _time_in_process(func: Callable[[], None], repeats: int, min_time: float) -> List[float]:
+    """Seconds per call over several repeats, each long enough to time reliably."""
+    func()  # Warm up caches and lazy imports
+    
+    # Calibrate the number of calls per repeat
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    
+    samples = [elapsed / number]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+def _time_in_subprocess(code: str, repeats: int) -> List[float]:
+    """Seconds reported by the code, run once per fresh interpreter."""
+    samples = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(float(output.split()[-1]))
+    return samples
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'repeats': len(samples),
+    }
+
+
+def run_benchmarks(
+    pattern: Optional[str] = None,
+    repeats: int = 5,
+    min_time: float = 0.1
+) -> Dict:
+    """
+    Run the benchmark suite.
+    
+    Args:
+        pattern: Only run benchmarks whose name contains this substring
+        repeats: Samples per benchmark
+        min_time: Minimum seconds per in-process sample
+    
+    Returns:
+        Results document with metadata and per-benchmark timings (seconds)
+    """
+    results = {}
+    
+    for name, code in _COLD_BENCHMARKS.items():
+        if pattern is None or pattern in name:
+            results[name] = _summary(_time_in_subprocess(code, repeats))
+            _report(name, results[name])
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        _register_distance_benchmarks()
+        _register_alignment_benchmarks()
+        _register_io_benchmarks(Path(workdir))
+        
+        for name, func in _BENCHMARKS.items():
+            if pattern is None or pattern in name:
+                results[name] = _summary(_time_in_process(func, repeats, min_time))
+                _report(name, results[name])
+    
+    return {
+        'metadata': {
+            'distfeat': distfeat.__version__,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        },
+        'results': results,
+    }
+
+
+def compare_results(
+    baseline: Dict,
+    current: Dict,
+    threshold: float
+) -> List[Tuple[str, float]]:
+    """
+    Compare median timings against a baseline.
+    
+    Args:
+        baseline: Earlier results document
+        current: New results document
+        threshold: Allowed slowdown as a fraction (0.25 for 25%)
+    
+    Returns:
+        List of (benchmark name, current/baseline ratio) for regressions
+    """
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            continue
+        before = baseline['results'][name]['median']
+        after = result['median']
+        ratio = after / before if before > 0 else float('inf')
+        flag = '  SLOWER' if ratio > 1 + threshold else ''
+        print(f"{name:<40} {_format_time(before):>12} {_format_time(after):>12} {ratio:>7.2f}x{flag}")
+        if flag:
+            regressions.append((name, ratio))
+    
+    return regressions
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (('s', 1.0), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def _report(name: str, summary: Dict[str, float]) -> None:
+    print(f"{name:<40} {_format_time(summary['median']):>12}  (min {_format_time(summary['min'])})",
+          file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('-k', '--filter', help="only run benchmarks whose name contains this")
+    parser.add_argument('-o', '--output', help="write results as JSON to this file")
+    parser.add_argument('--compare', help="baseline JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed slowdown before failing a comparison (default 0.25)")
+    parser.add_argument('--repeats', type=int, default=5, help="samples per benchmark")
+    parser.add_argument('--min-time', type=float, default=0.1,
+                        help="minimum seconds per in-process sample")
+    args = parser.parse_args(argv)
+    
+    results = run_benchmarks(args.filter, args.repeats, args.min_time)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than "
+                  f"{args.threshold:.0%}")
+            return 1
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
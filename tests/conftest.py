@@ -10,6 +10,44 @@ from pathlib import Path
 
 # Test data and fixtures
 
+@pytest.fixture(scope="session", autouse=True)
+def isolated_cache_dir(tmp_path_factory):
+    """Keep on-disk caches (compiled feature systems etc.) out of ~/.cache."""
+    cache_dir = tmp_path_factory.mktemp("distfeat-cache")
+    # The environment variable survives reset_config() and reaches subprocesses
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DISTFEAT_CACHE_DIR", str(cache_dir))
+        yield cache_dir
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    """Per-test cache directory, starting without loaded distance tables or k-means models."""
+    from distfeat import clear_distance_tables, get_config, set_config
+    
+    original = {
+        key: get_config(key)
+        for key in ('cache_dir', 'compile_features', 'kmeans_disk_cache')
+    }
+    set_config('cache_dir', str(tmp_path))
+    clear_distance_tables()
+    yield tmp_path
+    for key, value in original.items():
+        set_config(key, value)
+    clear_distance_tables()
+
+@pytest.fixture(autouse=True)
+def restore_distance_methods():
+    """Unregister distance methods a test registers, and their cached distances."""
+    from distfeat.distances import _DISTANCE_CACHE, _DISTANCE_METHODS
+    
+    original = dict(_DISTANCE_METHODS)
+    yield
+    for name in set(_DISTANCE_METHODS) | set(original):
+        if _DISTANCE_METHODS.get(name) is not original.get(name):
+            _DISTANCE_CACHE.invalidate_method(name)
+    _DISTANCE_METHODS.clear()
+    _DISTANCE_METHODS.update(original)
+
 @pytest.fixture(scope="session")
 def test_phonemes():
     """Standard set of test phonemes for consistent testing."""
@@ -115,14 +153,6 @@ def fuzzy_equal(a, b, tolerance=1e-6):
 
 # Skip conditions
 
-skip_if_no_sklearn = pytest.mark.skipif(
-    not _has_sklearn(), reason="scikit-learn not available"
-)
-
-skip_if_no_memory_profiler = pytest.mark.skipif(
-    not _has_memory_profiler(), reason="memory_profiler not available"
-)
-
 def _has_sklearn():
     """Check if sklearn is available."""
     try:
@@ -139,6 +169,14 @@ def _has_memory_profiler():
     except ImportError:
         return False
 
+skip_if_no_sklearn = pytest.mark.skipif(
+    not _has_sklearn(), reason="scikit-learn not available"
+)
+
+skip_if_no_memory_profiler = pytest.mark.skipif(
+    not _has_memory_profiler(), reason="memory_profiler not available"
+)
+
 # Test data generators
 
 def generate_phoneme_pairs(phonemes, max_pairs=100):
@@ -0,0 +1,277 @@
+"""
+Unit tests for sequence alignment.
+"""
+
+import pytest
+import numpy as np
+from distfeat import calculate_distance, get_feature_matrix
+from distfeat.alignment import (
+    align_sequences,
+    substitution_matrix
+)
+
+
+def _reference_alignment(seq1, seq2, method='hamming', gap_penalty=1.0, normalize=True):
+    """Cell-by-cell Needleman-Wunsch with per-pair distance lookups."""
+    def cost(p1, p2):
+        dist = calculate_distance(p1, p2, method=method, normalize=normalize, on_error='ignore')
+        return (1.0 if normalize else 2.0) if dist is None else dist
+    
+    m, n = len(seq1), len(seq2)
+    dp = np.zeros((m + 1, n + 1))
+    dp[:, 0] = np.arange(m + 1) * gap_penalty
+    dp[0, :] = np.arange(n + 1) * gap_penalty
+    for i in range(1, m + 1):
+        for j in range(1, n + 1):
+            dp[i, j] = min(
+                dp[i-1, j-1] + cost(seq1[i-1], seq2[j-1]),
+                dp[i-1, j] + gap_penalty,
+                dp[i, j-1] + gap_penalty
+            )
+    return dp[m, n]
+
+
+def _random_sequences(seed, length, n_phonemes=40):
+    """Two random sequences over part of the inventory."""
+    rng = np.random.default_rng(seed)
+    inventory = get_feature_matrix().phonemes[:n_phonemes]
+    return (
+        [inventory[k] for k in rng.integers(0, n_phonemes, length)],
+        [inventory[k] for k in rng.integers(0, n_phonemes, length + 3)],
+    )
+
+
+class TestAlignSequences:
+    """Test the vectorized Needleman-Wunsch aligner."""
+    
+    @pytest.mark.parametrize("length", [5, 40])
+    def test_matches_reference(self, length):
+        """Test scores equal a cell-by-cell reference implementation."""
+        seq1, seq2 = _random_sequences(length, length)
+        
+        for method in ['hamming', 'euclidean', 'cosine']:
+            for gap_penalty in (1.0, 0.3):
+                result = align_sequences(seq1, seq2, method=method, gap_penalty=gap_penalty)
+                assert result.score == _reference_alignment(seq1, seq2, method, gap_penalty)
+    
+    def test_alignment_consistent_with_score(self):
+        """Test the traced alignment accounts for the whole score."""
+        seq1, seq2 = _random_sequences(1, 60)
+        result = align_sequences(seq1, seq2, gap_penalty=0.5)
+        
+        assert [p for p in result.seq1_aligned if p != '-'] == seq1
+        assert [p for p in result.seq2_aligned if p != '-'] == seq2
+        
+        total = 0.0
+        for p1, p2 in zip(result.seq1_aligned, result.seq2_aligned):
+            assert not (p1 == '-' and p2 == '-')
+            total += 0.5 if '-' in (p1, p2) else calculate_distance(p1, p2)
+        assert total == pytest.approx(result.score)
+    
+    def test_long_identical_sequences(self):
+        """Test long transcriptions align without gaps."""
+        seq, _ = _random_sequences(2, 250)
+        result = align_sequences(seq, seq)
+        
+        assert result.score == 0.0
+        assert result.seq1_aligned == seq
+        assert result.seq2_aligned == seq
+    
+    def test_unknown_phonemes(self):
+        """Test unknown phonemes cost the maximum substitution."""
+        result = align_sequences(['zzz'], ['p'])
+        assert result.score == 1.0
+        
+        result = align_sequences(['zzz'], ['p'], normalize=False, gap_penalty=5.0)
+        assert result.score == 2.0
+
+
+class TestSubstitutionMatrix:
+    """Test substitution cost matrices."""
+    
+    def test_matches_pairwise(self):
+        """Test costs equal per-pair distances, with repeated phonemes."""
+        seq1 = ['p', 'a', 'p', 'zzz']
+        seq2 = ['b', 'a', 'a']
+        costs = substitution_matrix(seq1, seq2, method='jaccard')
+        
+        assert costs.shape == (4, 3)
+        for i, p1 in enumerate(seq1[:-1]):
+            for j, p2 in enumerate(seq2):
+                assert costs[i, j] == calculate_distance(p1, p2, method='jaccard')
+        assert np.all(costs[3] == 1.0)
+
+
+class TestAlignBatch:
+    """Test batch alignment of many pairs."""
+    
+    @pytest.fixture
+    def pairs(self):
+        """Random pairs, including empty and unknown sequences."""
+        pairs = [_random_sequences(seed, seed % 7 + 1) for seed in range(30)]
+        return pairs + [([], ['p']), (['a'], []), ([], []), (['zzz', 'a'], ['p', 'a'])]
+    
+    def test_matches_align_sequences(self, pairs):
+        """Test batch results equal aligning one pair at a time."""
+        from distfeat.alignment import align_batch
+        
+        results = align_batch(pairs, gap_penalty=0.7, n_jobs=1)
+        
+        assert len(results) == len(pairs)
+        for result, (seq1, seq2) in zip(results, pairs):
+            assert result == align_sequences(seq1, seq2, gap_penalty=0.7)
+    
+    def test_process_pool(self, pairs):
+        """Test worker processes give the same results."""
+        from distfeat.alignment import align_batch
+        
+        serial = align_batch(pairs, method='jaccard', n_jobs=1)
+        parallel = align_batch(pairs, method='jaccard', n_jobs=2)
+        
+        assert parallel == serial
+    
+    def test_cognate_set(self):
+        """Test cognate set averages use the batch aligner."""
+        from distfeat.alignment import align_cognate_set
+        
+        cognates = [['k', 'a', 't'], ['k', 'a', 't', 's', 'ə'], ['g', 'a', 't']]
+        expected = np.mean([
+            align_sequences(cognates[i], cognates[j]).normalized_distance
+            for i, j in [(0, 1), (0, 2), (1, 2)]
+        ])
+        
+        assert align_cognate_set(cognates) == expected
+
+
+class TestBandedAlignment:
+    """Test banded and early-abandon alignment."""
+    
+    @pytest.mark.parametrize("length", [6, 40])
+    def test_wide_band_is_exact(self, length):
+        """Test a band covering the optimal path gives the full result."""
+        seq1, seq2 = _random_sequences(length + 1, length)
+        
+        full = align_sequences(seq1, seq2)
+        assert align_sequences(seq1, seq2, band=length + 3) == full
+    
+    @pytest.mark.parametrize("length", [6, 40])
+    def test_narrow_band_upper_bound(self, length):
+        """Test banded scores never undercut the full alignment."""
+        seq1, seq2 = _random_sequences(length + 2, length)
+        
+        full = align_sequences(seq1, seq2, gap_penalty=0.4)
+        banded = align_sequences(seq1, seq2, gap_penalty=0.4, band=0)
+        
+        assert banded.score >= full.score
+        assert [p for p in banded.seq1_aligned if p != '-'] == seq1
+        assert [p for p in banded.seq2_aligned if p != '-'] == seq2
+    
+    @pytest.mark.parametrize("length", [6, 40])
+    def test_max_distance(self, length):
+        """Test alignments beyond the cutoff are abandoned."""
+        seq1, seq2 = _random_sequences(length + 3, length)
+        full = align_sequences(seq1, seq2)
+        
+        below = align_sequences(seq1, seq2, max_distance=full.normalized_distance)
+        assert below == full
+        assert not below.above_threshold
+        
+        above = align_sequences(seq1, seq2, max_distance=full.normalized_distance / 2)
+        assert above.above_threshold
+        assert above.normalized_distance == np.inf
+        assert above.seq1_aligned == []
+    
+    def test_batch_options(self):
+        """Test batch alignment supports band and max_distance."""
+        from distfeat.alignment import align_batch
+        
+        pairs = [(['p', 'a', 't', 'a'], ['b', 'a', 't', 'a']), (['p', 'a'], ['i', 'u', 'k', 'ŋ'])]
+        results = align_batch(pairs, band=1, max_distance=0.3)
+        
+        assert results == [align_sequences(s1, s2, band=1, max_distance=0.3) for s1, s2 in pairs]
+        assert not results[0].above_threshold
+        assert results[1].above_threshold
+
+
+class TestAlignmentDistance:
+    """Test score-only alignment."""
+    
+    @pytest.mark.parametrize("length", [5, 60])
+    def test_matches_full_alignment(self, length):
+        """Test the distance equals the full path, including transposed inputs."""
+        from distfeat.alignment import alignment_distance
+        
+        seq1, seq2 = _random_sequences(length + 4, length)
+        
+        for gap_penalty in (1.0, 0.4):
+            full = align_sequences(seq1, seq2, gap_penalty=gap_penalty)
+            assert alignment_distance(seq1, seq2, gap_penalty=gap_penalty) == full.normalized_distance
+            assert alignment_distance(seq2, seq1, gap_penalty=gap_penalty) == full.normalized_distance
+    
+    @pytest.mark.parametrize("length", [5, 60])
+    def test_band_and_cutoff(self, length):
+        """Test banded and thresholded distances match the full path."""
+        from distfeat.alignment import alignment_distance
+        
+        seq1, seq2 = _random_sequences(length + 5, length)
+        
+        for kwargs in [{'band': 1}, {'max_distance': 0.05}, {'max_distance': 0.5}]:
+            full = align_sequences(seq1, seq2, **kwargs)
+            assert alignment_distance(seq1, seq2, **kwargs) == full.normalized_distance
+    
+    def test_batch(self):
+        """Test batch distances equal single calls."""
+        from distfeat.alignment import alignment_distance, alignment_distances
+        
+        pairs = [_random_sequences(seed, seed % 5 + 1) for seed in range(20)]
+        pairs += [([], ['p', 'a']), (['zzz'], ['p'])]
+        
+        distances = alignment_distances(pairs, gap_penalty=0.6)
+        
+        assert distances.shape == (len(pairs),)
+        assert distances.tolist() == [alignment_distance(s1, s2, gap_penalty=0.6) for s1, s2 in pairs]
+    
+    def test_no_full_cost_matrix(self):
+        """Test long sequences are scored without an (m x n) allocation."""
+        import tracemalloc
+        from distfeat.alignment import alignment_distance
+        
+        seq1, seq2 = _random_sequences(0, 1000)
+        alignment_distance(seq1[:40], seq2[:40])  # Warm up caches
+        
+        tracemalloc.start()
+        try:
+            alignment_distance(seq1, seq2)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        assert peak < len(seq1) * len(seq2) * 8 // 10
+
+
+class TestCustomSystemAlignment:
+    """Test alignment against a custom feature system."""
+    
+    def test_system_argument(self, tmp_path):
+        """Test substitution costs come from the requested system."""
+        from distfeat import load_custom_features
+        from distfeat.alignment import align_batch, alignment_distance, alignment_distances
+        
+        path = tmp_path / 'toy.tsv'
+        path.write_text(
+            "phoneme\tvoice\tnasal\np\t-\t-\nb\t+\t-\nm\t+\t+\n", encoding='utf-8'
+        )
+        load_custom_features(path, 'toy_alignment')
+        
+        sub = substitution_matrix(['p', 'x'], ['b', 'm'], system='toy_alignment')
+        assert sub.tolist() == [[0.5, 1.0], [1.0, 1.0]]
+        
+        result = align_sequences(['p', 'm'], ['b', 'm'], system='toy_alignment')
+        assert result.normalized_distance == pytest.approx(0.25)
+        assert alignment_distance(['p', 'm'], ['b', 'm'], system='toy_alignment') == pytest.approx(0.25)
+        
+        pairs = [(['p', 'm'], ['b', 'm']), (['m'], ['p'])]
+        distances = alignment_distances(pairs, system='toy_alignment')
+        assert distances == pytest.approx([0.25, 1.0])
+        batch = align_batch(pairs, system='toy_alignment')
+        assert [r.normalized_distance for r in batch] == pytest.approx([0.25, 1.0])
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""
+Unit tests for the distance cache.
+"""
+
+import threading
+import pytest
+import numpy as np
+from distfeat import DistanceCache, calculate_distance, get_config, set_config
+from distfeat.cache import MISSING
+
+
+class TestDistanceCache:
+    """Test the bounded LRU cache itself."""
+    
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted first."""
+        cache = DistanceCache(maxsize=2)
+        cache.put('a', 1.0)
+        cache.put('b', 2.0)
+        assert cache.get('a') == 1.0  # 'b' is now least recently used
+        cache.put('c', 3.0)
+        
+        assert cache.get('b') is MISSING
+        assert cache.get('a') == 1.0 and cache.get('c') == 3.0
+        info = cache.info()
+        assert (info.hits, info.misses, info.currsize, info.evictions) == (3, 1, 2, 1)
+    
+    def test_unordered_keys(self):
+        """Test symmetric keys ignore pair order, asymmetric ones do not."""
+        make_key = DistanceCache.make_key
+        
+        assert make_key('sys', 'hamming', 3, 7) == make_key('sys', 'hamming', 7, 3)
+        assert make_key('sys', 'custom', 3, 7, symmetric=False) != \
+            make_key('sys', 'custom', 7, 3, symmetric=False)
+    
+    def test_invalidate_system(self):
+        """Test invalidation drops only the given feature system."""
+        cache = DistanceCache(maxsize=10)
+        cache.put(DistanceCache.make_key('old', 'hamming', 0, 1), 0.5)
+        cache.put(DistanceCache.make_key('new', 'hamming', 0, 1), 0.25)
+        
+        assert cache.invalidate('old') == 1
+        assert len(cache) == 1
+        assert cache.get(DistanceCache.make_key('new', 'hamming', 1, 0)) == 0.25
+    
+    def test_invalidate_method(self):
+        """Test method invalidation drops that method in every system."""
+        cache = DistanceCache(maxsize=10)
+        cache.put(DistanceCache.make_key('a', ('custom', True), 0, 1), 0.5)
+        cache.put(DistanceCache.make_key('b', ('custom', False), 0, 1), 0.5)
+        cache.put(DistanceCache.make_key('a', ('hamming', True), 0, 1), 0.25)
+        cache.put(DistanceCache.make_key('a', 'custom', 0, 1), 0.5)
+        
+        assert cache.invalidate_method('custom') == 3
+        assert len(cache) == 1
+    
+    def test_size_follows_config(self):
+        """Test caches without an explicit size track 'cache_size'."""
+        original = get_config('cache_size')
+        cache = DistanceCache()
+        try:
+            set_config('cache_size', 3)
+            for i in range(5):
+                cache.put(i, float(i))
+            assert cache.info().maxsize == 3
+            assert len(cache) == 3
+        finally:
+            set_config('cache_size', original)
+        
+        with pytest.raises(ValueError):
+            DistanceCache(maxsize=-1)
+    
+    def test_aliases(self):
+        """Test aliases reach live entries only and count hits."""
+        cache = DistanceCache(maxsize=2)
+        cache.put(DistanceCache.make_key('s', 'hamming', 0, 1), 1.0, alias=('p', 'b'))
+        cache.put(DistanceCache.make_key('s', 'cosine', 0, 1), 2.0, alias=('p', 'b', 'cosine'))
+        
+        assert cache.get_alias(('p', 'b')) == 1.0
+        assert cache.get_alias(('b', 'p')) is MISSING
+        assert cache.info().hits == 1
+        assert cache.info().misses == 0
+        
+        # Evicts the cosine entry, the least recently used
+        cache.put(DistanceCache.make_key('s', 'jaccard', 0, 1), 3.0)
+        assert cache.get_alias(('p', 'b', 'cosine')) is MISSING
+        
+        cache.invalidate_method('hamming')
+        assert cache.get_alias(('p', 'b')) is MISSING
+        
+        empty = DistanceCache(maxsize=0)
+        empty.put('a', 1.0, alias=('raw', 'a'))
+        assert empty.get_alias(('raw', 'a')) is MISSING
+    
+    def test_thread_safety(self):
+        """Test concurrent use keeps the size bound and consistent counts."""
+        cache = DistanceCache(maxsize=50)
+        
+        def work(offset):
+            for i in range(500):
+                key = (offset + i) % 80
+                if cache.get(key) is MISSING:
+                    cache.put(key, float(key))
+        
+        threads = [threading.Thread(target=work, args=(n * 7,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        info = cache.info()
+        assert info.currsize <= 50
+        assert info.hits + info.misses == 8 * 500
+
+
+class TestCalculateDistanceCache:
+    """Test calculate_distance's use of the cache."""
+    
+    def test_pair_order_shares_entry(self):
+        """Test (a, b) and (b, a) hit the same entry."""
+        calculate_distance.cache_clear()
+        
+        first = calculate_distance('p', 'b')
+        second = calculate_distance('b', 'p')
+        
+        info = calculate_distance.cache_info()
+        assert first == second
+        assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+    
+    def test_options_kept_apart(self):
+        """Test method options and weights get separate entries."""
+        calculate_distance.cache_clear()
+        
+        normalized = calculate_distance('p', 'a')
+        raw = calculate_distance('p', 'a', normalize=False)
+        weighted = calculate_distance('p', 'a', method='weighted_hamming', weights={'voice': 5.0})
+        
+        assert raw > normalized
+        assert weighted != calculate_distance('p', 'a', method='weighted_hamming')
+        assert calculate_distance.cache_info().currsize == 4
+    
+    def test_reloaded_system_not_stale(self, tmp_path):
+        """Test repeated calls see the contents of a reloaded system."""
+        from distfeat import load_custom_features
+        
+        path = tmp_path / 'toy.tsv'
+        path.write_text("phoneme\tvoice\tnasal\np\t-\t-\nm\t+\t+\n", encoding='utf-8')
+        load_custom_features(path, 'toy_reload')
+        assert calculate_distance('p', 'm', system='toy_reload') == 1.0
+        
+        path.write_text("phoneme\tvoice\tnasal\np\t-\t-\nm\t+\t-\n", encoding='utf-8')
+        load_custom_features(path, 'toy_reload')
+        assert calculate_distance('p', 'm', system='toy_reload') == 0.5
+    
+    def test_reregistered_method_not_stale(self):
+        """Test re-registering a method drops its cached distances."""
+        from distfeat import calculate_distances, register_distance_method
+        
+        register_distance_method('reregistered', lambda a, b: float(np.abs(a - b).sum()))
+        first = calculate_distance('p', 'b', method='reregistered')
+        
+        register_distance_method('reregistered', lambda a, b: 5.0, normalization='none')
+        assert first != 5.0
+        assert calculate_distance('p', 'b', method='reregistered') == 5.0
+        assert calculate_distances([('p', 'b')], method='reregistered').tolist() == [5.0]
+    
+    def test_unknown_phonemes_not_cached(self):
+        """Test failed lookups are not stored."""
+        calculate_distance.cache_clear()
+        
+        assert calculate_distance('zzz', 'p', on_error='ignore') is None
+        assert calculate_distance.cache_info().currsize == 0
+        with pytest.raises(ValueError):
+            calculate_distance('zzz', 'p', on_error='raise')
+    
+    def test_system_reload_while_caching(self):
+        """Test dropping a replaced system's entries tolerates concurrent inserts."""
+        from distfeat import distances
+        from distfeat.features import get_feature_matrix
+        
+        store = get_feature_matrix()
+        done = threading.Event()
+        
+        def fill():
+            i = 0
+            while not done.is_set():
+                distances._KMEANS_MODELS[('filler', i, 0)] = None
+                distances._KMEANS_MODELS.pop(('filler', i - 50, 0), None)
+                i += 1
+        
+        thread = threading.Thread(target=fill)
+        thread.start()
+        try:
+            for _ in range(5000):
+                distances._forget_system(store)
+        finally:
+            done.set()
+            thread.join()
+            for key in list(distances._KMEANS_MODELS):
+                if key[0] == 'filler':
+                    del distances._KMEANS_MODELS[key]
\ No newline at end of file
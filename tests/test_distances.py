@@ -177,6 +177,40 @@ class TestDistanceMatrix:
         # (phonemes in same cluster should have 0 distance)
         unique_distances = np.unique(matrix)
         assert len(unique_distances) <= 4  # At most n_clusters + 1 unique values
+    
+    def test_matrix_matches_pairwise(self):
+        """Test vectorized matrix equals per-pair distances."""
+        phonemes = ['p', 'b', 't', 'd', 'a', 'i', 'u', 'ŋ', 'ʃ', 'ts']
+        
+        for method in ['hamming', 'jaccard', 'euclidean', 'cosine', 'manhattan']:
+            for normalize in (True, False):
+                matrix, _ = build_distance_matrix(
+                    phonemes, method=method, normalize=normalize
+                )
+                for i, p1 in enumerate(phonemes):
+                    for j, p2 in enumerate(phonemes):
+                        expected = calculate_distance(
+                            p1, p2, method=method, normalize=normalize
+                        )
+                        assert matrix[i, j] == expected, \
+                            f"Method {method} differs for {p1}-{p2}"
+    
+    def test_matrix_missing_phonemes(self):
+        """Test unknown phonemes get maximum distance."""
+        matrix, _ = build_distance_matrix(['p', 'zzz', 'b'])
+        assert matrix[0, 1] == matrix[1, 2] == 1.0
+        assert matrix[1, 1] == 0.0
+        
+        matrix, _ = build_distance_matrix(['p', 'zzz'], normalize=False)
+        assert np.isinf(matrix[0, 1])
+    
+    def test_full_inventory_matrix(self):
+        """Test building the matrix for the whole bundled inventory."""
+        matrix, labels = build_distance_matrix()
+        
+        assert matrix.shape == (len(labels), len(labels))
+        assert labels == sorted(labels)
+        assert np.allclose(matrix, matrix.T)
 
 
 class TestCustomDistances:
@@ -193,4 +227,628 @@ class TestCustomDistances:
         
         # Test using custom method
         dist = calculate_distance('p', 'b', method='manhattan_squared')
-        assert dist is not None
\ No newline at end of file
+        assert dist is not None
+
+
+class TestDistanceTables:
+    """Test precomputed, persisted distance tables."""
+    
+    def test_precompute_writes_tables(self, cache_dir):
+        """Test tables are written under the cache directory."""
+        from distfeat import precompute_distance_tables
+        
+        path = precompute_distance_tables(methods=['hamming', 'cosine'])
+        
+        assert path.parent.parent == cache_dir
+        assert (path / 'hamming-normalized.npy').exists()
+        assert (path / 'cosine-normalized.npy').exists()
+    
+    def test_cold_lookup_uses_table(self, cache_dir, monkeypatch):
+        """Test a fresh lookup reads the persisted table without computing."""
+        from distfeat import precompute_distance_tables, clear_distance_tables
+        import distfeat.distances as distances
+        
+        pairs = [('p', 'b'), ('a', 'i'), ('ʃ', 'k'), ('k', 'ʃ')]
+        expected = [calculate_distance(p1, p2, method='euclidean') for p1, p2 in pairs]
+        matrix, _ = build_distance_matrix(['p', 'b', 'zzz'], method='euclidean')
+        
+        precompute_distance_tables(methods=['euclidean'])
+        clear_distance_tables()  # Simulate a cold worker
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("distance was computed instead of looked up")
+        monkeypatch.setattr(distances, '_pairwise_rows', fail)
+        
+        served = [calculate_distance(p1, p2, method='euclidean') for p1, p2 in pairs]
+        assert served == expected
+        
+        served_matrix, _ = build_distance_matrix(['p', 'b', 'zzz'], method='euclidean')
+        assert np.array_equal(served_matrix, matrix)
+    
+    def test_missing_table_falls_back(self, cache_dir):
+        """Test methods without a table are still computed."""
+        dist = calculate_distance('p', 'b', method='manhattan', normalize=False)
+        assert dist == calculate_distance('b', 'p', method='manhattan', normalize=False)
+        assert dist > 0
+    
+    def test_no_home_directory(self, cache_dir, monkeypatch):
+        """Test distances are computed when there is no cache directory to look in."""
+        from pathlib import Path
+        from distfeat import calculate_distances, set_config
+        
+        def no_home():
+            raise RuntimeError("Could not determine home directory.")
+        
+        monkeypatch.delenv('DISTFEAT_CACHE_DIR', raising=False)
+        monkeypatch.setattr(Path, 'home', staticmethod(no_home))
+        set_config('cache_dir', None)
+        
+        matrix, _ = build_distance_matrix(['p', 'b', 'm'], method='hamming')
+        dists = calculate_distances([('p', 'b'), ('b', 'm')], method='hamming')
+        
+        assert dists.tolist() == [matrix[0, 1], matrix[1, 2]]
+
+
+class TestCondensedMatrix:
+    """Test condensed (upper-triangle) distance matrices."""
+    
+    def test_condensed_matches_square(self):
+        """Test condensed output holds the square matrix's upper triangle."""
+        from distfeat import condensed_to_square
+        
+        phonemes = ['p', 'b', 'zzz', 'a', 'i']
+        square, _ = build_distance_matrix(phonemes, method='euclidean')
+        condensed, labels = build_distance_matrix(
+            phonemes, method='euclidean', condensed=True
+        )
+        
+        n = len(phonemes)
+        assert labels == phonemes
+        assert condensed.shape == (n * (n - 1) // 2,)
+        assert np.array_equal(condensed_to_square(condensed), square)
+    
+    def test_condensed_dtype(self):
+        """Test reduced-precision condensed storage."""
+        phonemes = ['p', 'b', 't', 'd']
+        condensed, _ = build_distance_matrix(
+            phonemes, condensed=True, dtype='float16'
+        )
+        
+        assert condensed.dtype == np.float16
+        assert condensed.nbytes == 6 * 2
+    
+    def test_condensed_index(self):
+        """Test indexing into condensed matrices."""
+        from distfeat import condensed_index, square_to_condensed
+        
+        phonemes = ['p', 'b', 't', 'd', 'k']
+        square, _ = build_distance_matrix(phonemes, method='manhattan')
+        condensed = square_to_condensed(square)
+        
+        n = len(phonemes)
+        for i in range(n):
+            for j in range(n):
+                if i != j:
+                    assert condensed[condensed_index(n, i, j)] == square[i, j]
+        
+        with pytest.raises(ValueError):
+            condensed_index(n, 2, 2)
+
+
+class TestBatchDistances:
+    """Test the batched distance API."""
+    
+    def test_pairs_match_single_calls(self):
+        """Test batched results equal calculate_distance."""
+        from distfeat import calculate_distances
+        
+        pairs = [('p', 'b'), ('a', 'i'), ('ʃ', 's'), ('k', 'k'), ('m', 'ŋ')]
+        
+        for method in ['hamming', 'jaccard', 'euclidean', 'cosine', 'manhattan']:
+            for normalize in (True, False):
+                dists = calculate_distances(pairs, method=method, normalize=normalize)
+                expected = [
+                    calculate_distance(p1, p2, method=method, normalize=normalize)
+                    for p1, p2 in pairs
+                ]
+                assert dists.tolist() == expected
+    
+    def test_single_calls_match_on_non_binary_system(self, tmp_path):
+        """Test single lookups equal batched results for multi-valued features."""
+        from distfeat import calculate_distances, load_custom_features
+        
+        path = tmp_path / 'graded.tsv'
+        path.write_text(
+            "phoneme\theight\tfront\tround\n"
+            "i\t2\t1\t0\ne\t1\t1\t0\na\t-1\t0\t0\nu\t2\t-1\t1\nə\t0\t0\t0\n",
+            encoding='utf-8'
+        )
+        load_custom_features(path, 'graded_single')
+        pairs = [(p1, p2) for p1 in 'ieauə' for p2 in 'ieauə']
+        
+        for method in ['hamming', 'jaccard', 'euclidean', 'cosine', 'manhattan']:
+            for normalize in (True, False):
+                calculate_distance.cache_clear()
+                dists = calculate_distances(
+                    pairs, method=method, normalize=normalize, system='graded_single'
+                )
+                expected = [
+                    calculate_distance(p1, p2, method=method, normalize=normalize,
+                                       system='graded_single')
+                    for p1, p2 in pairs
+                ]
+                assert dists.tolist() == expected
+    
+    def test_two_sequences(self):
+        """Test passing first and second phonemes as separate sequences."""
+        from distfeat import calculate_distances
+        
+        dists = calculate_distances(['p', 't'], ['b', 'd'], method='manhattan')
+        
+        assert dists.shape == (2,)
+        assert dists[0] == calculate_distance('p', 'b', method='manhattan')
+        
+        with pytest.raises(ValueError):
+            calculate_distances(['p', 't'], ['b'])
+    
+    def test_unknown_phonemes_filled(self):
+        """Test unknown phonemes produce the fill value."""
+        from distfeat import calculate_distances
+        
+        dists = calculate_distances([('p', 'zzz'), ('p', 'b')])
+        assert np.isnan(dists[0])
+        assert not np.isnan(dists[1])
+        
+        dists = calculate_distances([('zzz', 'p')], fill_value=1.0)
+        assert dists[0] == 1.0
+
+
+class TestCrossDistanceMatrix:
+    """Test rectangular distance matrices between two inventories."""
+    
+    def test_matches_square_matrix(self):
+        """Test cross distances equal the corresponding square entries."""
+        from distfeat import build_cross_distance_matrix
+        
+        rows = ['p', 'b', 'a']
+        cols = ['t', 'd', 'i', 'u']
+        square, labels = build_distance_matrix(rows + cols, method='jaccard')
+        
+        matrix, row_labels, col_labels = build_cross_distance_matrix(rows, cols, method='jaccard')
+        
+        assert matrix.shape == (3, 4)
+        assert row_labels == rows
+        assert col_labels == cols
+        assert np.array_equal(matrix, square[:3, 3:])
+    
+    def test_full_inventory_columns(self):
+        """Test omitted columns default to the whole inventory."""
+        from distfeat import build_cross_distance_matrix
+        
+        matrix, _, cols = build_cross_distance_matrix(['p', 'zzz'], method='hamming')
+        
+        assert matrix.shape == (2, len(cols))
+        assert matrix[0, cols.index('p')] == 0.0
+        assert matrix[0, cols.index('b')] == calculate_distance('p', 'b')
+        assert np.all(matrix[1] == 1.0)
+    
+    def test_dtype(self):
+        """Test reduced precision output."""
+        from distfeat import build_cross_distance_matrix
+        
+        matrix, _, _ = build_cross_distance_matrix(['p'], ['b', 't'], dtype='float32')
+        assert matrix.dtype == np.float32
+
+
+class TestKMeansModel:
+    """Test the cached full-inventory k-means model."""
+    
+    def test_fitted_once(self, cache_dir, monkeypatch):
+        """Test pairs and matrices reuse one clustering."""
+        from sklearn.cluster import KMeans
+        from distfeat import distances
+        
+        fits = []
+        original = KMeans.fit_predict
+        
+        def counting_fit(self, X):
+            fits.append(len(X))
+            return original(self, X)
+        
+        monkeypatch.setattr(KMeans, 'fit_predict', counting_fit)
+        
+        calculate_distance('p', 'a', method='kmeans', n_clusters=5)
+        calculate_distance('t', 'i', method='kmeans', n_clusters=5)
+        build_distance_matrix(['p', 'b', 'a'], method='kmeans', n_clusters=5)
+        
+        assert len(fits) == 1
+        assert fits[0] == len(distances.get_feature_matrix())
+    
+    def test_pairs_consistent_with_matrix(self, cache_dir):
+        """Test single-pair distances equal the matrix entries."""
+        phonemes = ['p', 'b', 't', 'a', 'i', 'zzz']
+        matrix, _ = build_distance_matrix(phonemes, method='kmeans', n_clusters=4)
+        
+        for i, p1 in enumerate(phonemes[:-1]):
+            for j, p2 in enumerate(phonemes[:-1]):
+                dist = calculate_distance(p1, p2, method='kmeans', n_clusters=4)
+                assert dist == pytest.approx(matrix[i, j])
+        assert np.all(matrix[-1, :-1] == 1.0)
+    
+    def test_disk_cache(self, cache_dir):
+        """Test fitted models are persisted and reloaded."""
+        from distfeat import set_config, clear_distance_tables
+        
+        set_config('kmeans_disk_cache', True)
+        before = calculate_distance('p', 'a', method='kmeans', n_clusters=6)
+        
+        files = list(cache_dir.glob('kmeans-v*/*/k6-seed*.npz'))
+        assert len(files) == 1
+        
+        clear_distance_tables()
+        assert calculate_distance('p', 'a', method='kmeans', n_clusters=6) == before
+    
+    @pytest.mark.parametrize("disk_cache", [False, True])
+    def test_no_home_directory(self, cache_dir, monkeypatch, disk_cache):
+        """Test models are fitted in memory when there is no cache directory."""
+        from pathlib import Path
+        from distfeat import set_config
+        
+        def no_home():
+            raise RuntimeError("Could not determine home directory.")
+        
+        monkeypatch.delenv('DISTFEAT_CACHE_DIR', raising=False)
+        monkeypatch.setattr(Path, 'home', staticmethod(no_home))
+        set_config('cache_dir', None)
+        set_config('kmeans_disk_cache', disk_cache)
+        
+        matrix, _ = build_distance_matrix(['p', 'a'], method='kmeans', n_clusters=3)
+        assert calculate_distance('p', 'a', method='kmeans', n_clusters=3) == matrix[0, 1]
+    
+    def test_unwritable_cache_dir(self, cache_dir):
+        """Test a failed save keeps the in-memory model."""
+        from distfeat import set_config
+        
+        # A file where the model directory should go makes every write fail
+        (cache_dir / 'kmeans-v1').write_text('')
+        set_config('kmeans_disk_cache', True)
+        
+        matrix, _ = build_distance_matrix(['p', 'a'], method='kmeans', n_clusters=3)
+        assert calculate_distance('p', 'a', method='kmeans', n_clusters=3) == matrix[0, 1]
+
+
+class TestKMeansMatrix:
+    """Test the vectorized k-means distance matrix."""
+    
+    def test_full_inventory(self):
+        """Test the full-inventory matrix agrees with pairs and batches."""
+        from distfeat import calculate_distances
+        
+        matrix, labels = build_distance_matrix(method='kmeans', n_clusters=8)
+        
+        assert matrix.shape == (len(labels), len(labels))
+        assert np.array_equal(matrix, matrix.T)
+        assert np.all(np.diag(matrix) == 0.0)
+        assert matrix.max() == 1.0
+        
+        idx = [labels.index(p) for p in ['p', 'a', 'ʃ']]
+        pairs = [('p', 'a'), ('a', 'ʃ'), ('p', 'ʃ')]
+        expected = [matrix[idx[0], idx[1]], matrix[idx[1], idx[2]], matrix[idx[0], idx[2]]]
+        
+        assert calculate_distances(pairs, method='kmeans', n_clusters=8).tolist() == expected
+        assert calculate_distance('p', 'a', method='kmeans', n_clusters=8) == expected[0]
+    
+    def test_cross_matrix(self):
+        """Test rectangular k-means matrices use the same clustering."""
+        from distfeat import build_cross_distance_matrix
+        
+        square, _ = build_distance_matrix(['p', 'a', 'i', 'zzz'], method='kmeans')
+        cross, _, _ = build_cross_distance_matrix(['p', 'zzz'], ['a', 'i'], method='kmeans')
+        
+        assert np.array_equal(cross, square[[0, 3]][:, [1, 2]])
+
+
+class TestParallelCustomMatrix:
+    """Test the process-pool builder for custom distance methods."""
+    
+    @staticmethod
+    def _root_manhattan(vec1, vec2):
+        return float(np.sum(np.abs(vec1 - vec2)) ** 0.5)
+    
+    def test_matches_serial(self, monkeypatch):
+        """Test parallel tiles reproduce the serial matrix exactly."""
+        from distfeat import distances, get_feature_system
+        
+        monkeypatch.setattr(distances, '_PARALLEL_MIN_PAIRS', 0)
+        register_distance_method('root_manhattan', self._root_manhattan)
+        phonemes = sorted(get_feature_system())[:150] + ['zzz', 'p']
+        
+        for normalize in (True, False):
+            serial, labels = build_distance_matrix(
+                phonemes, method='root_manhattan', normalize=normalize, n_jobs=1
+            )
+            parallel, parallel_labels = build_distance_matrix(
+                phonemes, method='root_manhattan', normalize=normalize, n_jobs=3
+            )
+            assert parallel_labels == labels
+            assert np.array_equal(parallel, serial)
+    
+    def test_builtin_methods_stay_serial(self, monkeypatch):
+        """Test vectorized methods do not start a pool."""
+        from distfeat import distances
+        
+        monkeypatch.setattr(distances, '_PARALLEL_MIN_PAIRS', 0)
+        monkeypatch.setattr(distances, 'map_chunks', None)
+        
+        matrix, _ = build_distance_matrix(['p', 'b', 't'], n_jobs=2)
+        assert matrix.shape == (3, 3)
+    
+    def test_unpicklable_method_falls_back(self, monkeypatch, caplog):
+        """Test lambdas are computed serially when workers would need pickling."""
+        import multiprocessing
+        from distfeat import distances, get_feature_system
+        
+        monkeypatch.setattr(distances, '_PARALLEL_MIN_PAIRS', 0)
+        monkeypatch.setattr(distances, 'map_chunks', None)  # Must not start a pool
+        monkeypatch.setattr(multiprocessing, 'get_start_method', lambda *args, **kwargs: 'spawn')
+        register_distance_method('lambda_manhattan', lambda a, b: float(np.abs(a - b).sum()))
+        phonemes = sorted(get_feature_system())[:40]
+        
+        with caplog.at_level('WARNING', logger='distfeat'):
+            parallel, _ = build_distance_matrix(phonemes, method='lambda_manhattan', n_jobs=2)
+        serial, _ = build_distance_matrix(phonemes, method='lambda_manhattan', n_jobs=1)
+        
+        assert np.array_equal(parallel, serial)
+        assert 'cannot be pickled' in caplog.text
+    
+    def test_lambda_under_spawn(self):
+        """Test a lambda method with n_jobs set works under the 'spawn' start method."""
+        import subprocess
+        import sys
+        from pathlib import Path
+        import distfeat
+        
+        code = (
+            "import multiprocessing\n"
+            "import numpy as np\n"
+            "import distfeat\n"
+            "from distfeat import distances\n"
+            "multiprocessing.set_start_method('spawn')\n"
+            "distances._PARALLEL_MIN_PAIRS = 0\n"
+            "distfeat.register_distance_method('l1', lambda a, b: float(np.abs(a - b).sum()))\n"
+            "phonemes = sorted(distfeat.get_feature_system())[:60]\n"
+            "matrix, _ = distfeat.build_distance_matrix(phonemes, method='l1', n_jobs=2)\n"
+            "print(matrix.shape[0])\n"
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=Path(distfeat.__file__).parents[1],  # Import the package under test
+            capture_output=True, text=True, check=True
+        ).stdout
+        
+        assert output.split() == ['60']
+
+
+class TestBatchCustomMethods:
+    """Test registering vectorized custom distance kernels."""
+    
+    @staticmethod
+    def _register_all_kinds(prefix, normalization='features'):
+        def pair(vec1, vec2, **kwargs):
+            return float(np.abs(vec1 - vec2).sum())
+        
+        def pairwise(X, Y, **kwargs):
+            return np.abs(X - Y).sum(axis=1)
+        
+        def matrix(X, Y, **kwargs):
+            return np.abs(X[:, None, :] - Y[None, :, :]).sum(axis=2)
+        
+        for kind, func in (('pair', pair), ('pairwise', pairwise), ('matrix', matrix)):
+            register_distance_method(f'{prefix}_{kind}', func, kind=kind, normalization=normalization)
+    
+    def test_kinds_agree(self):
+        """Test all kinds give the same matrix, equal to manhattan."""
+        from distfeat import calculate_distances, get_feature_system
+        
+        self._register_all_kinds('l1')
+        phonemes = sorted(get_feature_system())[:60] + ['zzz']
+        expected, _ = build_distance_matrix(phonemes, method='manhattan')
+        
+        for kind in ('pair', 'pairwise', 'matrix'):
+            matrix, _ = build_distance_matrix(phonemes, method=f'l1_{kind}')
+            assert np.allclose(matrix, expected)
+            
+            pairs = [('p', 'b'), ('a', 'i'), ('p', 'zzz'), ('t', 't')]
+            dists = calculate_distances(pairs, method=f'l1_{kind}')
+            assert np.allclose(dists, calculate_distances(pairs, method='manhattan'), equal_nan=True)
+            assert calculate_distance('p', 'b', method=f'l1_{kind}') == pytest.approx(
+                calculate_distance('p', 'b', method='manhattan')
+            )
+    
+    def test_declared_normalization(self):
+        """Test 'none' skips scaling and 'kernel' hands normalize to the function."""
+        seen = []
+        
+        def scaled(X, Y, normalize):
+            seen.append(normalize)
+            dist = np.abs(X - Y).sum(axis=1).astype(float)
+            return dist / X.shape[1] if normalize else dist
+        
+        register_distance_method('l1_kernel', scaled, kind='pairwise', normalization='kernel')
+        self._register_all_kinds('l1_raw', normalization='none')
+        
+        raw = calculate_distance('p', 'b', method='manhattan', normalize=False)
+        assert calculate_distance('p', 'b', method='l1_raw_pairwise', normalize=True) == raw
+        assert calculate_distance('p', 'b', method='l1_kernel', normalize=True) == pytest.approx(
+            calculate_distance('p', 'b', method='manhattan')
+        )
+        assert True in seen
+    
+    def test_invalid_registration(self, monkeypatch):
+        """Test unknown kinds, normalizations and bad output shapes are rejected."""
+        from distfeat import distances
+        
+        # Keep the broken method out of the shared registry
+        monkeypatch.setattr(distances, '_DISTANCE_METHODS', dict(distances._DISTANCE_METHODS))
+        
+        with pytest.raises(ValueError):
+            register_distance_method('bad', lambda x, y: 0.0, kind='triplet')
+        with pytest.raises(ValueError):
+            register_distance_method('bad', lambda x, y: 0.0, normalization='sometimes')
+        
+        register_distance_method('bad_shape', lambda X, Y: np.zeros(1), kind='pairwise')
+        with pytest.raises(ValueError):
+            build_distance_matrix(['p', 'b', 't'], method='bad_shape')
+
+
+class TestWeightedDistances:
+    """Test feature-weighted distance methods."""
+    
+    def test_equal_weights_match_unweighted(self):
+        """Test unit weights reproduce the unweighted methods."""
+        phonemes = ['p', 'b', 't', 'd', 'a', 'i', 'zzz']
+        
+        for method in ('hamming', 'euclidean', 'manhattan'):
+            for normalize in (True, False):
+                expected, _ = build_distance_matrix(phonemes, method=method, normalize=normalize)
+                matrix, _ = build_distance_matrix(
+                    phonemes, method=f'weighted_{method}', normalize=normalize
+                )
+                assert np.allclose(matrix, expected)
+    
+    def test_weights_change_distances(self):
+        """Test weighted distances against a direct computation."""
+        from distfeat import calculate_distances, get_feature_names, phoneme_to_vector
+        
+        names = get_feature_names()
+        weights = np.linspace(0.5, 2.0, len(names))
+        p, b = phoneme_to_vector('p'), phoneme_to_vector('b')
+        diff = np.abs(p.astype(float) - b)
+        
+        expected = {
+            'weighted_hamming': ((p != b) * weights).sum() / weights.sum(),
+            'weighted_manhattan': (diff * weights).sum() / weights.sum(),
+            'weighted_euclidean': np.sqrt((diff ** 2 * weights).sum() / weights.sum()),
+        }
+        for method, value in expected.items():
+            dist = calculate_distance('p', 'b', method=method, weights=tuple(weights))
+            assert dist == pytest.approx(value)
+            batch = calculate_distances([('p', 'b'), ('b', 'p')], method=method, weights=weights)
+            assert batch == pytest.approx([value, value])
+    
+    def test_weightings_bounded(self):
+        """Test many distinct weight vectors keep a bounded number of scaled matrices."""
+        from distfeat import calculate_distances, get_feature_names
+        from distfeat.distances import _WEIGHTINGS
+        
+        n_features = len(get_feature_names())
+        for k in range(3 * _WEIGHTINGS.maxsize):
+            weights = np.full(n_features, 1.0 + k)
+            dist = calculate_distances([('p', 'b')], method='weighted_hamming', weights=weights)
+            assert dist[0] == pytest.approx(calculate_distance('p', 'b', method='hamming'))
+        
+        assert len(_WEIGHTINGS) <= _WEIGHTINGS.maxsize
+    
+    def test_weight_profiles(self, tmp_path):
+        """Test named profiles loaded from YAML and mapping weights."""
+        from distfeat import get_feature_names, get_feature_weights, load_config
+        from distfeat.config import reset_config
+        
+        names = get_feature_names()
+        config_file = tmp_path / 'weights.yaml'
+        config_file.write_text(
+            f"weight_profiles:\n  voicing:\n    {names[0]}: 4.0\n    {names[1]}: 0.0\n",
+            encoding='utf-8'
+        )
+        
+        try:
+            load_config(config_file)
+            weights = get_feature_weights('voicing')
+            assert weights[:2].tolist() == [4.0, 0.0]
+            assert weights[2:].tolist() == [1.0] * (len(names) - 2)
+            assert np.array_equal(weights, get_feature_weights({names[0]: 4.0, names[1]: 0.0}))
+            
+            phonemes = ['p', 'b', 'a']
+            by_name, _ = build_distance_matrix(phonemes, method='weighted_manhattan', weights='voicing')
+            by_vector, _ = build_distance_matrix(phonemes, method='weighted_manhattan', weights=weights)
+            assert np.array_equal(by_name, by_vector)
+        finally:
+            reset_config()
+    
+    def test_invalid_weights(self):
+        """Test bad weights are rejected."""
+        from distfeat import get_feature_names, get_feature_weights
+        
+        n = len(get_feature_names())
+        for weights in ('no_such_profile', {'no_such_feature': 1.0}, [1.0] * (n - 1),
+                        [-1.0] + [1.0] * (n - 1), [0.0] * n):
+            with pytest.raises(ValueError):
+                get_feature_weights(weights)
+
+
+class TestCustomSystemDistances:
+    """Test distance APIs against a custom feature system."""
+    
+    @pytest.fixture
+    def toy_system(self, tmp_path):
+        """Three binary features over four phonemes."""
+        from distfeat import load_custom_features
+        
+        path = tmp_path / 'toy.tsv'
+        path.write_text(
+            "phoneme\tvoice\tnasal\tlabial\n"
+            "p\t-\t-\t+\nb\t+\t-\t+\nm\t+\t+\t+\nt\t-\t-\t-\n",
+            encoding='utf-8'
+        )
+        load_custom_features(path, 'toy_distances')
+        return 'toy_distances'
+    
+    def test_single_and_batch(self, toy_system):
+        """Test hamming distances count differing features of the system."""
+        from distfeat import calculate_distances
+        
+        assert calculate_distance('p', 'b', system=toy_system) == pytest.approx(1 / 3)
+        assert calculate_distance('p', 'm', system=toy_system) == pytest.approx(2 / 3)
+        assert calculate_distance('m', 't', system=toy_system) == pytest.approx(1.0)
+        assert calculate_distance('p', 'm') != pytest.approx(2 / 3)
+        
+        batch = calculate_distances([('p', 'b'), ('m', 't')], system=toy_system)
+        assert batch == pytest.approx([1 / 3, 1.0])
+    
+    def test_matrices(self, toy_system):
+        """Test full and cross matrices agree with single-pair distances."""
+        from distfeat import build_cross_distance_matrix
+        
+        phonemes = ['p', 'b', 'm', 't']
+        for method in ('hamming', 'euclidean', 'manhattan', 'weighted_manhattan'):
+            matrix, labels = build_distance_matrix(phonemes, method=method, system=toy_system)
+            assert labels == phonemes
+            expected = [
+                [calculate_distance(a, b, method=method, system=toy_system) for b in phonemes]
+                for a in phonemes
+            ]
+            assert matrix == pytest.approx(np.array(expected))
+            
+            cross, _, _ = build_cross_distance_matrix(
+                ['p', 'm'], phonemes, method=method, system=toy_system
+            )
+            assert cross == pytest.approx(matrix[[0, 2]])
+    
+    def test_cache_separates_systems(self, toy_system):
+        """Test cached distances of one system are not served for another."""
+        default = calculate_distance('p', 'm')
+        custom = calculate_distance('p', 'm', system=toy_system)
+        assert calculate_distance('p', 'm') == default
+        assert calculate_distance('p', 'm', system=toy_system) == custom
+        assert default != custom
+    
+    def test_weights_follow_system(self, toy_system):
+        """Test weights are resolved against the system's features."""
+        from distfeat import get_feature_weights
+        
+        weights = get_feature_weights({'nasal': 0.0}, system=toy_system)
+        assert weights.tolist() == [1.0, 0.0, 1.0]
+        dist = calculate_distance(
+            'p', 'm', method='weighted_hamming', weights={'nasal': 0.0}, system=toy_system
+        )
+        assert dist == pytest.approx(0.5)
\ No newline at end of file
@@ -124,6 +124,16 @@ class TestFeatureSystem:
         # Should have fewer phonemes
         assert len(no_clicks) <= len(all_system)
     
+    def test_returns_copy(self):
+        """Test callers can modify the returned dictionary safely."""
+        system = get_feature_system()
+        phoneme = next(iter(system))
+        del system[phoneme]
+        
+        again = get_feature_system()
+        assert phoneme in again
+        assert again is not get_feature_system()
+    
     def test_matrix_conversion(self):
         """Test converting to matrix format."""
         import numpy as np
@@ -133,4 +143,271 @@ class TestFeatureSystem:
         assert isinstance(matrix, np.ndarray)
         assert len(matrix.shape) == 2
         assert matrix.shape[0] > 0  # Number of phonemes
-        assert matrix.shape[1] > 0  # Number of features
\ No newline at end of file
+        assert matrix.shape[1] > 0  # Number of features
+
+
+class TestFeatureMatrix:
+    """Test the array-backed feature store."""
+    
+    def test_store_layout(self):
+        """Test the store is a compact, read-only array."""
+        import numpy as np
+        from distfeat import get_feature_matrix
+        
+        store = get_feature_matrix()
+        
+        assert store.matrix.dtype == np.int8
+        assert store.matrix.shape == (len(store.phonemes), len(store.feature_names))
+        assert store.matrix.flags['C_CONTIGUOUS']
+        assert not store.matrix.flags['WRITEABLE']
+        assert store.feature_names == get_feature_names()
+    
+    def test_vector_matches_dict(self):
+        """Test vector views agree with the dictionary API."""
+        from distfeat import phoneme_to_vector
+        
+        vector = phoneme_to_vector('p')
+        features = phoneme_to_features('p')
+        
+        assert vector.tolist() == [features[f] for f in get_feature_names()]
+        assert phoneme_to_vector('zzz', on_error='ignore') is None
+        with pytest.raises(ValueError):
+            phoneme_to_vector('zzz', on_error='raise')
+    
+    def test_matrix_rows_sorted(self):
+        """Test matrix output follows sorted phoneme order."""
+        system = get_feature_system()
+        matrix = get_feature_system(as_matrix=True)
+        phonemes = sorted(system)
+        
+        assert matrix.shape[0] == len(phonemes)
+        for i in (0, len(phonemes) // 2, len(phonemes) - 1):
+            features = system[phonemes[i]]['features']
+            assert matrix[i].tolist() == [features[f] for f in get_feature_names()]
+
+
+class TestPackedFeatures:
+    """Test bit-packed feature vectors."""
+    
+    def test_bundled_system_packs_to_one_word(self):
+        """Test the bundled system fits in a single 64-bit word."""
+        import numpy as np
+        from distfeat import get_feature_matrix
+        
+        store = get_feature_matrix()
+        
+        assert store.is_binary
+        assert store.packed.dtype == np.uint64
+        assert store.packed.shape == (len(store.phonemes), 1)
+    
+    def test_popcount_matches_unpacked(self):
+        """Test XOR/popcount agrees with counting differing features."""
+        import numpy as np
+        from distfeat.features import pack_features, popcount
+        
+        rng = np.random.default_rng(0)
+        matrix = rng.integers(0, 2, size=(20, 100))  # Two words per row
+        packed = pack_features(matrix)
+        
+        assert packed.shape == (20, 2)
+        differing = popcount(packed[:10] ^ packed[10:]).sum(axis=1)
+        assert differing.tolist() == (matrix[:10] != matrix[10:]).sum(axis=1).tolist()
+        assert popcount(packed).sum(axis=1).tolist() == matrix.sum(axis=1).tolist()
+    
+    def test_non_binary_system_not_packed(self):
+        """Test non-binary systems refuse bit-packing."""
+        import numpy as np
+        from distfeat import FeatureMatrix
+        
+        store = FeatureMatrix(
+            matrix=np.array([[0, 2], [1, 0]], dtype=np.int8),
+            phonemes=['a', 'b'],
+            feature_names=['f1', 'f2'],
+            descriptions=['', '']
+        )
+        
+        assert not store.is_binary
+        with pytest.raises(ValueError):
+            store.packed
+    
+    def test_packed_ints_span_words(self):
+        """Test Python integer rows keep every word of wide systems."""
+        import numpy as np
+        from distfeat import FeatureMatrix
+        
+        rng = np.random.default_rng(1)
+        matrix = rng.integers(0, 2, size=(6, 130)).astype(np.int8)  # Three words per row
+        store = FeatureMatrix(
+            matrix=matrix,
+            phonemes=list('abcdef'),
+            feature_names=[f'f{k}' for k in range(130)],
+            descriptions=[''] * 6
+        )
+        
+        ints = store.packed_ints
+        for i in range(6):
+            assert ints[i].bit_count() == matrix[i].sum()
+            for j in range(6):
+                assert (ints[i] ^ ints[j]).bit_count() == (matrix[i] != matrix[j]).sum()
+
+
+class TestFeatureSearch:
+    """Test vectorized phoneme search from features."""
+    
+    def test_batch_matches_single(self):
+        """Test batch search agrees with one query at a time."""
+        from distfeat import features_to_phonemes
+        
+        queries = [
+            phoneme_to_features('p'),
+            {'voice': 0, 'labial': 1},
+            {'voice': 1, 'unknown_feature': 0},
+            {'voice': 2, 'labial': 3},
+        ]
+        
+        for threshold in (1.0, 0.5):
+            expected = [features_to_phoneme(q, threshold=threshold) for q in queries]
+            assert features_to_phonemes(queries, threshold=threshold) == expected
+    
+    def test_vector_queries(self):
+        """Test feature vectors are accepted in place of dictionaries."""
+        import numpy as np
+        from distfeat import features_to_phonemes, get_feature_matrix, phoneme_to_vector
+        
+        vector = phoneme_to_vector('b')
+        assert features_to_phoneme(vector) == features_to_phoneme(phoneme_to_features('b'))
+        
+        store = get_feature_matrix()
+        results = features_to_phonemes(store.matrix[:5])
+        assert all(phoneme_to_features(r) == store.to_dict(i) for i, r in enumerate(results))
+        
+        with pytest.raises(ValueError):
+            features_to_phoneme(np.zeros(3))
+    
+    def test_top_k(self):
+        """Test ranked matches with scores."""
+        matches = features_to_phoneme(phoneme_to_features('p'), threshold=0.0, top_k=5)
+        
+        assert len(matches) == 5
+        assert matches[0][1] == 1.0
+        assert phoneme_to_features(matches[0][0]) == phoneme_to_features('p')
+        scores = [score for _, score in matches]
+        assert scores == sorted(scores, reverse=True)
+        
+        with pytest.raises(ValueError):
+            features_to_phoneme({'voice': 0}, top_k=0)
+
+
+class TestCompiledFeatures:
+    """Test the on-disk cache of parsed feature files."""
+    
+    def test_bundled_system_compiled_once(self, cache_dir, monkeypatch):
+        """Test later loads skip parsing and give an identical system."""
+        from distfeat import features
+        
+        parsed = features._load_bundled_features()
+        assert list(cache_dir.glob('features-v*/*.npy'))
+        
+        def fail(lines):
+            raise AssertionError("compiled system should have been used")
+        
+        monkeypatch.setattr(features, '_parse_csv_lines', fail)
+        loaded = features._load_bundled_features()
+        
+        assert loaded.digest == parsed.digest
+        assert loaded.descriptions == parsed.descriptions
+        assert not loaded.matrix.flags['WRITEABLE']
+    
+    def test_custom_system_follows_file_contents(self, cache_dir, tmp_path):
+        """Test edited custom files and parse options are not served stale."""
+        from distfeat import get_feature_matrix
+        
+        path = tmp_path / 'features.tsv'
+        path.write_text("phoneme\tvoice\tnasal\np\t-\t-\nm\t+\t+\n", encoding='utf-8')
+        
+        load_custom_features(path, 'compiled_test')
+        assert get_feature_matrix('compiled_test').to_dict(1) == {'voice': 1, 'nasal': 1}
+        load_custom_features(path, 'compiled_test')
+        assert get_feature_matrix('compiled_test').custom
+        
+        path.write_text("phoneme\tvoice\tnasal\np\t-\t-\nm\t+\t-\n", encoding='utf-8')
+        load_custom_features(path, 'compiled_test')
+        assert get_feature_matrix('compiled_test').to_dict(1) == {'voice': 1, 'nasal': 0}
+        
+        load_custom_features(path, 'compiled_test', exclude_cols=['phoneme', 'nasal'])
+        assert get_feature_matrix('compiled_test').feature_names == ['voice']
+    
+    def test_disabled(self, cache_dir):
+        """Test nothing is written when compile_features is off."""
+        from distfeat import features, set_config
+        
+        set_config('compile_features', False)
+        try:
+            features._load_bundled_features()
+        finally:
+            set_config('compile_features', True)
+        
+        assert not list(cache_dir.glob('features-v*/*'))
+    
+    def test_no_home_directory(self, monkeypatch):
+        """Test systems still load when there is no home directory to cache in."""
+        from pathlib import Path
+        from distfeat import features, get_config, set_config
+        
+        def no_home():
+            raise RuntimeError("Could not determine home directory.")
+        
+        monkeypatch.delenv('DISTFEAT_CACHE_DIR', raising=False)
+        monkeypatch.setattr(Path, 'home', staticmethod(no_home))
+        original = get_config('cache_dir')
+        set_config('cache_dir', None)
+        try:
+            store = features._load_bundled_features()
+        finally:
+            set_config('cache_dir', original)
+        
+        assert len(store) > 0
+
+
+class TestFeatureSystemReload:
+    """Test caches are invalidated when a custom system is reloaded."""
+    
+    def test_lookups_follow_reload(self, tmp_path):
+        """Test feature lookups see the reloaded values."""
+        path = tmp_path / 'features.tsv'
+        path.write_text("phoneme\tvoice\tnasal\np\t-\t-\nm\t+\t+\n", encoding='utf-8')
+        load_custom_features(path, 'reload_test')
+        assert phoneme_to_features('m', system='reload_test') == {'voice': 1, 'nasal': 1}
+        
+        path.write_text("phoneme\tvoice\tnasal\np\t-\t-\nm\t+\t-\n", encoding='utf-8')
+        load_custom_features(path, 'reload_test')
+        assert phoneme_to_features('m', system='reload_test') == {'voice': 1, 'nasal': 0}
+    
+    def test_hooks_receive_replaced_system(self, tmp_path, monkeypatch):
+        """Test hooks run with the old system only when contents change."""
+        from distfeat import (
+            features, get_distance_cache, get_feature_matrix, on_feature_system_change
+        )
+        from distfeat.cache import MISSING
+        
+        monkeypatch.setattr(features, '_RELOAD_HOOKS', list(features._RELOAD_HOOKS))
+        replaced = []
+        on_feature_system_change(replaced.append)
+        
+        path = tmp_path / 'features.tsv'
+        path.write_text("phoneme\tvoice\np\t-\nb\t+\n", encoding='utf-8')
+        load_custom_features(path, 'hook_test')
+        old = get_feature_matrix('hook_test')
+        load_custom_features(path, 'hook_test')  # Same contents
+        assert replaced == []
+        
+        # Distances cached for the old contents are dropped
+        cache = get_distance_cache()
+        key = cache.make_key(old.digest, ('hamming', True), 0, 1)
+        cache.put(key, 1.0)
+        
+        path.write_text("phoneme\tvoice\np\t+\nb\t+\n", encoding='utf-8')
+        load_custom_features(path, 'hook_test')
+        assert [store.digest for store in replaced] == [old.digest]
+        assert get_feature_matrix('hook_test').digest != old.digest
+        assert cache.get(key) is MISSING
\ No newline at end of file
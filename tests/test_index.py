@@ -0,0 +1,110 @@
+"""
+Unit tests for nearest-neighbour phoneme search.
+"""
+
+import pytest
+import numpy as np
+from distfeat import (
+    PhonemeIndex,
+    build_cross_distance_matrix,
+    phoneme_to_vector
+)
+
+
+def _brute_force(index, query, method, normalize=True):
+    """Ranked (phoneme, distance) pairs from a full cross-distance row."""
+    matrix, _, cols = build_cross_distance_matrix(
+        [query], index.phonemes, method=method, normalize=normalize
+    )
+    row = matrix[0]
+    order = np.lexsort((np.arange(len(cols)), row))
+    return [(cols[j], float(row[j])) for j in order if cols[j] != query]
+
+
+class TestNearest:
+    """Test k-nearest-neighbour queries."""
+    
+    @pytest.mark.parametrize("method", ['hamming', 'manhattan', 'euclidean', 'jaccard', 'cosine'])
+    def test_matches_brute_force(self, method):
+        """Test results equal sorting a full distance row."""
+        index = PhonemeIndex()
+        
+        for query in ['p', 'a', 'ʃ', 'ŋ']:
+            for normalize in (True, False):
+                expected = _brute_force(index, query, method, normalize)
+                assert index.nearest(query, 10, method, normalize) == expected[:10]
+    
+    def test_query_excluded(self):
+        """Test the query phoneme is left out unless requested."""
+        index = PhonemeIndex(['p', 'b', 't', 'a'])
+        
+        assert [p for p, _ in index.nearest('p', 3)] == ['b', 't', 'a']
+        assert index.nearest('p', 1, include_query=True) == [('p', 0.0)]
+    
+    def test_vector_query(self):
+        """Test searching with a feature vector."""
+        index = PhonemeIndex(['p', 'b', 't', 'a'])
+        
+        assert index.nearest(phoneme_to_vector('p'), 1) == [('p', 0.0)]
+        with pytest.raises(ValueError):
+            index.nearest(np.zeros(3), 1)
+    
+    def test_invalid_queries(self):
+        """Test errors for unknown phonemes, methods and k."""
+        index = PhonemeIndex(['p', 'b'])
+        
+        with pytest.raises(ValueError):
+            index.nearest('zzz')
+        with pytest.raises(ValueError):
+            index.nearest('p', method='nonexistent')
+        with pytest.raises(ValueError):
+            index.nearest('p', k=0)
+        with pytest.raises(ValueError):
+            PhonemeIndex(['p', 'zzz'])
+    
+    def test_kmeans_rejected(self):
+        """Test kmeans queries raise an explicit error."""
+        index = PhonemeIndex(['p', 'b'])
+        
+        with pytest.raises(ValueError, match="kmeans is not supported"):
+            index.nearest('p', method='kmeans')
+        with pytest.raises(ValueError, match="kmeans is not supported"):
+            index.radius('p', 0.5, method='kmeans')
+
+
+class TestRadius:
+    """Test radius queries."""
+    
+    @pytest.mark.parametrize("method", ['hamming', 'euclidean', 'jaccard'])
+    def test_matches_brute_force(self, method):
+        """Test results equal filtering a full distance row."""
+        index = PhonemeIndex()
+        
+        for query in ['k', 'i']:
+            expected = _brute_force(index, query, method)
+            radius = expected[20][1]
+            assert index.radius(query, radius, method) == [
+                (p, d) for p, d in expected if d <= radius
+            ]
+    
+    def test_empty_radius(self):
+        """Test a negative radius finds nothing."""
+        index = PhonemeIndex()
+        assert index.radius('p', -1.0) == []
+
+
+class TestWeightedIndex:
+    """Test weighted methods in the index."""
+    
+    def test_matches_matrix(self):
+        """Test weighted neighbours agree with the weighted distance matrix."""
+        from distfeat import build_distance_matrix, get_feature_names
+        
+        weights = {get_feature_names()[0]: 3.0, get_feature_names()[4]: 0.0}
+        index = PhonemeIndex(weights=weights)
+        matrix, phonemes = build_distance_matrix(method='weighted_euclidean', weights=weights)
+        
+        row = phonemes.index('t')
+        expected = sorted((d, k) for k, d in enumerate(matrix[row]) if k != row)[:5]
+        result = index.nearest('t', k=5, method='weighted_euclidean')
+        assert [d for _, d in result] == [d for d, _ in expected]
\ No newline at end of file
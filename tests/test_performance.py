@@ -355,4 +355,75 @@ class TestPerformanceRegression:
         print(f"Stress test completed in {elapsed:.2f}s")
         
         # Should complete within reasonable time even under stress
-        assert elapsed < 60.0, f"Stress test too slow: {elapsed:.2f}s"
\ No newline at end of file
+        assert elapsed < 60.0, f"Stress test too slow: {elapsed:.2f}s"
+
+
+class TestImportTime:
+    """Test importing distfeat stays cheap."""
+    
+    def test_heavy_dependencies_not_imported(self):
+        """Test optional dependencies load on first use, not on import."""
+        import subprocess
+        import sys
+        from pathlib import Path
+        import distfeat
+        
+        code = (
+            "import sys, time\n"
+            "start = time.perf_counter()\n"
+            "import distfeat\n"
+            "elapsed = time.perf_counter() - start\n"
+            "heavy = [m for m in ('sklearn', 'scipy', 'yaml') if m in sys.modules]\n"
+            "print(elapsed, ','.join(heavy))\n"
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=Path(distfeat.__file__).parents[1],  # Import the package under test
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        
+        assert output[1:] == []  # No heavy modules loaded
+        # Generous budget; numpy dominates the remaining import time
+        assert float(output[0]) < 1.0
+    
+    def test_kmeans_still_available(self):
+        """Test the k-means method imports scikit-learn when first used."""
+        pytest.importorskip('sklearn')
+        
+        dist = calculate_distance('p', 'a', method='kmeans')
+        assert 0.0 <= dist <= 1.0
+
+
+class TestBenchmarkScript:
+    """Test the benchmark suite in scripts/benchmark.py."""
+    
+    @staticmethod
+    def _load_script():
+        import importlib.util
+        from pathlib import Path
+        
+        path = Path(__file__).parents[1] / 'scripts' / 'benchmark.py'
+        spec = importlib.util.spec_from_file_location('distfeat_benchmark', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    
+    def test_results_and_comparison(self, tmp_path):
+        """Test JSON output and regression detection against a baseline."""
+        import json
+        
+        script = self._load_script()
+        output = tmp_path / 'results.json'
+        args = ['-k', 'align/length_20', '--repeats', '2', '--min-time', '0.001']
+        
+        assert script.main(args + ['-o', str(output)]) == 0
+        results = json.loads(output.read_text(encoding='utf-8'))
+        assert list(results['results']) == ['align/length_20']
+        assert results['results']['align/length_20']['median'] > 0
+        assert results['metadata']['numpy'] == np.__version__
+        
+        # A baseline 100x faster than reality must be reported as a regression
+        results['results']['align/length_20']['median'] /= 100
+        baseline = tmp_path / 'baseline.json'
+        baseline.write_text(json.dumps(results), encoding='utf-8')
+        assert script.main(args + ['--compare', str(baseline)]) == 1
\ No newline at end of file